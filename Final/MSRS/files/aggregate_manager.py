@@ -0,0 +1,86 @@
+"""
+Aggregate Manager for Movie Review App
+
+Keeps per-movie review aggregates (count, rating sum, rating histogram and
+sentiment mix) stored under each movie's "stats" key.
+
+Usage (batch rebuild):
+    python aggregate_manager.py
+"""
+import time
+
+SENTIMENTS = ("Positive", "Neutral", "Negative", "Unknown")
+
+class AggregateManager:
+    def empty_stats(self):
+        """Create an empty aggregate record"""
+        return {
+            "count": 0,
+            "rating_sum": 0,
+            "histogram": [0] * 10,
+            "sentiment": {label: 0 for label in SENTIMENTS}
+        }
+
+    def _apply(self, stats, review, sign):
+        """Add (sign=1) or remove (sign=-1) one review's contribution"""
+        rating = int(review["rating"])
+        sentiment = review.get("sentiment", "Unknown")
+        if sentiment not in stats["sentiment"]:
+            sentiment = "Unknown"
+
+        stats["count"] += sign
+        stats["rating_sum"] += sign * rating
+        if 1 <= rating <= 10:
+            stats["histogram"][rating - 1] += sign
+        stats["sentiment"][sentiment] += sign
+
+    def add_review(self, stats, review):
+        """Account for a new review in O(1)"""
+        self._apply(stats, review, 1)
+        return stats
+
+    def remove_review(self, stats, review):
+        """Remove a review's contribution in O(1)"""
+        self._apply(stats, review, -1)
+        return stats
+
+    def replace_review(self, stats, old_review, new_review):
+        """Swap an updated review's contribution in O(1)"""
+        self._apply(stats, old_review, -1)
+        self._apply(stats, new_review, 1)
+        return stats
+
+    def get_stats(self, movie):
+        """Get a movie's aggregates, rebuilding them if missing"""
+        if "stats" not in movie:
+            movie["stats"] = self.rebuild_movie(movie)
+        return movie["stats"]
+
+    def average_rating(self, stats):
+        """Average community rating, or None without reviews"""
+        if not stats["count"]:
+            return None
+        return stats["rating_sum"] / stats["count"]
+
+    def rebuild_movie(self, movie):
+        """Recompute a movie's aggregates from its reviews"""
+        stats = self.empty_stats()
+        for review in movie.get("reviews", []):
+            self._apply(stats, review, 1)
+        return stats
+
+    def rebuild_all(self, movies):
+        """Recompute aggregates for every movie in place"""
+        for movie in movies.values():
+            movie["stats"] = self.rebuild_movie(movie)
+        return movies
+
+def main():
+    from data_manager import DataManager
+
+    start = time.perf_counter()
+    count = DataManager().rebuild_aggregates()
+    print(f"Rebuilt aggregates for {count} movies in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,69 @@
 """
 AI Analyzer for Movie Review App
 """
+import threading
+from collections import OrderedDict
 from textblob import TextBlob
 from deep_translator import GoogleTranslator
-import pandas as pd
+import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from config import Config
+from rating_matrix import RatingMatrix
+from recommendation_job import RecommendationStore
 
 class AIAnalyzer:
+    PROFILE_HALF_LIFE_DAYS = 365.0
+    DISLIKE_WEIGHT = 0.5
+    
     def __init__(self):
-        pass
+        self._features_key = None
+        self._features_source = None
+        self._features = None
+        self._item_ids = None
+        self._matrix_key = None
+        self._matrix_source = None
+        self._rating_matrix = None
+        self._store = None
+        self._sentiment_cache = OrderedDict()
+        self._sentiment_lock = threading.Lock()    # analysis runs on worker threads
     
     def analyze_sentiment(self, review_text):
         """Analyze sentiment of review text"""
         if not review_text.strip():
             return "Neutral", 0.0
         
-        try:
-            translated = GoogleTranslator(source='auto', target='en').translate(review_text)
-        except Exception:
-            translated = review_text
+        with self._sentiment_lock:
+            cached = self._sentiment_cache.get(review_text)
+            if cached is not None:
+                self._sentiment_cache.move_to_end(review_text)
+                return cached
         
+        result = self._compute_sentiment(review_text)
+        if Config.SENTIMENT_CACHE_SIZE:
+            with self._sentiment_lock:
+                self._sentiment_cache[review_text] = result
+                while len(self._sentiment_cache) > Config.SENTIMENT_CACHE_SIZE:
+                    self._sentiment_cache.popitem(last=False)
+        return result
+    
+    def _compute_sentiment(self, review_text):
+        """Translate (if enabled) and score a review with TextBlob"""
+        translated = review_text
+        if Config.TRANSLATION_ENABLED:
+            try:
+                translated = GoogleTranslator(source='auto', target='en').translate(review_text)
+            except Exception:
+                translated = review_text
+        return self.quick_sentiment(translated)
+    
+    def quick_sentiment(self, review_text):
+        """Score text with TextBlob alone: local and fast, but English-only (no translation)"""
+        if not review_text.strip():
+            return "Neutral", 0.0
         try:
-            analysis = TextBlob(translated)
+            analysis = TextBlob(review_text)
             polarity = analysis.sentiment.polarity
             
             if polarity > 0.2:
@@ -34,68 +75,131 @@ class AIAnalyzer:
         except Exception:
             return "Neutral", 0.0
     
-    def suggest_rating_from_review(self, review_content):
-        """Suggest rating based on review sentiment"""
-        sentiment, polarity = self.analyze_sentiment(review_content)
+    def suggest_rating_from_review(self, review_content, quick=False):
+        """Suggest rating based on review sentiment (quick skips translation and the cache)"""
+        if quick:
+            sentiment, polarity = self.quick_sentiment(review_content)
+        else:
+            sentiment, polarity = self.analyze_sentiment(review_content)
         suggested_rating = round(5.5 + polarity * 4.5)
         suggested_rating = max(1, min(10, suggested_rating))
         return suggested_rating, sentiment, polarity
     
-    def get_recommendations(self, user_ratings, all_movies, top_n=10):
-        """Get AI-based movie recommendations"""
+    @staticmethod
+    def features_key(all_movies):
+        """Key over the catalog's IDs and genres, the only inputs of the item features"""
+        return hash(tuple((movie_id, movie["Genre"]) for movie_id, movie in all_movies.items()))
+    
+    def build_item_features(self, all_movies):
+        """TF-IDF genre matrix for the catalog, cached until IDs or genres change"""
+        if all_movies is self._features_source:
+            return self._item_ids, self._features
+        key = self.features_key(all_movies)
+        if self._features_key != key:
+            tfidf = TfidfVectorizer(stop_words='english')
+            self._features = tfidf.fit_transform([movie["Genre"] for movie in all_movies.values()])
+            self._item_ids = list(all_movies)
+            self._features_key = key
+        self._features_source = all_movies
+        return self._item_ids, self._features
+    
+    def restore_item_features(self, item_ids, features, all_movies):
+        """Adopt features built earlier from the same catalog (e.g. by the warm-start cache)"""
+        self._item_ids = list(item_ids)
+        self._features = features
+        self._features_key = self.features_key(all_movies)
+        self._features_source = all_movies
+    
+    def get_rating_matrix(self, all_movies):
+        """User x item rating matrix, cached per catalog version"""
+        # Every write publishes a snapshot with new dicts, so the identity of all_movies
+        # stands for its version (callers must not modify it in place)
+        item_ids, _ = self.build_item_features(all_movies)
+        if all_movies is not self._matrix_source or self._matrix_key != self._features_key:
+            self._rating_matrix = RatingMatrix.from_movies(all_movies, item_ids=item_ids)
+            self._matrix_source = all_movies
+            self._matrix_key = self._features_key
+        return self._rating_matrix
+    
+    def build_user_profiles(self, rating_matrix, features):
+        """Profiles for every user row in one sparse product (liked items add, disliked subtract)"""
+        weights = rating_matrix.weights(self.PROFILE_HALF_LIFE_DAYS, dislike_weight=self.DISLIKE_WEIGHT)
+        total = np.asarray(abs(weights).sum(axis=1)).ravel()
+        total[total == 0] = 1.0
+        profiles = sparse.diags(1.0 / total) @ (weights @ features)
+        return profiles.tocsr(), weights
+    
+    def build_all_profiles(self, all_movies):
+        """Refresh profiles for all users at once, returning (rating_matrix, profiles)"""
+        _, features = self.build_item_features(all_movies)
+        rating_matrix = self.get_rating_matrix(all_movies)
+        profiles, _ = self.build_user_profiles(rating_matrix, features)
+        return rating_matrix, profiles
+    
+    def rank_recommendations(self, similarities, rated_columns, item_ids, all_movies, top_n=10):
+        """Turn a similarity row into (sim, title, genres, imdb, year) tuples"""
+        similarities = np.array(similarities, dtype=np.float64)
+        similarities[rated_columns] = -np.inf
+        top_n = min(top_n, len(similarities) - len(rated_columns))
+        if top_n <= 0:
+            return []
+        top = np.argpartition(-similarities, top_n - 1)[:top_n]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        
+        recommendations = []
+        for idx in top:
+            movie_data = all_movies[item_ids[idx]]
+            recommendations.append((
+                float(similarities[idx]),
+                movie_data["Series_Title"],
+                movie_data["Genre"],
+                movie_data.get('IMDB_Rating', 'N/A'),
+                movie_data['Released_Year']
+            ))
+        return recommendations
+    
+    def get_stored_recommendations(self, username, user_ratings, all_movies, top_n=10):
+        """Precomputed recommendations from the batch job, or None if missing or stale"""
+        if self._store is None:
+            self._store = RecommendationStore()
+        stored = self._store.lookup(username, user_ratings, top_n)
+        if not stored:
+            return None
+        
+        recommendations = []
+        for movie_id, score in stored:
+            movie_data = all_movies.get(movie_id)
+            if movie_data is None:
+                # Catalog changed since the job ran
+                return None
+            recommendations.append((score, movie_data["Series_Title"], movie_data["Genre"],
+                                    movie_data.get('IMDB_Rating', 'N/A'), movie_data['Released_Year']))
+        return recommendations
+    
+    def get_recommendations(self, user_ratings, all_movies, top_n=10, username=None, now=None):
+        """Get AI-based movie recommendations (now: the time review ages are measured from)"""
         try:
-            # Prepare data for recommendations
-            movie_list = []
-            for movie_id, movie in all_movies.items():
-                movie_list.append({
-                    "movie_id": movie_id,
-                    "title": movie["Series_Title"],
-                    "genres": movie["Genre"]
-                })
-            movies_df = pd.DataFrame(movie_list)
+            if username is not None and any(entry["rating"] >= 6 for entry in user_ratings):
+                stored = self.get_stored_recommendations(username, user_ratings, all_movies, top_n)
+                if stored:
+                    return stored, None
             
-            # Get user ratings dataframe
-            user_ratings_df = pd.DataFrame(user_ratings)
+            item_ids, features = self.build_item_features(all_movies)
             
-            # TF-IDF vectorization
-            tfidf = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = tfidf.fit_transform(movies_df['genres'])
-            
-            # Find liked movies (rating >= 6)
-            liked_movie_indices = []
-            for idx, row in user_ratings_df.iterrows():
-                if row["rating"] >= 6:
-                    movie_idx = movies_df[movies_df["movie_id"] == row["movie_id"]].index
-                    if len(movie_idx) > 0:
-                        liked_movie_indices.append(movie_idx[0])
+            # Weighted profile: rating above/below neutral, decayed by review age
+            user_matrix = RatingMatrix.from_user_ratings(None, user_ratings, item_ids, now=now)
+            profiles, weights = self.build_user_profiles(user_matrix, features)
             
-            if not liked_movie_indices:
+            if not (weights.data > 0).any():
                 return None, "Rate some movies with 6+ stars to get better recommendations!"
             
-            # Create user profile
-            user_profile = tfidf_matrix[liked_movie_indices].mean(axis=0).A1
-            
             # Calculate similarities
-            similarities = cosine_similarity([user_profile], tfidf_matrix).flatten()
-            
-            # Get recommendations
-            recommendations = []
-            rated_movie_ids = [rating["movie_id"] for rating in user_ratings]
-            
-            for idx, sim in enumerate(similarities):
-                movie_id = movies_df.iloc[idx]["movie_id"]
-                if movie_id not in rated_movie_ids:
-                    movie_data = all_movies[movie_id]
-                    recommendations.append((
-                        sim, 
-                        movies_df.iloc[idx]["title"], 
-                        movies_df.iloc[idx]["genres"],
-                        movie_data.get('IMDB_Rating', 'N/A'),
-                        movie_data['Released_Year']
-                    ))
+            similarities = cosine_similarity(profiles, features).ravel()
             
-            recommendations.sort(reverse=True, key=lambda x: x[0])
-            return recommendations[:top_n], None
+            recommendations = self.rank_recommendations(
+                similarities, user_matrix.rated_items(0), item_ids, all_movies, top_n
+            )
+            return recommendations, None
             
         except Exception as e:
-            return None, f"Failed to generate recommendations: {str(e)}"
\ No newline at end of file
+            return None, f"Failed to generate recommendations: {str(e)}"
@@ -0,0 +1,234 @@
+"""
+Analytics Export for Movie Review App
+
+Flattens the catalog into columnar tables (movies, movie_genres, reviews,
+users) stored as NumPy .npz files, or Parquet when pyarrow is installed.
+Strings that repeat (usernames, directors, genres) are dictionary encoded
+as integer codes, so reports run as vectorized group-bys over integer
+columns instead of Python loops over nested dicts.
+
+Usage:
+    python analytics.py export --out data/analytics
+    python analytics.py report --by genre
+    python analytics.py report --by director --min-reviews 10 --top 20
+"""
+import argparse
+import os
+import time
+import numpy as np
+from config import Config
+
+ANALYTICS_DIR = os.path.join(Config.DATA_DIR, "analytics")
+TABLES = ('movies', 'movie_genres', 'reviews', 'users')
+SENTIMENT_CODES = {'Negative': -1, 'Neutral': 0, 'Positive': 1}
+UNKNOWN_SENTIMENT = -2
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+def _number(value, default=np.nan):
+    """Parse a catalog field into a float, or default when missing"""
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return default
+
+def _encode(values):
+    """Dictionary-encode strings, returning (codes, vocabulary)"""
+    vocabulary, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return codes.astype(np.int32), vocabulary
+
+def flatten(movies, users):
+    """Build the columnar tables as {table: {column: array}}"""
+    movie_ids = list(movies)
+    genre_rows, genre_names = [], []
+    review_movie, review_user, ratings, dates, polarity, sentiment = [], [], [], [], [], []
+
+    for row, movie in enumerate(movies.values()):
+        for genre in movie.get('Genre', '').split(','):
+            if genre.strip():
+                genre_rows.append(row)
+                genre_names.append(genre.strip())
+        for review in movie.get('reviews', []):
+            review_movie.append(row)
+            review_user.append(review['username'])
+            ratings.append(review['rating'])
+            dates.append(review['date'])
+            polarity.append(review.get('polarity', np.nan))
+            sentiment.append(SENTIMENT_CODES.get(review.get('sentiment'), UNKNOWN_SENTIMENT))
+
+    director_codes, directors = _encode([m.get('Director', '') for m in movies.values()])
+    genre_codes, genres = _encode(genre_names)
+    usernames = sorted(set(users) | set(review_user))
+    user_index = {username: i for i, username in enumerate(usernames)}
+
+    return {
+        'movies': {
+            'movie_id': np.array(movie_ids, dtype=str),
+            'title': np.array([m.get('Series_Title', '') for m in movies.values()], dtype=str),
+            'year': np.array([_number(m.get('Released_Year'), -1) for m in movies.values()], dtype=np.int16),
+            'imdb_rating': np.array([_number(m.get('IMDB_Rating')) for m in movies.values()], dtype=np.float32),
+            'votes': np.array([_number(m.get('No_of_Votes'), 0) for m in movies.values()], dtype=np.int64),
+            'director': director_codes,
+            'director_names': directors,
+        },
+        'movie_genres': {
+            'movie': np.array(genre_rows, dtype=np.int32),
+            'genre': genre_codes,
+            'genre_names': genres,
+        },
+        'reviews': {
+            'movie': np.array(review_movie, dtype=np.int32),
+            'user': np.array([user_index[u] for u in review_user], dtype=np.int32),
+            'rating': np.array(ratings, dtype=np.int8),
+            'date': np.array(dates, dtype='datetime64[s]'),
+            'polarity': np.array(polarity, dtype=np.float32),
+            'sentiment': np.array(sentiment, dtype=np.int8),
+        },
+        'users': {
+            'username': np.array(usernames, dtype=str),
+            'rated_movies': np.array([len(users.get(u, {}).get('rated_movies', [])) for u in usernames],
+                                     dtype=np.int32),
+        },
+    }
+
+def save_tables(tables, out_dir, fmt='npz'):
+    """Write one file per table; returns the paths"""
+    if fmt == 'parquet' and not PARQUET_AVAILABLE:
+        raise ValueError("Parquet export needs the 'pyarrow' package")
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, columns in tables.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == 'parquet':
+            import pandas as pd
+            # Vocabularies are shorter than the table, so each gets a file of its own
+            pd.DataFrame({k: v for k, v in columns.items() if not k.endswith('_names')}).to_parquet(path)
+            for vocab in (k for k in columns if k.endswith('_names')):
+                pd.DataFrame({vocab: columns[vocab]}).to_parquet(os.path.join(out_dir, f"{name}.{vocab}.parquet"))
+        else:
+            np.savez(path, **columns)
+        paths.append(path)
+    return paths
+
+def load_tables(out_dir):
+    """Read tables written by save_tables, whichever format they are in"""
+    tables = {}
+    for name in TABLES:
+        npz_path = os.path.join(out_dir, f"{name}.npz")
+        if os.path.exists(npz_path):
+            with np.load(npz_path) as data:
+                tables[name] = {column: data[column] for column in data.files}
+            continue
+        import pandas as pd
+        frame = pd.read_parquet(os.path.join(out_dir, f"{name}.parquet"))
+        tables[name] = {column: frame[column].to_numpy() for column in frame.columns}
+        prefix = f"{name}."
+        for file_name in os.listdir(out_dir):
+            if file_name.startswith(prefix) and file_name.endswith("_names.parquet"):
+                vocab = file_name[len(prefix):-len(".parquet")]
+                tables[name][vocab] = pd.read_parquet(os.path.join(out_dir, file_name))[vocab].to_numpy()
+    return tables
+
+def group_stats(keys, n_groups, ratings, polarity, sentiment):
+    """Per-group review count, rating mean/std, polarity mean and sentiment shares"""
+    ratings = ratings.astype(np.float64)
+    count = np.bincount(keys, minlength=n_groups)
+    safe = np.maximum(count, 1)
+    mean = np.bincount(keys, ratings, n_groups) / safe
+    variance = np.bincount(keys, ratings * ratings, n_groups) / safe - mean * mean
+    known_polarity = ~np.isnan(polarity)
+    polarity_count = np.bincount(keys[known_polarity], minlength=n_groups)
+    polarity_mean = np.bincount(keys[known_polarity], polarity[known_polarity], n_groups) / np.maximum(polarity_count, 1)
+    known = sentiment != UNKNOWN_SENTIMENT
+    known_count = np.maximum(np.bincount(keys[known], minlength=n_groups), 1)
+    return {
+        'reviews': count,
+        'mean_rating': np.where(count > 0, mean, np.nan),
+        'std_rating': np.sqrt(np.maximum(variance, 0)),
+        'mean_polarity': np.where(polarity_count > 0, polarity_mean, np.nan),
+        'positive_share': np.bincount(keys[sentiment == 1], minlength=n_groups) / known_count,
+        'negative_share': np.bincount(keys[sentiment == -1], minlength=n_groups) / known_count,
+    }
+
+def report(tables, by='genre'):
+    """Return (group labels, stats dict) for reviews grouped by genre, director or year"""
+    movies, reviews = tables['movies'], tables['reviews']
+    ratings, polarity, sentiment = reviews['rating'], reviews['polarity'], reviews['sentiment']
+
+    if by == 'director':
+        keys = movies['director'][reviews['movie']]
+        labels = movies['director_names']
+    elif by == 'year':
+        labels, year_codes = np.unique(movies['year'], return_inverse=True)
+        keys = year_codes.astype(np.int32)[reviews['movie']]
+    elif by == 'genre':
+        # Expand each review once per genre of its movie via CSR offsets
+        genres = tables['movie_genres']
+        order = np.argsort(genres['movie'], kind='stable')
+        genre_of = genres['genre'][order]
+        per_movie = np.bincount(genres['movie'], minlength=len(movies['movie_id']))
+        offsets = np.concatenate(([0], np.cumsum(per_movie)[:-1]))
+        repeat = per_movie[reviews['movie']]
+        review_index = np.repeat(np.arange(len(ratings)), repeat)
+        within = np.arange(repeat.sum()) - np.repeat(np.cumsum(repeat) - repeat, repeat)
+        keys = genre_of[offsets[reviews['movie']][review_index] + within]
+        ratings, polarity, sentiment = ratings[review_index], polarity[review_index], sentiment[review_index]
+        labels = genres['genre_names']
+    else:
+        raise ValueError(f"Unknown grouping '{by}' (choose from genre, director, year)")
+
+    return labels, group_stats(keys, len(labels), ratings, polarity, sentiment)
+
+def print_report(labels, stats, min_reviews=1, top=None, sort_by='reviews'):
+    """Print groups with at least min_reviews reviews, best first"""
+    rows = np.flatnonzero(stats['reviews'] >= min_reviews)
+    rows = rows[np.argsort(-np.nan_to_num(stats[sort_by][rows], nan=-np.inf), kind='stable')][:top]
+    print(f"{'group':<30}{'reviews':>9}{'mean':>7}{'std':>7}{'polarity':>10}{'pos %':>7}{'neg %':>7}")
+    for row in rows:
+        print(f"{str(labels[row])[:29]:<30}{stats['reviews'][row]:>9}{stats['mean_rating'][row]:>7.2f}"
+              f"{stats['std_rating'][row]:>7.2f}{stats['mean_polarity'][row]:>10.3f}"
+              f"{stats['positive_share'][row] * 100:>7.1f}{stats['negative_share'][row] * 100:>7.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar export and rating reports")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help="flatten the catalog into columnar tables")
+    export_parser.add_argument('--out', default=ANALYTICS_DIR, help="output directory")
+    export_parser.add_argument('--format', choices=['npz', 'parquet'], default='npz')
+
+    report_parser = commands.add_parser('report', help="rating and sentiment stats by group")
+    report_parser.add_argument('--dir', default=ANALYTICS_DIR, help="exported tables directory")
+    report_parser.add_argument('--by', choices=['genre', 'director', 'year'], default='genre')
+    report_parser.add_argument('--min-reviews', type=int, default=1)
+    report_parser.add_argument('--top', type=int, default=None)
+    report_parser.add_argument('--sort', choices=['reviews', 'mean_rating', 'mean_polarity'], default='reviews')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'export':
+        from data_manager import DataManager
+        data_manager = DataManager()
+        try:
+            tables = flatten(data_manager.load_movies(), data_manager.load_users())
+            paths = save_tables(tables, args.out, args.format)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Exported {len(tables['movies']['movie_id'])} movies and {len(tables['reviews']['rating'])} "
+              f"reviews to {', '.join(paths)} in {time.perf_counter() - start:.2f}s")
+    else:
+        try:
+            tables = load_tables(args.dir)
+        except FileNotFoundError:
+            parser.error(f"No exported tables in {args.dir}; run 'python analytics.py export' first")
+        labels, stats = report(tables, args.by)
+        print_report(labels, stats, args.min_reviews, args.top, args.sort)
+        print(f"\n{len(tables['reviews']['rating'])} reviews grouped by {args.by} "
+              f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+App Lock for Movie Review App
+
+The desktop app and the console app hold data/app.lock while they run
+(one process ID per line), so maintenance commands that rewrite
+movies.json or users.json can refuse to run underneath them instead of
+overwriting their writes.
+"""
+import os
+from config import Config
+
+APP_LOCK_FILE = os.path.join(Config.DATA_DIR, "app.lock")
+
+def _alive(pid):
+    """True if a process with this ID exists"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _holders(path):
+    """Live process IDs recorded in the lock file (stale entries are dropped)"""
+    try:
+        with open(path, 'r') as f:
+            lines = f.read().split()
+    except FileNotFoundError:
+        return []
+    pids = []
+    for line in lines:
+        try:
+            pid = int(line)
+        except ValueError:
+            continue
+        if pid not in pids and (pid == os.getpid() or _alive(pid)):
+            pids.append(pid)
+    return pids
+
+def _write(path, pids):
+    """Replace the lock file with these process IDs, or remove it if there are none"""
+    if not pids:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        f.write("\n".join(str(pid) for pid in pids))
+    os.replace(tmp_path, path)
+
+def running_pid(path=APP_LOCK_FILE):
+    """Process ID of another running app holding the lock, or None (stale locks are ignored)"""
+    others = [pid for pid in _holders(path) if pid != os.getpid()]
+    return others[0] if others else None
+
+def acquire(path=APP_LOCK_FILE):
+    """Record this process as a running app, keeping any others that hold the lock"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    pids = _holders(path)
+    if os.getpid() not in pids:
+        _write(path, pids + [os.getpid()])
+
+def release(path=APP_LOCK_FILE):
+    """Drop this process from the lock, removing the file once nobody holds it"""
+    pids = _holders(path)
+    if os.getpid() in pids:
+        _write(path, [pid for pid in pids if pid != os.getpid()])
@@ -4,8 +4,8 @@ Authentication Manager for Movie Review App
 from data_manager import DataManager
 
 class AuthManager:
-    def __init__(self):
-        self.data_manager = DataManager()
+    def __init__(self, data_manager=None):
+        self.data_manager = data_manager or DataManager()
         self.current_user = None
     
     def validate_username(self, username):
@@ -40,7 +40,7 @@ class AuthManager:
         if not username or not password:
             return False, "Please fill in all fields"
         
-        users = self.data_manager.load_users()
+        users = self.data_manager.snapshot().users
         username = username.strip().lower()
         
         if username in users and users[username]["password"] == password:
@@ -66,17 +66,15 @@ class AuthManager:
         if not valid:
             return False, message
         
-        users = self.data_manager.load_users()
+        users = self.data_manager.snapshot().users
         
         if username in users:
             return False, "Username already exists!"
         
-        users[username] = {
+        self.data_manager.add_user(username, {
             "password": password.strip(),
             "rated_movies": []
-        }
-        
-        self.data_manager.save_users(users)
+        })
         return True, "Registration successful! You can now login."
     
     def logout(self):
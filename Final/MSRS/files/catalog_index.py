@@ -0,0 +1,263 @@
+"""
+Catalog Index for Movie Review App
+
+Precomputed sort orders and bitset facet indexes over the movie catalog.
+Each movie gets a fixed position; a facet value maps to an int whose set
+bits are the positions of matching movies, so combined filters are plain
+bitwise ANDs.
+
+Searches read the index on a worker thread while review and movie events
+update it on the Tk thread, so updates and multi-step reads hold
+CatalogIndex.lock.
+"""
+import bisect
+import threading
+from aggregate_manager import AggregateManager
+
+def _number(value):
+    """Parse a catalog field into a float, or None when missing"""
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+class CatalogIndex:
+    SORT_KEYS = {
+        'Catalog order': None,
+        'Title': 'title',
+        'IMDB Rating': 'imdb',
+        'Metascore': 'meta',
+        'Year': 'year',
+        'Votes': 'votes',
+        'Gross': 'gross',
+        'Community Rating': 'community'
+    }
+    FACETS = ('genre', 'certificate', 'decade', 'director')
+
+    def __init__(self, movies=None):
+        self.aggregates = AggregateManager()
+        self.lock = threading.RLock()    # held by updates and by searches on worker threads
+        self._reset()
+        if movies:
+            self.build(movies)
+
+    def __getstate__(self):
+        """Pickled state without the lock"""
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled index with a fresh lock"""
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def _reset(self):
+        """Clear every index"""
+        self.ids = []
+        self.positions = {}
+        self.titles = []
+        self.labels = []
+        self.rows = []
+        self.values = {key: [] for key in self.SORT_KEYS.values() if key}
+        self.sorted = {key: [] for key in self.values}
+        self.ranks = {key: None for key in self.values}
+        self.facets = {name: {} for name in self.FACETS}
+        self.all_mask = 0
+
+    def build(self, movies):
+        """Build every index from a movies dict"""
+        self._reset()
+        facet_positions = {name: {} for name in self.FACETS}
+        for movie_id, movie in movies.items():
+            pos, facets = self._add(movie_id, movie)
+            for name, facet_values in facets.items():
+                for value in facet_values:
+                    facet_positions[name].setdefault(value, []).append(pos)
+
+        self.all_mask = (1 << len(self.ids)) - 1
+        for name, by_value in facet_positions.items():
+            self.facets[name] = {value: self.mask_from_positions(positions)
+                                 for value, positions in by_value.items()}
+        for key in self.sorted:
+            self.sorted[key] = sorted(range(len(self.ids)), key=lambda pos, k=key: self._sort_key(k, pos))
+
+    def _extract(self, movie):
+        """Sortable values and facet values for one movie"""
+        stats = self.aggregates.get_stats(movie)
+        year = _number(movie.get('Released_Year'))
+        values = {
+            'title': movie['Series_Title'].lower(),
+            'imdb': _number(movie.get('IMDB_Rating')),
+            'meta': _number(movie.get('Meta_score')),
+            'year': year,
+            'votes': _number(movie.get('No_of_Votes')),
+            'gross': _number(movie.get('Gross')),
+            'community': self.aggregates.average_rating(stats)
+        }
+        facets = {
+            'genre': [g.strip() for g in movie.get('Genre', '').split(',') if g.strip()],
+            'certificate': [movie.get('Certificate') or 'N/A'],
+            'decade': [f"{int(year) // 10 * 10}s"] if year else [],
+            'director': [movie.get('Director') or 'N/A']
+        }
+        return values, facets
+
+    def _display_row(self, movie):
+        """Listbox text for one movie"""
+        row = f"{movie['Series_Title']} ({movie['Released_Year']}) - IMDB: {movie.get('IMDB_Rating', 'N/A')}"
+        average = self.aggregates.average_rating(self.aggregates.get_stats(movie))
+        if average is not None:
+            row += f" | Users: {average:.1f}"
+        return row
+
+    def _sort_key(self, key, pos):
+        """Descending by value with missing values last (title ascending)"""
+        value = self.values[key][pos]
+        if key == 'title':
+            return (value, pos)
+        return (value is None, -(value or 0), self.values['title'][pos], pos)
+
+    def _add(self, movie_id, movie):
+        """Append a movie's position and sort values"""
+        pos = len(self.ids)
+        self.ids.append(movie_id)
+        self.positions[movie_id] = pos
+        self.titles.append(movie['Series_Title'].lower())
+        self.labels.append(f"{movie['Series_Title']} ({movie['Released_Year']})")
+        self.rows.append(self._display_row(movie))
+
+        values, facets = self._extract(movie)
+        for key, value in values.items():
+            self.values[key].append(value)
+        return pos, facets
+
+    def _resort(self, key, pos, insert_only=False):
+        """Move one position to its place in a sorted index"""
+        order = self.sorted[key]
+        if not insert_only:
+            order.remove(pos)
+        bisect.insort(order, pos, key=lambda p: self._sort_key(key, p))
+        self.ranks[key] = None
+
+    def add_movie(self, movie_id, movie):
+        """Index a newly added movie"""
+        with self.lock:
+            if movie_id in self.positions:
+                return self.replace_movie(movie_id, movie)
+            pos, facets = self._add(movie_id, movie)
+            for name, facet_values in facets.items():
+                for value in facet_values:
+                    self.facets[name][value] = self.facets[name].get(value, 0) | (1 << pos)
+            for key in self.sorted:
+                self._resort(key, pos, insert_only=True)
+            self.all_mask |= 1 << pos
+
+    def update_movie(self, movie_id, movie):
+        """Refresh the community rating and row of a movie after a review write"""
+        with self.lock:
+            pos = self.positions[movie_id]
+            self.rows[pos] = self._display_row(movie)
+            values, _ = self._extract(movie)
+            if values['community'] != self.values['community'][pos]:
+                self.values['community'][pos] = values['community']
+                self._resort('community', pos)
+
+    def replace_movie(self, movie_id, movie):
+        """Re-index every field of a movie whose metadata was overwritten"""
+        with self.lock:
+            pos = self.positions[movie_id]
+            bit = 1 << pos
+            self.titles[pos] = movie['Series_Title'].lower()
+            self.labels[pos] = f"{movie['Series_Title']} ({movie['Released_Year']})"
+            self.rows[pos] = self._display_row(movie)
+
+            values, facets = self._extract(movie)
+            for name, by_value in self.facets.items():
+                for value in [value for value, mask in by_value.items() if mask & bit]:
+                    by_value[value] &= ~bit
+                    if not by_value[value]:
+                        del by_value[value]
+                for value in facets[name]:
+                    by_value[value] = by_value.get(value, 0) | bit
+            # Titles break ties in every other order
+            title_changed = values['title'] != self.values['title'][pos]
+            for key, value in values.items():
+                if title_changed or value != self.values[key][pos]:
+                    self.values[key][pos] = value
+                    self._resort(key, pos)
+
+    def facet_values(self, name):
+        """Sorted list of values for a facet"""
+        return sorted(self.facets[name])
+
+    def facet_mask(self, name, value):
+        """Bitset of movies having a facet value"""
+        return self.facets[name].get(value, 0)
+
+    def mask_from_positions(self, positions):
+        """Bitset with the given positions set"""
+        data = bytearray((len(self.ids) + 7) // 8)
+        for pos in positions:
+            data[pos >> 3] |= 1 << (pos & 7)
+        return int.from_bytes(data, 'little')
+
+    def mask_from_ids(self, movie_ids):
+        """Bitset for a collection of movie IDs"""
+        positions = self.positions
+        return self.mask_from_positions(positions[movie_id] for movie_id in movie_ids
+                                        if movie_id in positions)
+
+    def title_mask(self, term, within=None):
+        """Bitset of movies whose title contains a substring, optionally only checking a bitset"""
+        term = term.lower()
+        titles = self.titles
+        if within is None:
+            return self.mask_from_positions(pos for pos, title in enumerate(titles) if term in title)
+        return self.mask_from_positions(pos for pos in self.iter_bits(within) if term in titles[pos])
+
+    @staticmethod
+    def iter_bits(mask):
+        """Yield set bit positions of a bitset in ascending order"""
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            if byte:
+                base = byte_index * 8
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield base + bit
+
+    def _rank(self, key):
+        """Position -> rank array for a sort key, rebuilt lazily"""
+        if self.ranks[key] is None:
+            ranks = [0] * len(self.ids)
+            for rank, pos in enumerate(self.sorted[key]):
+                ranks[pos] = rank
+            self.ranks[key] = ranks
+        return self.ranks[key]
+
+    def query(self, facets=None, sort_by=None, mask=None):
+        """Return movie IDs matching all facets (and an optional bitset), sorted"""
+        result = self.all_mask if mask is None else mask & self.all_mask
+        for name, value in (facets or {}).items():
+            if value:
+                result &= self.facet_mask(name, value)
+            if not result:
+                return []
+
+        key = self.SORT_KEYS.get(sort_by, sort_by)
+        if result == self.all_mask and key:
+            positions = self.sorted[key]
+        else:
+            positions = list(self.iter_bits(result))
+            if key:
+                positions.sort(key=self._rank(key).__getitem__)
+        return [self.ids[pos] for pos in positions]
+
+    def title_of(self, movie_id):
+        """Display title (with year) of an indexed movie"""
+        return self.labels[self.positions[movie_id]]
+
+    def display_row(self, movie_id):
+        """Listbox text for a movie ID"""
+        return self.rows[self.positions[movie_id]]
@@ -1,29 +1,78 @@
 """
 Movie Review App Configuration
+
+Settings are layered: the defaults below, then the selected profile, then
+a TOML or JSON settings file, then MSRS_* environment variables. They are
+applied and validated when this module is first imported, so every
+manager reads final values from Config.
+
+    MSRS_PROFILE=server            profile: desktop, server or benchmark
+    MSRS_CONFIG=path/to/file.toml  settings file (default: settings.toml or
+                                   settings.json in the working directory)
+    MSRS_TRANSLATION_ENABLED=0     any setting, by its upper-case name
 """
+import json
 import os
 
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
 class Config:
-    # Paths
+    # Profile applied on top of these defaults
+    PROFILE = "desktop"
+
+    # Paths (files default to DATA_DIR unless set explicitly)
     DATA_DIR = "data"
     USERS_FILE = os.path.join(DATA_DIR, "users.json")
     MOVIES_FILE = os.path.join(DATA_DIR, "movies.json")
-    
+    MOVIES_DIR = os.path.join(DATA_DIR, "movies")
+
+    # Catalog storage: "file" (one movies file) or "partitioned" (MOVIES_DIR holds
+    # STORAGE_PARTITIONS hash partitions of movie IDs plus a manifest)
+    STORAGE_BACKEND = "file"
+    STORAGE_PARTITIONS = 16
+
+    # Storage settings: "auto" (orjson if installed, else compact json), "json",
+    # "pretty", "orjson", "gzip" or "zstd". A .gz/.zst file extension takes precedence.
+    STORAGE_CODEC = "auto"
+
+    # Search settings
+    SEARCH_DEBOUNCE_MS = 150
+    # Pause in typing after which the quick rating suggestion is refined with the full analyzer
+    SUGGESTION_IDLE_MS = 800
+
+    # Analysis settings
+    TRANSLATION_ENABLED = True
+    SENTIMENT_CACHE_SIZE = 1000
+
+    # Recommendation settings
+    RECOMMENDATION_TOP_N = 10
+    RECOMMENDATIONS_STORED = 20
+
+    # Worker pools (BATCH_WORKERS None means one process per CPU)
+    UI_WORKERS = 2
+    BATCH_WORKERS = None
+
+    # Paging
+    REVIEWS_PAGE_SIZE = 20
+
     # Window settings
     WINDOW_WIDTH = 1200
     WINDOW_HEIGHT = 800
-    
+
     # Colors
     COLORS = {
         'bg_primary': '#1a1a2e',
-        'bg_secondary': '#16213e', 
+        'bg_secondary': '#16213e',
         'bg_tertiary': '#0f3460',
         'accent': '#e94560',
         'accent_hover': '#c73650',
         'text_primary': '#fff',
         'text_secondary': '#f5c518'
     }
-    
+
     # Fonts
     FONTS = {
         'title': ('Arial', 24, 'bold'),
@@ -31,4 +80,143 @@ class Config:
         'normal': ('Arial', 10),
         'button': ('Arial', 11, 'bold'),
         'entry': ('Arial', 12)
-    }
\ No newline at end of file
+    }
+
+    PROFILES = {
+        'desktop': {},
+        'server': {
+            'UI_WORKERS': 8,
+            'SENTIMENT_CACHE_SIZE': 100000,
+            'SEARCH_DEBOUNCE_MS': 0
+        },
+        'benchmark': {
+            'TRANSLATION_ENABLED': False,
+            'SENTIMENT_CACHE_SIZE': 0,
+            'SEARCH_DEBOUNCE_MS': 0,
+            'STORAGE_CODEC': 'json'
+        }
+    }
+
+    ENV_PREFIX = "MSRS_"
+    SETTINGS_FILES = ("settings.toml", "settings.json")
+    _defaults = None
+
+    @classmethod
+    def settings(cls):
+        """Names of all settings (upper-case attributes except the layering metadata)"""
+        return [name for name in vars(cls) if name.isupper() and name not in ('PROFILES', 'ENV_PREFIX', 'SETTINGS_FILES')]
+
+    @classmethod
+    def as_dict(cls):
+        """Current values of all settings"""
+        return {name: getattr(cls, name) for name in cls.settings()}
+
+    @classmethod
+    def _coerce(cls, name, value):
+        """Convert a file or environment value to the type of the default"""
+        default = cls._defaults[name]
+        if isinstance(value, str) and isinstance(default, dict):
+            value = json.loads(value)
+        if isinstance(value, str) and not isinstance(default, str):
+            text = value.strip().lower()
+            if isinstance(default, bool):
+                if text in ('1', 'true', 'yes', 'on'):
+                    return True
+                if text in ('0', 'false', 'no', 'off'):
+                    return False
+                raise ValueError(f"{name} must be true or false, got '{value}'")
+            if default is None or isinstance(default, int):
+                if default is None and text in ('', 'none', 'auto'):
+                    return None
+                try:
+                    return int(text)
+                except ValueError:
+                    raise ValueError(f"{name} must be an integer, got '{value}'") from None
+        if isinstance(default, dict) and isinstance(value, dict):
+            return {**default, **{k: tuple(v) if isinstance(v, list) else v for k, v in value.items()}}
+        return value
+
+    @classmethod
+    def _read_file(cls, path):
+        """Settings from a TOML or JSON file"""
+        if path.endswith('.toml'):
+            if tomllib is None:
+                raise ValueError(f"Reading {path} needs Python 3.11+ (tomllib); use a JSON settings file")
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        return {key.upper(): value for key, value in data.items()}
+
+    @classmethod
+    def load(cls, profile=None, path=None, environ=None):
+        """Apply defaults, profile, settings file and environment, then validate"""
+        if cls._defaults is None:
+            cls._defaults = cls.as_dict()
+        environ = os.environ if environ is None else environ
+
+        if path is None:
+            path = environ.get(cls.ENV_PREFIX + "CONFIG")
+            if path is None:
+                path = next((p for p in cls.SETTINGS_FILES if os.path.exists(p)), None)
+        file_settings = cls._read_file(path) if path else {}
+        env_settings = {name: environ[cls.ENV_PREFIX + name] for name in cls._defaults
+                        if cls.ENV_PREFIX + name in environ}
+
+        profile = profile or env_settings.get('PROFILE') or file_settings.get('PROFILE') or cls._defaults['PROFILE']
+        if profile not in cls.PROFILES:
+            raise ValueError(f"Unknown profile '{profile}' (choose from {', '.join(cls.PROFILES)})")
+
+        values = dict(cls._defaults)
+        for layer in (cls.PROFILES[profile], file_settings, env_settings):
+            for name, value in layer.items():
+                if name not in values:
+                    raise ValueError(f"Unknown setting '{name}'")
+                values[name] = cls._coerce(name, value)
+        values['PROFILE'] = profile
+
+        # File paths follow DATA_DIR unless they were set explicitly
+        explicit = set(cls.PROFILES[profile]) | set(file_settings) | set(env_settings)
+        for name, file_name in (('USERS_FILE', 'users.json'), ('MOVIES_FILE', 'movies.json'), ('MOVIES_DIR', 'movies')):
+            if name not in explicit:
+                values[name] = os.path.join(values['DATA_DIR'], file_name)
+
+        cls.validate(values)
+        for name, value in values.items():
+            setattr(cls, name, value)
+        return cls
+
+    @classmethod
+    def validate(cls, values):
+        """Raise ValueError listing every invalid setting"""
+        problems = []
+        def check(condition, message):
+            if not condition:
+                problems.append(message)
+
+        check(isinstance(values['DATA_DIR'], str) and values['DATA_DIR'], "DATA_DIR must be a non-empty path")
+        for name in ('USERS_FILE', 'MOVIES_FILE', 'MOVIES_DIR'):
+            check(isinstance(values[name], str) and values[name], f"{name} must be a non-empty path")
+        for name in ('SEARCH_DEBOUNCE_MS', 'SUGGESTION_IDLE_MS', 'SENTIMENT_CACHE_SIZE'):
+            check(isinstance(values[name], int) and values[name] >= 0, f"{name} must be an integer >= 0")
+        for name in ('RECOMMENDATION_TOP_N', 'RECOMMENDATIONS_STORED', 'UI_WORKERS', 'REVIEWS_PAGE_SIZE',
+                     'STORAGE_PARTITIONS'):
+            check(isinstance(values[name], int) and values[name] >= 1, f"{name} must be an integer >= 1")
+        check(values['BATCH_WORKERS'] is None or (isinstance(values['BATCH_WORKERS'], int) and values['BATCH_WORKERS'] >= 1),
+              "BATCH_WORKERS must be empty (one per CPU) or an integer >= 1")
+        check(isinstance(values['TRANSLATION_ENABLED'], bool), "TRANSLATION_ENABLED must be true or false")
+        check(values['STORAGE_BACKEND'] in ('file', 'partitioned'), "STORAGE_BACKEND must be 'file' or 'partitioned'")
+        for name in ('WINDOW_WIDTH', 'WINDOW_HEIGHT'):
+            check(isinstance(values[name], int) and values[name] >= 200, f"{name} must be an integer >= 200")
+
+        from storage_codecs import get_codec
+        try:
+            get_codec(values['STORAGE_CODEC'])
+        except ValueError as e:
+            problems.append(str(e))
+
+        if problems:
+            raise ValueError("Invalid configuration: " + "; ".join(problems))
+
+Config.load()
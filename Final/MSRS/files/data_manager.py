@@ -1,86 +1,500 @@
 """
 Data Manager for Movie Review App
+
+The catalog stays resident as a chain of immutable snapshots. Readers take
+the current snapshot and can use it for as long as they like; writers copy
+only what they change (the touched movie, its reviews list and stats, the
+touched user record, and the two top-level dicts), save the files, then
+publish the new snapshot with a single reference assignment. Readers never
+wait for a write, and a long job working from one snapshot sees one
+consistent version of the catalog throughout. Change events carry the
+snapshot the write produced, whose base_fingerprint tells subscribers
+which file state it was written over.
 """
-import json
+import bisect
+import copy
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from config import Config
+from aggregate_manager import AggregateManager
+from storage_codecs import codec_for_path, read_file, write_file
+from partitioned_store import MANIFEST_FILE, PartitionedStore, retire
+
+class ReviewIndex:
+    """Reviews keyed by user and by movie; never modified once published, like Snapshot"""
+    # Users and movies changed since the base dicts were built live in small delta dicts,
+    # so a write copies those rather than every key; past this many they are folded in
+    DELTA_LIMIT = 1024
+    __slots__ = ('by_user', 'by_movie', 'delta_by_user', 'delta_by_movie')
+
+    def __init__(self, by_user, by_movie, delta_by_user=None, delta_by_movie=None):
+        self.by_user = by_user      # username -> {movie_id: review}
+        self.by_movie = by_movie    # movie_id -> {username: review}
+        self.delta_by_user = delta_by_user or {}      # shadows by_user
+        self.delta_by_movie = delta_by_movie or {}    # shadows by_movie
+
+    @classmethod
+    def build(cls, movies, users):
+        """Index every review, ordering each user's reviews like their rated_movies"""
+        by_movie = {}
+        for movie_id, movie in movies.items():
+            reviews = by_movie[movie_id] = {}
+            for review in movie.get('reviews', []):
+                # Writers update the first review by a user, so a duplicate after it is ignored
+                reviews.setdefault(review['username'], review)
+        reviewed = {}
+        for movie_id, reviews in by_movie.items():
+            for username, review in reviews.items():
+                reviewed.setdefault(username, {})[movie_id] = review
+        by_user = {}
+        for username, reviews in reviewed.items():
+            rated = users.get(username, {}).get('rated_movies', [])
+            ordered = {movie_id: reviews[movie_id] for movie_id in rated if movie_id in reviews}
+            # Reviews missing from rated_movies (see maintenance integrity) go last, oldest first
+            for movie_id in sorted(reviews.keys() - ordered.keys(), key=lambda m: reviews[m]['date']):
+                ordered[movie_id] = reviews[movie_id]
+            by_user[username] = ordered
+        return cls(by_user, by_movie)
+
+    def _user(self, username):
+        """{movie_id: review} of a user"""
+        reviews = self.delta_by_user.get(username)
+        return self.by_user.get(username, {}) if reviews is None else reviews
+
+    def _movie(self, movie_id):
+        """{username: review} of a movie"""
+        reviews = self.delta_by_movie.get(movie_id)
+        return self.by_movie.get(movie_id, {}) if reviews is None else reviews
+
+    def get(self, username, movie_id):
+        """A user's review of a movie, or None"""
+        return self._user(username).get(movie_id)
+
+    def user_reviews(self, username):
+        """[(movie_id, review), ...] in the order the user rated them"""
+        return list(self._user(username).items())
+
+    def movie_reviews(self, movie_id):
+        """[(username, review), ...] in the movie's review order"""
+        return list(self._movie(movie_id).items())
+
+    def with_review(self, movie_id, username, review):
+        """New index with a review set (or removed when None), sharing everything else"""
+        delta_by_user, delta_by_movie = dict(self.delta_by_user), dict(self.delta_by_movie)
+        for delta, key, inner, inner_key in ((delta_by_user, username, self._user(username), movie_id),
+                                             (delta_by_movie, movie_id, self._movie(movie_id), username)):
+            inner = dict(inner)
+            if review is None:
+                inner.pop(inner_key, None)
+            else:
+                inner[inner_key] = review
+            delta[key] = inner
+        if len(delta_by_user) + len(delta_by_movie) > self.DELTA_LIMIT:
+            return ReviewIndex({**self.by_user, **delta_by_user}, {**self.by_movie, **delta_by_movie})
+        return ReviewIndex(self.by_user, self.by_movie, delta_by_user, delta_by_movie)
+
+class Snapshot:
+    """One published version of the catalog; its dicts must never be modified"""
+    __slots__ = ('version', 'movies', 'users', 'fingerprint', 'base_fingerprint', '_reviews', '_review_orders')
+
+    def __init__(self, version, movies, users, fingerprint, reviews=None, base_fingerprint=None):
+        self.version = version
+        self.movies = movies
+        self.users = users
+        self.fingerprint = fingerprint
+        # Fingerprint of the version this one was written on top of (None if read from the files)
+        self.base_fingerprint = base_fingerprint
+        self._reviews = reviews
+        self._review_orders = {}    # movie_id -> (keys, reviews) oldest first, for paging
+
+    @property
+    def reviews(self):
+        """ReviewIndex of this version, built on first use"""
+        if self._reviews is None:
+            self._reviews = ReviewIndex.build(self.movies, self.users)
+        return self._reviews
+
+    def review_of(self, username, movie_id):
+        """A user's review of a movie, found without building the index (writers hold the write lock)"""
+        if self._reviews is not None:
+            return self._reviews.get(username, movie_id)
+        return next((r for r in self.movies[movie_id]['reviews'] if r['username'] == username), None)
+
+    def reviews_with(self, movie_id, username, review):
+        """ReviewIndex for the next version, or None to build that lazily as well"""
+        if self._reviews is None:
+            return None
+        return self._reviews.with_review(movie_id, username, review)
+
+    def review_order(self, movie_id):
+        """([(date, username), ...], reviews) of a movie sorted oldest first, built on first use"""
+        order = self._review_orders.get(movie_id)
+        if order is None:
+            reviews = sorted(self.movies[movie_id]['reviews'], key=lambda r: (r['date'], r['username']))
+            order = ([(r['date'], r['username']) for r in reviews], reviews)
+            self._review_orders[movie_id] = order
+        return order
 
 class DataManager:
+    # Change events published to subscribers
+    REVIEW_ADDED = "review_added"
+    REVIEW_UPDATED = "review_updated"
+    REVIEW_REMOVED = "review_removed"
+    MOVIE_ADDED = "movie_added"
+    MOVIE_UPDATED = "movie_updated"
+    USER_REGISTERED = "user_registered"
+    
     def __init__(self):
         self.users_file = Config.USERS_FILE
         self.movies_file = Config.MOVIES_FILE
+        self.movies_dir = Config.MOVIES_DIR
         self.data_dir = Config.DATA_DIR
+        self.codec = Config.STORAGE_CODEC
+        self.backend = Config.STORAGE_BACKEND
+        self._store = None
+        self.aggregates = AggregateManager()
+        self.subscribers = {}
+        self._snapshot = None
+        self._version = 0
+        self._write_lock = threading.RLock()     # serializes writers only
+        self._writing = 0     # own writes between replacing files and publishing them
+        
+    def subscribe(self, event, callback):
+        """Call callback(event, payload) whenever event is published"""
+        self.subscribers.setdefault(event, []).append(callback)
+    
+    def unsubscribe(self, event, callback):
+        """Stop delivering an event to callback"""
+        if callback in self.subscribers.get(event, []):
+            self.subscribers[event].remove(callback)
+    
+    def publish(self, event, **payload):
+        """Notify subscribers of a change (runs in the writer's thread)"""
+        for callback in list(self.subscribers.get(event, [])):
+            callback(event, payload)
         
     def ensure_data_dir(self):
         """Ensure data directory exists"""
         os.makedirs(self.data_dir, exist_ok=True)
     
-    def load_users(self):
-        """Load users from JSON file"""
+    def read_data_file(self, path):
+        """Decode a data file in any supported format, or {} if it does not exist"""
         try:
-            with open(self.users_file, 'r') as f:
-                return json.load(f)
+            return read_file(path)
         except FileNotFoundError:
             return {}
     
-    def save_users(self, users):
-        """Save users to JSON file"""
+    def write_data_file(self, path, data):
+        """Encode a data file with the configured codec, replacing it atomically"""
         self.ensure_data_dir()
-        with open(self.users_file, 'w') as f:
-            json.dump(users, f, indent=4)
+        write_file(path, data, codec_for_path(path, self.codec))
+    
+    def load_users(self):
+        """Load users from the users file (a private copy the caller may modify)"""
+        return self.read_data_file(self.users_file)
+    
+    def save_users(self, users):
+        """Save users to the users file"""
+        with self._write_lock, self._own_write():
+            self.write_data_file(self.users_file, users)
+            self._snapshot = None
+    
+    def movie_store(self):
+        """The partitioned catalog, or None with the single-file backend"""
+        if self.backend != 'partitioned':
+            return None
+        if self._store is None or self._store.directory != self.movies_dir:
+            self._store = PartitionedStore(self.movies_dir, codec=self.codec)
+        return self._store
+    
+    def manifest_path(self):
+        """Manifest of the partitioned catalog, whichever backend is configured"""
+        return os.path.join(self.movies_dir, MANIFEST_FILE)
+    
+    def movies_paths(self):
+        """Files currently holding the catalog"""
+        store = self.movie_store()
+        if store is not None and store.exists():
+            return store.paths()
+        return [self.movies_file]
     
     def load_movies(self):
-        """Load movies from JSON file"""
-        try:
-            with open(self.movies_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+        """Load movies from the catalog files (a private copy the caller may modify)"""
+        store = self.movie_store()
+        if store is not None and store.exists():
+            return store.load()
+        # Until the first partitioned write, the single movies file is still the catalog
+        if store is None and not os.path.exists(self.movies_file) and os.path.exists(self.manifest_path()):
+            raise ValueError(f"{self.movies_file} is missing but {self.movies_dir} holds a partitioned catalog; "
+                             f"set STORAGE_BACKEND=partitioned or run partitioned_store.py join")
+        return self.read_data_file(self.movies_file)
     
     def save_movies(self, movies):
-        """Save movies to JSON file"""
-        self.ensure_data_dir()
-        with open(self.movies_file, 'w') as f:
-            json.dump(movies, f, indent=4)
+        """Save the whole catalog"""
+        with self._write_lock, self._own_write():
+            self.write_movies(movies)
+            self._snapshot = None
+    
+    def write_movies(self, movies, changed=None):
+        """Write the catalog (only partitions holding changed IDs when partitioned), returning the paths written"""
+        store = self.movie_store()
+        if store is None:
+            self.write_data_file(self.movies_file, movies)
+            # The other backend's copy is stale from now on
+            retire(self.manifest_path())
+            return [self.movies_file]
+        written = store.save(movies, changed)
+        retire(self.movies_file)
+        return written
+    
+    def file_fingerprint(self):
+        """[catalog, users] fingerprints from size, mtime and inode (atomic writes always change the inode)"""
+        def stat(path):
+            try:
+                result = os.stat(path)
+            except FileNotFoundError:
+                return None
+            return [result.st_size, result.st_mtime_ns, result.st_ino]
+        
+        movies_paths = self.movies_paths()
+        movies = stat(movies_paths[0]) if len(movies_paths) == 1 else [stat(path) for path in movies_paths]
+        return [movies, stat(self.users_file)]
     
-    def add_review_to_movie(self, movie_id, username, rating, content):
-        """Add or update a review for a movie"""
-        movies = self.load_movies()
-        users = self.load_users()
+    def snapshot(self):
+        """Current catalog version, re-read only when another process changed the files"""
+        # While this process is writing, the files run ahead of the snapshot until it publishes;
+        # readers keep the current version instead of waiting for the writer. Files, then the
+        # flag, then the snapshot: files newer than the snapshot read means the flag was set
+        fingerprint = self.file_fingerprint()
+        writing = self._writing
+        current = self._snapshot
+        if current is not None and (writing or current.fingerprint == fingerprint):
+            return current
+        with self._write_lock:
+            current = self._snapshot
+            fingerprint = self.file_fingerprint()
+            if current is None or current.fingerprint != fingerprint:
+                movies = self.load_movies()
+                for movie in movies.values():
+                    # Fill in missing stats now so readers never write into the snapshot
+                    self.aggregates.get_stats(movie)
+                current = self._publish(movies, self.load_users(), fingerprint)
+            return current
+    
+    @contextmanager
+    def _own_write(self):
+        """Mark this process's write in progress (held from the first file replaced until published)"""
+        self._writing += 1
+        try:
+            yield
+        finally:
+            self._writing -= 1
+
+    def _publish(self, movies, users, fingerprint=None, reviews=None, base=None):
+        """Make a new version current (fingerprint defaults to the files just written over base)"""
+        self._version += 1
+        self._snapshot = Snapshot(self._version, movies, users,
+                                  self.file_fingerprint() if fingerprint is None else fingerprint, reviews,
+                                  base.fingerprint if base is not None else None)
+        return self._snapshot
+
+    def add_movies(self, new_movies, overwrite=False):
+        """Add a batch of movies, returning (added, updated) counts"""
+        with self._write_lock:
+            base = self.snapshot()
+            movies = dict(base.movies)
+            added, updated = [], []
+
+            for movie_id, movie in new_movies.items():
+                if movie_id in movies:
+                    if not overwrite:
+                        continue
+                    # Keep existing reviews (and their stats) when refreshing metadata
+                    movie = dict(movie, reviews=movies[movie_id]['reviews'], stats=movies[movie_id]['stats'])
+                    updated.append(movie_id)
+                else:
+                    movie = dict(movie)
+                    self.aggregates.get_stats(movie)
+                    added.append(movie_id)
+                movies[movie_id] = movie
+
+            changed = added + updated
+            if not changed:
+                return 0, 0
+            # New movies normally arrive without reviews, so the review index carries over
+            carried = not any(new_movies[movie_id].get('reviews') for movie_id in changed)
+            with self._own_write():
+                self.write_movies(movies, changed)
+                snapshot = self._publish(movies, base.users, reviews=base._reviews if carried else None,
+                                         base=base)
+
+        for event, movie_ids in ((self.MOVIE_ADDED, added), (self.MOVIE_UPDATED, updated)):
+            for movie_id in movie_ids:
+                self.publish(event, movie_id=movie_id, movie=movies[movie_id], snapshot=snapshot)
+        return len(added), len(updated)
+
+    def add_review_to_movie(self, movie_id, username, rating, content, sentiment=None, polarity=None):
+        """Add or update a review for a movie, returning the updated movie"""
+        new_review = {
+            "username": username,
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "rating": rating,
+            "content": content
+        }
+        if sentiment is not None:
+            new_review["sentiment"] = sentiment
+            new_review["polarity"] = polarity
         
-        # Update or add review
-        all_reviews = movies[movie_id]['reviews']
-        for review in all_reviews:
-            if review['username'] == username:
-                review['rating'] = rating
-                review['content'] = content
-                review['date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                break
-        else:
-            movies[movie_id]['reviews'].append({
-                "username": username,
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "rating": rating,
-                "content": content
-            })
-            users[username]["rated_movies"].append(movie_id)
+        with self._write_lock:
+            base = self.snapshot()
+            old_movie = base.movies[movie_id]
+            stats = copy.deepcopy(self.aggregates.get_stats(old_movie))
+            movie = dict(old_movie, reviews=list(old_movie['reviews']), stats=stats)
+            movies = dict(base.movies)
+            movies[movie_id] = movie
+            users = base.users
+            
+            # Update or add review
+            old_review = base.review_of(username, movie_id)
+            all_reviews = movie['reviews']
+            if old_review is not None:
+                self.aggregates.replace_review(stats, old_review, new_review)
+                all_reviews[all_reviews.index(old_review)] = new_review
+            else:
+                all_reviews.append(new_review)
+                self.aggregates.add_review(stats, new_review)
+                users = dict(users)
+                record = users[username]
+                users[username] = dict(record, rated_movies=record["rated_movies"] + [movie_id])
+            
+            with self._own_write():
+                self.write_movies(movies, [movie_id])
+                if users is not base.users:
+                    self.write_data_file(self.users_file, users)
+                snapshot = self._publish(movies, users, reviews=base.reviews_with(movie_id, username, new_review),
+                                         base=base)
         
-        self.save_movies(movies)
-        self.save_users(users)
+        event = self.REVIEW_ADDED if old_review is None else self.REVIEW_UPDATED
+        self.publish(event, movie_id=movie_id, username=username, review=new_review,
+                     old_review=old_review, movie=movie, snapshot=snapshot)
+        return movie
+
+    def set_review_sentiments(self, updates):
+        """Store sentiment analyzed after reviews were saved, in one write; returns how many were stored"""
+        # updates: [(movie_id, username, review as analyzed, sentiment, polarity), ...]
+        with self._write_lock:
+            base = self.snapshot()
+            movies = dict(base.movies)
+            copied = set()
+            index = base._reviews
+            stored = []
+            for movie_id, username, review, sentiment, polarity in updates:
+                movie = movies.get(movie_id)
+                current = None if movie is None else next(
+                    (r for r in movie['reviews'] if r['username'] == username), None)
+                # Skipped if the review was edited, removed or analyzed meanwhile
+                if (current is None or 'sentiment' in current
+                        or (current['date'], current['content']) != (review['date'], review['content'])):
+                    continue
+                new_review = dict(current, sentiment=sentiment, polarity=polarity)
+                if movie_id not in copied:
+                    movie = dict(movie, reviews=list(movie['reviews']),
+                                 stats=copy.deepcopy(self.aggregates.get_stats(movie)))
+                    movies[movie_id] = movie
+                    copied.add(movie_id)
+                self.aggregates.replace_review(movie['stats'], current, new_review)
+                movie['reviews'][movie['reviews'].index(current)] = new_review
+                if index is not None:
+                    index = index.with_review(movie_id, username, new_review)
+                stored.append((movie_id, username, new_review, current))
+            
+            if not stored:
+                return 0
+            with self._own_write():
+                self.write_movies(movies, sorted(copied))
+                snapshot = self._publish(movies, base.users, reviews=index, base=base)
         
-    def get_user_reviews(self, username):
-        """Get all reviews for a specific user"""
-        users = self.load_users()
-        movies = self.load_movies()
+        for movie_id, username, new_review, current in stored:
+            self.publish(self.REVIEW_UPDATED, movie_id=movie_id, username=username, review=new_review,
+                         old_review=current, movie=movies[movie_id], snapshot=snapshot)
+        return len(stored)
+
+    def remove_review_from_movie(self, movie_id, username):
+        """Remove a user's review of a movie, returning True if one existed"""
+        with self._write_lock:
+            base = self.snapshot()
+            old_movie = base.movies[movie_id]
+            review = base.review_of(username, movie_id)
+            if review is None:
+                return False
+            i = old_movie['reviews'].index(review)
+            
+            stats = self.aggregates.remove_review(copy.deepcopy(self.aggregates.get_stats(old_movie)), review)
+            movie = dict(old_movie, reviews=old_movie['reviews'][:i] + old_movie['reviews'][i + 1:], stats=stats)
+            movies = dict(base.movies)
+            movies[movie_id] = movie
+            
+            users = base.users
+            if username in users and movie_id in users[username]["rated_movies"]:
+                users = dict(users)
+                rated = [m for m in users[username]["rated_movies"] if m != movie_id]
+                users[username] = dict(users[username], rated_movies=rated)
+            
+            with self._own_write():
+                self.write_movies(movies, [movie_id])
+                if users is not base.users:
+                    self.write_data_file(self.users_file, users)
+                snapshot = self._publish(movies, users, reviews=base.reviews_with(movie_id, username, None),
+                                         base=base)
         
-        user_reviews = []
-        if username in users:
-            for movie_id in users[username]["rated_movies"]:
-                if movie_id in movies:
-                    movie = movies[movie_id]
-                    for review in movie["reviews"]:
-                        if review["username"] == username:
-                            user_reviews.append((movie["Series_Title"], review))
+        self.publish(self.REVIEW_REMOVED, movie_id=movie_id, username=username, review=None,
+                     old_review=review, movie=movie, snapshot=snapshot)
+        return True
+
+    def add_user(self, username, record):
+        """Save a newly registered user"""
+        with self._write_lock:
+            base = self.snapshot()
+            users = dict(base.users)
+            users[username] = record
+            with self._own_write():
+                self.write_data_file(self.users_file, users)
+                snapshot = self._publish(base.movies, users, reviews=base._reviews, base=base)
+        self.publish(self.USER_REGISTERED, username=username, snapshot=snapshot)
+
+    def rebuild_aggregates(self):
+        """Recompute and save aggregates for the whole catalog"""
+        with self._write_lock:
+            movies = self.load_movies()
+            self.aggregates.rebuild_all(movies)
+            self.save_movies(movies)
+        return len(movies)
         
-        return user_reviews
\ No newline at end of file
+    def get_reviews_page(self, movie_id, cursor=None, limit=None, snapshot=None):
+        """Get a page of a movie's reviews newest first, returning (reviews, next_cursor)"""
+        limit = limit or Config.REVIEWS_PAGE_SIZE
+        # Paging one pinned snapshot keeps pages consistent and skips the file check
+        snapshot = snapshot or self.snapshot()
+        if movie_id not in snapshot.movies:
+            return [], None
+
+        keys, reviews = snapshot.review_order(movie_id)
+        end = len(keys)
+        if cursor is not None:
+            date, _, username = cursor.partition('|')
+            end = bisect.bisect_left(keys, (date, username))
+        start = max(0, end - limit)
+        page = reviews[start:end][::-1]
+        if not start:
+            return page, None
+
+        last = page[-1]
+        return page, f"{last['date']}|{last['username']}"
+
+    def get_user_reviews(self, username):
+        """Get all reviews for a specific user"""
+        snapshot = self.snapshot()
+        return [(movie_id, snapshot.movies[movie_id]["Series_Title"], review)
+                for movie_id, review in snapshot.reviews.user_reviews(username)]
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""
+Recommender Evaluation for Movie Review App
+
+Offline comparison of recommender engines. Reviews are split by time:
+everything before the cutoff trains the engine, and the movies each user
+rated 6+ after it are the ones it should have recommended. Reports
+precision@k, recall@k, catalog coverage, p50/p99 latency per request and
+the peak traced memory of fitting, on the real catalog or synthetic ones.
+Each engine is fitted once, with tracing on, so fit time includes the
+tracing overhead. Memory is traced in this process only: engines that
+fit in worker processes are marked in the report, since their workers'
+allocations are not counted.
+
+Every engine implements RecommenderEngine (fit on a movies dict, then
+recommend movie IDs for a user), so new engines can be compared side by
+side by adding them to ENGINES. The content engine is the app's own
+AIAnalyzer.get_recommendations, so changes to it show up here.
+
+Usage:
+    python evaluate_recommenders.py --k 10
+    python evaluate_recommenders.py --synthetic 1000,10000 --users 5000
+"""
+import argparse
+import time
+from abc import ABC, abstractmethod
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from rating_matrix import DATE_FORMAT
+
+LIKED_RATING = 6
+
+class RecommenderEngine(ABC):
+    """Common interface for evaluated recommenders"""
+    name = "base"
+    now = None      # cutoff time, set by evaluate()
+    multiprocess = False    # fit runs in worker processes that tracemalloc cannot see
+
+    @abstractmethod
+    def fit(self, movies):
+        """Train on a movies dict holding only training reviews"""
+
+    @abstractmethod
+    def recommend(self, username, user_ratings, top_n=10):
+        """Movie IDs best first, excluding movies in user_ratings"""
+
+def top_unrated(scores, rated_columns, item_ids, top_n):
+    """IDs of the top_n highest scores outside rated_columns"""
+    scores = np.array(scores, dtype=np.float64)
+    scores[rated_columns] = -np.inf
+    top_n = min(top_n, int(np.isfinite(scores).sum()))
+    if top_n <= 0:
+        return []
+    top = np.argpartition(-scores, top_n - 1)[:top_n]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [item_ids[i] for i in top]
+
+class PopularityEngine(RecommenderEngine):
+    """Most often liked movies, the same list for everyone"""
+    name = "popularity"
+
+    def fit(self, movies):
+        self.item_ids = list(movies)
+        self.item_index = {movie_id: i for i, movie_id in enumerate(self.item_ids)}
+        self.scores = np.array([sum(1 for r in movie['reviews'] if int(r['rating']) >= LIKED_RATING)
+                                for movie in movies.values()], dtype=np.float64)
+
+    def recommend(self, username, user_ratings, top_n=10):
+        rated = [self.item_index[e['movie_id']] for e in user_ratings if e['movie_id'] in self.item_index]
+        return top_unrated(self.scores, rated, self.item_ids, top_n)
+
+class ContentEngine(RecommenderEngine):
+    """AIAnalyzer.get_recommendations, the app's own recommender"""
+    name = "content"
+
+    def __init__(self):
+        # Imported here rather than in fit, so the import stays out of fit time and traced memory
+        from ai_analyzer import AIAnalyzer
+        self.analyzer_class = AIAnalyzer
+
+    def fit(self, movies):
+        # A fresh analyzer so its feature cache never outlives one training set
+        self.analyzer = self.analyzer_class()
+        self.movies = movies
+        self.analyzer.build_item_features(movies)
+        # Results come back as (score, title, genres, imdb, year); map them back to IDs
+        self.ids_by_label = {}
+        for movie_id, movie in movies.items():
+            self.ids_by_label.setdefault((movie['Series_Title'], movie['Released_Year']), []).append(movie_id)
+
+    def recommend(self, username, user_ratings, top_n=10):
+        # No username, so the batch job's stored results are never used instead
+        recommendations, _ = self.analyzer.get_recommendations(user_ratings, self.movies, top_n, now=self.now)
+        ids, used = [], set()
+        for _, title, _, _, year in recommendations or []:
+            # Same title and year: take the next ID not returned yet
+            movie_id = next((m for m in self.ids_by_label.get((title, year), []) if m not in used), None)
+            if movie_id is not None:
+                used.add(movie_id)
+                ids.append(movie_id)
+        return ids
+
+class NeighbourEngine(RecommenderEngine):
+    """Item-to-item scores from the similar_movies neighbour table"""
+    name = "neighbours"
+    multiprocess = True     # compute_neighbours fits on a process pool
+
+    def __init__(self, top_k=50, workers=None):
+        self.top_k = top_k
+        self.workers = workers
+
+    def fit(self, movies):
+        from similar_movies import compute_neighbours
+        ids, self.neighbours, self.similarities = compute_neighbours(movies, self.top_k, self.workers)
+        self.item_ids = ids.tolist()
+        self.item_index = {movie_id: i for i, movie_id in enumerate(self.item_ids)}
+
+    def recommend(self, username, user_ratings, top_n=10):
+        scores = np.zeros(len(self.item_ids))
+        rated = []
+        for entry in user_ratings:
+            row = self.item_index.get(entry['movie_id'])
+            if row is None:
+                continue
+            rated.append(row)
+            weight = (float(entry['rating']) - 5.5) / 4.5
+            valid = self.neighbours[row] >= 0
+            np.add.at(scores, self.neighbours[row][valid], weight * self.similarities[row][valid])
+        scores[scores <= 0] = -np.inf
+        return top_unrated(scores, rated, self.item_ids, top_n)
+
+ENGINES = {
+    'popularity': PopularityEngine,
+    'content': ContentEngine,
+    'neighbours': NeighbourEngine,
+}
+
+def time_split(movies, train_fraction=0.8):
+    """Split reviews at a date quantile; returns (cutoff, train_movies, test_liked)"""
+    dates = sorted(review['date'] for movie in movies.values() for review in movie['reviews'])
+    if not dates:
+        raise ValueError("The catalog has no reviews to evaluate on")
+    cutoff = dates[min(len(dates) - 1, int(len(dates) * train_fraction))]
+
+    train, test_liked = {}, {}
+    for movie_id, movie in movies.items():
+        kept = []
+        for review in movie['reviews']:
+            if review['date'] < cutoff:
+                kept.append(review)
+            elif int(review['rating']) >= LIKED_RATING:
+                test_liked.setdefault(review['username'], set()).add(movie_id)
+        train[movie_id] = {**movie, 'reviews': kept}
+    return datetime.strptime(cutoff, DATE_FORMAT), train, test_liked
+
+def training_ratings(train):
+    """username -> [{"movie_id", "rating", "date"}, ...] from the training reviews"""
+    ratings = {}
+    for movie_id, movie in train.items():
+        for review in movie['reviews']:
+            ratings.setdefault(review['username'], []).append(
+                {'movie_id': movie_id, 'rating': int(review['rating']), 'date': review['date']})
+    return ratings
+
+def evaluate(engine, movies, k=10, train_fraction=0.8, max_users=None):
+    """Fit and score one engine; returns a dict of metrics"""
+    cutoff, train, test_liked = time_split(movies, train_fraction)
+    history = training_ratings(train)
+    users = sorted(u for u in test_liked if u in history)[:max_users]
+    engine.now = cutoff
+
+    # Memory is traced during the one fit; requests run untraced so it stays out of the latencies
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        engine.fit(train)
+        fit_seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    precision, recall, latencies = [], [], []
+    recommended = set()
+    for username in users:
+        start = time.perf_counter()
+        items = engine.recommend(username, history[username], k)
+        latencies.append(time.perf_counter() - start)
+        hits = len(test_liked[username].intersection(items))
+        precision.append(hits / k)
+        recall.append(hits / len(test_liked[username]))
+        recommended.update(items)
+
+    latencies = np.array(latencies or [0.0]) * 1000
+    return {
+        'engine': engine.name + (" *" if engine.multiprocess else ""),
+        'users': len(users),
+        f'precision@{k}': float(np.mean(precision)) if precision else 0.0,
+        f'recall@{k}': float(np.mean(recall)) if recall else 0.0,
+        'coverage': len(recommended) / len(movies) if movies else 0.0,
+        'fit_s': fit_seconds,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'peak_mb': peak / 1e6,
+    }
+
+def print_report(title, results):
+    """Print one row per engine"""
+    print(f"\n{title}")
+    columns = list(results[0])
+    print("  ".join(f"{c:>12}" for c in columns))
+    for result in results:
+        print("  ".join(f"{v:>12.4f}" if isinstance(v, float) else f"{v:>12}" for v in result.values()))
+    if any(result['engine'].endswith(" *") for result in results):
+        print("* fits in worker processes: peak_mb covers this process only, not the workers")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare recommender engines offline")
+    parser.add_argument('--engines', default=",".join(ENGINES), help="comma-separated engine names")
+    parser.add_argument('--k', type=int, default=10, help="recommendations per user")
+    parser.add_argument('--train-fraction', type=float, default=0.8, help="share of reviews before the cutoff")
+    parser.add_argument('--max-users', type=int, default=None, help="evaluate at most this many users")
+    parser.add_argument('--synthetic', default=None,
+                        help="comma-separated synthetic catalog sizes instead of the real catalog")
+    parser.add_argument('--users', type=int, default=2000, help="users in synthetic catalogs")
+    parser.add_argument('--reviews-per-user', type=int, default=20, help="reviews per synthetic user")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)} (choose from {', '.join(ENGINES)})")
+
+    if args.synthetic:
+        from synthetic_data import synthetic_catalog
+        catalogs = [(f"synthetic {int(size)} movies, {args.users} users",
+                     synthetic_catalog(int(size), args.users, args.reviews_per_user)[0])
+                    for size in args.synthetic.split(",")]
+    else:
+        from data_manager import DataManager
+        catalogs = [("catalog", DataManager().load_movies())]
+
+    for title, movies in catalogs:
+        results = [evaluate(ENGINES[name](), movies, args.k, args.train_fraction, args.max_users)
+                   for name in names]
+        print_report(title, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Fuzzy Search for Movie Review App
+
+Typo-tolerant matching over titles, directors and stars using a trigram
+index. A candidate must share at least one of the query's rarest
+trigrams (prefix filtering), so a query only walks short posting lists
+and verifies a handful of candidates with set intersections.
+
+Searches run on a worker thread while new movies are added on the Tk
+thread, so both hold FuzzyIndex.lock.
+"""
+import math
+import re
+import threading
+import unicodedata
+
+PEOPLE_FIELDS = ('Director', 'Star1', 'Star2', 'Star3', 'Star4')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+class FuzzyIndex:
+    FIELD_WEIGHTS = {'title': 1.0, 'person': 0.9}
+
+    def __init__(self, movies=None, threshold=0.5):
+        self.threshold = threshold
+        self.entries = {}       # normalized text -> entry id
+        self.texts = []         # entry id -> normalized text
+        self.grams = []         # entry id -> trigram set
+        self.owners = []        # entry id -> {(movie_id, field), ...}
+        self.postings = {}      # trigram -> set of entry ids
+        self.movie_entries = {} # movie_id -> [(entry id, field), ...]
+        self.lock = threading.RLock()
+        if movies:
+            for movie_id, movie in movies.items():
+                self.add_movie(movie_id, movie)
+
+    def __getstate__(self):
+        """Pickled state without the lock"""
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled index with a fresh lock"""
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def normalize(text):
+        """Lowercase, strip accents and punctuation"""
+        text = text or ''
+        if not text.isascii():
+            text = unicodedata.normalize('NFKD', text)
+            text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+        text = text.lower().replace('&', ' and ')
+        return ' '.join(_NON_ALNUM.sub(' ', text).split())
+
+    @staticmethod
+    def trigrams(normalized):
+        """Word-padded trigrams of a normalized string"""
+        grams = set()
+        for word in normalized.split():
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def _add_entry(self, text, movie_id, field):
+        """Register text for a movie, sharing entries between movies"""
+        entry_id = self.entries.get(text)
+        if entry_id is None:
+            entry_id = len(self.texts)
+            self.entries[text] = entry_id
+            self.texts.append(text)
+            grams = self.trigrams(text)
+            self.grams.append(grams)
+            self.owners.append(set())
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(entry_id)
+        self.owners[entry_id].add((movie_id, field))
+        return entry_id
+
+    def add_movie(self, movie_id, movie):
+        """Index a movie's title and people"""
+        with self.lock:
+            if movie_id in self.movie_entries:
+                self.remove_movie(movie_id)
+
+            entries = []
+            title = self.normalize(movie.get('Series_Title'))
+            if title:
+                entries.append((self._add_entry(title, movie_id, 'title'), 'title'))
+            for field in PEOPLE_FIELDS:
+                name = self.normalize(movie.get(field))
+                if name:
+                    entries.append((self._add_entry(name, movie_id, 'person'), 'person'))
+            self.movie_entries[movie_id] = entries
+
+    def remove_movie(self, movie_id):
+        """Drop a movie from the index"""
+        with self.lock:
+            for entry_id, field in self.movie_entries.pop(movie_id, []):
+                owners = self.owners[entry_id]
+                owners.discard((movie_id, field))
+                if not owners:
+                    # Unlink the entry; its slot stays empty to keep ids stable
+                    for gram in self.grams[entry_id]:
+                        posting = self.postings.get(gram)
+                        if posting is not None:
+                            posting.discard(entry_id)
+                            if not posting:
+                                del self.postings[gram]
+                    del self.entries[self.texts[entry_id]]
+                    self.grams[entry_id] = set()
+
+    def search(self, query, limit=50):
+        """Return [(movie_id, score), ...] ranked by best matching field"""
+        query = self.normalize(query)
+        query_grams = self.trigrams(query)
+        if len(query) < 3 or not query_grams:
+            return []
+
+        with self.lock:
+            # Only the rarest grams can introduce candidates that reach the threshold
+            known = sorted((g for g in query_grams if g in self.postings),
+                           key=lambda g: len(self.postings[g]))
+            min_overlap = max(1, math.ceil(self.threshold * len(query_grams)))
+            prefix = len(known) - min_overlap + 1
+            candidates = set()
+            for gram in known[:prefix]:
+                candidates.update(self.postings[gram])
+
+            best = {}
+            for entry_id in candidates:
+                grams = self.grams[entry_id]
+                overlap = len(query_grams & grams)
+                if overlap < min_overlap:
+                    continue
+                # Containment of the query, with a small bonus for closer lengths
+                containment = overlap / len(query_grams)
+                jaccard = overlap / (len(query_grams) + len(grams) - overlap)
+                if query in self.texts[entry_id]:
+                    containment += 1.0
+                for movie_id, field in self.owners[entry_id]:
+                    score = (containment + 0.1 * jaccard) * self.FIELD_WEIGHTS[field]
+                    if score > best.get(movie_id, 0.0):
+                        best[movie_id] = score
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
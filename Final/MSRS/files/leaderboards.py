@@ -0,0 +1,230 @@
+"""
+Leaderboards for Movie Review App
+
+"Top rated by community" and "Most reviewed this week" rankings kept in
+heaps and patched per review write in O(log n): a moved or removed
+movie's old entry is left in place and skipped when read, and the heap
+is rebuilt once such stale entries outnumber live ones. Top rated ranks
+by a Bayesian average pulled towards a fixed prior, so one 10/10 review
+does not outrank a film with hundreds of good ones. Trending counts live
+in per-day buckets; a rolling window total per movie is adjusted as
+buckets enter and leave the window.
+
+State is persisted to data/leaderboards.json, stamped with the catalog
+fingerprint it reflects, so startup never scans reviews unless the
+catalog changed behind the app's back (importer, console, maintenance).
+The app follows its own writes through change events and saves once on
+exit rather than on every review.
+"""
+import heapq
+import json
+import os
+from datetime import date, datetime
+from config import Config
+
+LEADERBOARDS_FILE = os.path.join(Config.DATA_DIR, "leaderboards.json")
+
+def review_day(review):
+    """Day ordinal of a review's "%Y-%m-%d %H:%M:%S" date"""
+    return date.fromisoformat(review['date'][:10]).toordinal()
+
+class RankedSet:
+    """Items ordered by a sortable key (heap with lazy deletion, O(log n) insert/move)"""
+
+    def __init__(self):
+        self.keys = {}      # item -> (key, stamp) of its live heap entry
+        self.heap = []      # (key, item, stamp); entries that no longer match keys are stale
+        self.stamp = 0
+
+    def _live(self, entry):
+        """True if a heap entry is still the item's current one"""
+        return self.keys.get(entry[1]) == (entry[0], entry[2])
+
+    def set(self, item, key):
+        """Insert an item or move it to its new key"""
+        self.stamp += 1
+        self.keys[item] = (key, self.stamp)
+        heapq.heappush(self.heap, (key, item, self.stamp))
+        # Rebuild once stale entries outnumber live ones (amortized O(1) per write)
+        if len(self.heap) > 2 * len(self.keys) + 64:
+            self.heap = [entry for entry in self.heap if self._live(entry)]
+            heapq.heapify(self.heap)
+
+    def discard(self, item):
+        """Remove an item if present (its heap entry goes stale)"""
+        self.keys.pop(item, None)
+
+    def top(self, n):
+        """First n items in key order"""
+        heap = self.heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+        # Best-first walk down the heap tree: visits O(n + stale entries met) nodes
+        result = []
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier and len(result) < n:
+            entry, index = heapq.heappop(frontier)
+            if self._live(entry):
+                result.append(entry[1])
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
+class Leaderboards:
+    # Bayesian average: every movie starts with PRIOR_WEIGHT reviews of PRIOR_RATING
+    PRIOR_RATING = 5.5
+    PRIOR_WEIGHT = 5
+
+    def __init__(self, path=LEADERBOARDS_FILE, min_reviews=1, window_days=7):
+        self.path = path
+        self.min_reviews = min_reviews
+        self.window_days = window_days
+        self.fingerprint = None     # catalog fingerprint the state reflects, None if unknown
+        self._reset()
+
+    def _reset(self):
+        """Clear all rankings"""
+        self.rated = {}       # movie_id -> [rating_sum, count]
+        self.buckets = {}     # day ordinal -> {movie_id: review count}
+        self.weekly = {}      # movie_id -> reviews within the window
+        self.top_rated_set = RankedSet()
+        self.trending_set = RankedSet()
+        self.window_start = date.today().toordinal() - self.window_days + 1
+
+    # Top rated
+    def _update_rating(self, movie_id, rating_delta, count_delta):
+        """Adjust a movie's rating totals and reposition it"""
+        totals = self.rated.setdefault(movie_id, [0, 0])
+        totals[0] += rating_delta
+        totals[1] += count_delta
+        if totals[1] >= self.min_reviews and totals[1] > 0:
+            self.top_rated_set.set(movie_id, (-self.score(*totals), -totals[1]))
+        else:
+            self.top_rated_set.discard(movie_id)
+        if totals[1] <= 0:
+            del self.rated[movie_id]
+
+    def score(self, rating_sum, count):
+        """Ranking score: the average shrunk towards the prior for movies with few reviews"""
+        return (rating_sum + self.PRIOR_RATING * self.PRIOR_WEIGHT) / (count + self.PRIOR_WEIGHT)
+
+    # Trending
+    def _update_trending(self, movie_id, day, delta):
+        """Count a review write on a day"""
+        if day < self.window_start:
+            # Only days inside the window are kept
+            return
+        bucket = self.buckets.setdefault(day, {})
+        bucket[movie_id] = bucket.get(movie_id, 0) + delta
+        if bucket[movie_id] <= 0:
+            del bucket[movie_id]
+            if not bucket:
+                del self.buckets[day]
+        self._move_weekly(movie_id, delta)
+
+    def _move_weekly(self, movie_id, delta):
+        """Adjust a movie's rolling window count and reposition it"""
+        count = self.weekly.get(movie_id, 0) + delta
+        if count > 0:
+            self.weekly[movie_id] = count
+            self.trending_set.set(movie_id, -count)
+        else:
+            self.weekly.pop(movie_id, None)
+            self.trending_set.discard(movie_id)
+
+    def advance(self, today=None):
+        """Slide the trending window, expiring buckets that fell out of it"""
+        today = today or date.today().toordinal()
+        window_start = today - self.window_days + 1
+        if window_start <= self.window_start:
+            return
+        for day in [d for d in self.buckets if d < window_start]:
+            for movie_id, count in self.buckets.pop(day).items():
+                self._move_weekly(movie_id, -count)
+        self.window_start = window_start
+
+    # Writes
+    def add_review(self, movie_id, review):
+        """Account for a new review"""
+        self._update_rating(movie_id, int(review['rating']), 1)
+        self._update_trending(movie_id, review_day(review), 1)
+
+    def remove_review(self, movie_id, review):
+        """Forget a removed (or replaced) review"""
+        self._update_rating(movie_id, -int(review['rating']), -1)
+        self._update_trending(movie_id, review_day(review), -1)
+
+    def on_review_changed(self, event, payload):
+        """DataManager change-event handler"""
+        self.advance()
+        if payload['old_review'] is not None:
+            self.remove_review(payload['movie_id'], payload['old_review'])
+        if payload['review'] is not None:
+            self.add_review(payload['movie_id'], payload['review'])
+        # Follow the catalog only across writes made directly on top of our state
+        # (events of one batched write share a snapshot)
+        snapshot = payload['snapshot']
+        base = snapshot.base_fingerprint[0] if snapshot.base_fingerprint else None
+        if self.fingerprint != snapshot.fingerprint[0]:
+            self.fingerprint = snapshot.fingerprint[0] if base == self.fingerprint else None
+
+    # Reads
+    def top_rated(self, n=10):
+        """[(movie_id, average, count), ...] best first"""
+        return [(movie_id, self.rated[movie_id][0] / self.rated[movie_id][1], self.rated[movie_id][1])
+                for movie_id in self.top_rated_set.top(n)]
+
+    def trending(self, n=10):
+        """[(movie_id, reviews this window), ...] most reviewed first"""
+        self.advance()
+        return [(movie_id, self.weekly[movie_id]) for movie_id in self.trending_set.top(n)]
+
+    # Persistence
+    def rebuild(self, movies, fingerprint=None):
+        """Recompute everything from the catalog's reviews (fingerprint: the catalog's, if known)"""
+        self._reset()
+        for movie_id, movie in movies.items():
+            for review in movie.get('reviews', []):
+                self.add_review(movie_id, review)
+        self.fingerprint = fingerprint
+        return self
+
+    def save(self):
+        """Persist leaderboard state"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        state = {
+            'saved': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'fingerprint': self.fingerprint,
+            'rated': self.rated,
+            'buckets': {str(day): counts for day, counts in self.buckets.items()}
+        }
+        with open(self.path, 'w') as f:
+            json.dump(state, f)
+
+    def save_current(self, fingerprint):
+        """Save on exit if the state still matches the catalog files; returns True if saved"""
+        if self.fingerprint is None or self.fingerprint != fingerprint:
+            return False
+        self.save()
+        return True
+
+    def load(self, fingerprint=None):
+        """Restore persisted state, returning False if there is none (or it was saved for another catalog)"""
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if fingerprint is not None and state.get('fingerprint') != fingerprint:
+            return False
+
+        self._reset()
+        self.fingerprint = state.get('fingerprint')
+        for movie_id, (rating_sum, count) in state['rated'].items():
+            self._update_rating(movie_id, rating_sum, count)
+        for day, counts in state['buckets'].items():
+            for movie_id, count in counts.items():
+                self._update_trending(movie_id, int(day), count)
+        self.advance()
+        return True
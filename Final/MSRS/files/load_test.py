@@ -0,0 +1,249 @@
+"""
+Load Test for Movie Review App
+
+Drives AuthManager.register/login, DataManager.add_review_to_movie,
+get_user_reviews and recommendations from N concurrent threads or
+processes against a temporary copy of a synthetic catalog. Each worker
+plays its own users, so the final state is predictable: any review a
+worker wrote last that is missing from movies.json (or whose movie is
+missing from the user's rated_movies) counts as a lost update.
+
+Translation is stubbed out so results measure the app, not the network.
+
+Usage:
+    python load_test.py --workers 8 --operations 200
+    python load_test.py --workers 4 --mode process --mix review=50,my_reviews=30,recommend=20
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from data_manager import DataManager
+
+DEFAULT_MIX = {'register': 5, 'login': 20, 'review': 35, 'my_reviews': 25, 'recommend': 15}
+PASSWORD = "loadtest123"
+
+class StubTranslator:
+    """Stands in for GoogleTranslator; returns the text unchanged"""
+
+    def __init__(self, source='auto', target='en'):
+        pass
+
+    def translate(self, text):
+        return text
+
+class CountingDataManager(DataManager):
+    """DataManager that tallies bytes read from and written to its files"""
+
+    def __init__(self, data_dir):
+        super().__init__()
+        self.data_dir = data_dir
+        self.users_file = os.path.join(data_dir, "users.json")
+        self.movies_file = os.path.join(data_dir, "movies.json")
+        self.movies_dir = os.path.join(data_dir, "movies")
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def _size(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def load_users(self):
+        self.bytes_read += self._size(self.users_file)
+        return super().load_users()
+
+    def load_movies(self):
+        self.bytes_read += sum(self._size(path) for path in self.movies_paths())
+        return super().load_movies()
+
+    def write_data_file(self, path, data):
+        super().write_data_file(path, data)
+        self.bytes_written += self._size(path)
+
+    def write_movies(self, movies, changed=None):
+        paths = super().write_movies(movies, changed)
+        if self.movie_store() is not None:
+            # Partitions bypass write_data_file
+            self.bytes_written += sum(self._size(path) for path in paths)
+        return paths
+
+def run_worker(worker_id, data_dir, movie_ids, operations, mix, seed=0):
+    """Run one worker's operations; returns its measurements and expected writes"""
+    import ai_analyzer
+    from ai_analyzer import AIAnalyzer
+    from auth_manager import AuthManager
+    ai_analyzer.GoogleTranslator = StubTranslator
+
+    rng = random.Random(seed * 1000 + worker_id)
+    data_manager = CountingDataManager(data_dir)
+    auth = AuthManager(data_manager)
+    analyzer = AIAnalyzer()
+
+    users = []
+    expected = {}        # (movie_id, username) -> content of our last successful write
+    latencies = {op: [] for op in mix}
+    errors = {op: 0 for op in mix}
+    ops, weights = list(mix), list(mix.values())
+
+    def register():
+        username = f"load{worker_id:03d}x{len(users):05d}"
+        success, message = auth.register(username, PASSWORD)
+        if not success:
+            raise RuntimeError(message)
+        users.append(username)
+
+    def login():
+        success, message = auth.login(rng.choice(users), PASSWORD)
+        if not success:
+            raise RuntimeError(message)
+
+    def review():
+        username = rng.choice(users)
+        movie_id = rng.choice(movie_ids)
+        content = f"worker {worker_id} wrote {rng.random():.12f}"
+        _, sentiment, polarity = analyzer.suggest_rating_from_review(content)
+        data_manager.add_review_to_movie(movie_id, username, rng.randint(1, 10), content, sentiment, polarity)
+        expected[(movie_id, username)] = content
+
+    def my_reviews():
+        data_manager.get_user_reviews(rng.choice(users))
+
+    def recommend():
+        username = rng.choice(users)
+        user_ratings = [{'movie_id': movie_id, 'rating': review['rating'], 'date': review['date']}
+                        for movie_id, _, review in data_manager.get_user_reviews(username)]
+        if user_ratings:
+            analyzer.get_recommendations(user_ratings, data_manager.snapshot().movies, username=username)
+
+    actions = {'register': register, 'login': login, 'review': review,
+               'my_reviews': my_reviews, 'recommend': recommend}
+
+    # Every worker acts as its own users, so seed one before timing starts; it is
+    # not part of the measured mix, which may leave out 'register' entirely
+    try:
+        register()
+    except Exception:
+        pass        # later operations fail and are counted as errors
+
+    for _ in range(operations):
+        op = rng.choices(ops, weights)[0]
+        start = time.perf_counter()
+        try:
+            actions[op]()
+        except Exception:
+            errors[op] += 1
+        latencies[op].append(time.perf_counter() - start)
+
+    return {'latencies': latencies, 'errors': errors, 'expected': expected, 'users': users,
+            'bytes_read': data_manager.bytes_read, 'bytes_written': data_manager.bytes_written}
+
+def count_lost_updates(data_dir, results):
+    """(lost reviews, lost rated_movies entries, lost registrations, corrupt files) in the final state"""
+    data_manager = CountingDataManager(data_dir)
+    corrupt = []
+    try:
+        movies = data_manager.load_movies()
+    except ValueError:
+        # Interleaved writers left a torn file; everything in it counts as lost
+        movies = {}
+        corrupt.append(os.path.basename(data_manager.movies_paths()[0]))
+    try:
+        users = data_manager.load_users()
+    except ValueError:
+        users = {}
+        corrupt.append(os.path.basename(data_manager.users_file))
+
+    lost_reviews = lost_rated = lost_users = 0
+    for result in results:
+        lost_users += sum(1 for username in result['users'] if username not in users)
+        for (movie_id, username), content in result['expected'].items():
+            reviews = [r for r in movies.get(movie_id, {}).get('reviews', []) if r['username'] == username]
+            if not reviews or reviews[-1]['content'] != content:
+                lost_reviews += 1
+            if movie_id not in users.get(username, {}).get('rated_movies', []):
+                lost_rated += 1
+    return lost_reviews, lost_rated, lost_users, corrupt
+
+def prepare_data_dir(data_dir, titles, seed=0):
+    """Write a synthetic catalog without users into data_dir, returning its movie IDs"""
+    from synthetic_data import synthetic_movies
+    data_manager = CountingDataManager(data_dir)
+    movies = synthetic_movies(titles, seed)
+    data_manager.save_movies(movies)
+    data_manager.save_users({})
+    return list(movies)
+
+def parse_mix(text):
+    """"review=50,login=20" -> {"review": 50, "login": 20}"""
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        op = op.strip()
+        if op not in DEFAULT_MIX:
+            raise ValueError(f"unknown operation '{op}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[op] = float(weight or 1)
+    return mix
+
+def print_report(results, elapsed, lost):
+    """Throughput, per-operation latency percentiles, errors, lost updates and I/O"""
+    total = sum(len(v) for result in results for v in result['latencies'].values())
+    print(f"{total} operations in {elapsed:.2f}s = {total / elapsed:.1f} ops/s")
+    print(f"{'operation':<12}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for op in DEFAULT_MIX:
+        samples = [s for result in results for s in result['latencies'].get(op, [])]
+        if not samples:
+            continue
+        ms = np.array(samples) * 1000
+        failed = sum(result['errors'].get(op, 0) for result in results)
+        print(f"{op:<12}{len(ms):>8}{failed:>8}{np.percentile(ms, 50):>10.1f}{np.percentile(ms, 95):>10.1f}"
+              f"{np.percentile(ms, 99):>10.1f}{ms.max():>10.1f}")
+    lost_reviews, lost_rated, lost_users, corrupt = lost
+    print(f"lost updates: {lost_reviews} reviews, {lost_rated} rated_movies entries, {lost_users} registrations")
+    if corrupt:
+        print(f"corrupt after run: {', '.join(corrupt)}")
+    read = sum(result['bytes_read'] for result in results)
+    written = sum(result['bytes_written'] for result in results)
+    print(f"file I/O: {read / 1e6:.1f} MB read, {written / 1e6:.1f} MB written "
+          f"({written / max(total, 1) / 1e3:.1f} KB written per operation)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test against a temporary data directory")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent workers")
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--operations', type=int, default=100, help="operations per worker")
+    parser.add_argument('--mix', default=None, help="operation weights, e.g. review=50,login=20")
+    parser.add_argument('--titles', type=int, default=1000, help="synthetic catalog size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help="keep the temporary data directory")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX)
+    except ValueError as e:
+        parser.error(str(e))
+
+    data_dir = tempfile.mkdtemp(prefix="msrs-load-")
+    try:
+        movie_ids = prepare_data_dir(data_dir, args.titles, args.seed)
+        executor = ThreadPoolExecutor if args.mode == 'thread' else ProcessPoolExecutor
+        start = time.perf_counter()
+        with executor(max_workers=args.workers) as pool:
+            futures = [pool.submit(run_worker, worker_id, data_dir, movie_ids, args.operations, mix, args.seed)
+                       for worker_id in range(args.workers)]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        print_report(results, elapsed, count_lost_updates(data_dir, results))
+    finally:
+        if args.keep:
+            print(f"data left in {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 Main Application File for Movie Review System
 """
+import sys
 import tkinter as tk
 from tkinter import ttk
 from tkinter import scrolledtext
@@ -10,10 +11,24 @@ from styles_manager import StyleManager
 from ui_components import UIComponents
 from ai_analyzer import AIAnalyzer
 from auth_manager import AuthManager
+from catalog_index import CatalogIndex
+from task_runner import TaskRunner
+from search_scheduler import SearchScheduler
+from similar_movies import NeighbourTable
+from leaderboards import Leaderboards
+from memory_profile import MemoryProfiler
+from warm_start import WarmStartCache
+import app_lock
 
 class MovieReviewApp:
-    def __init__(self, root):
+    # Event handlers measured in memory profiling mode
+    PROFILED_HANDLERS = ['filter_movies', 'show_movie_details', 'rate_movie', 'load_user_reviews',
+                         'get_recommendations', 'search_reviews', 'show_leaderboards',
+                         'handle_login', 'handle_register', 'on_review_changed', 'on_movie_added']
+    
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler
         self.root.title("Movie & TV Series Review System")
         self.root.geometry(f"{Config.WINDOW_WIDTH}x{Config.WINDOW_HEIGHT}")
         self.root.configure(bg=Config.COLORS['bg_primary'])
@@ -23,7 +38,19 @@ class MovieReviewApp:
         self.style_manager = StyleManager()
         self.ui = UIComponents(self.root)
         self.ai_analyzer = AIAnalyzer()
-        self.auth_manager = AuthManager()
+        self.auth_manager = AuthManager(self.data_manager)
+        self.task_runner = TaskRunner(self.root, Config.UI_WORKERS)
+        # Refined rating suggestions translate, which cannot be cancelled once running,
+        # so they get their own worker instead of holding up searches and paging
+        self.suggestion_runner = TaskRunner(self.root, 1)
+        self.neighbour_table = NeighbourTable()
+        self.sentiment_pending = {}     # (movie_id, username, date) -> callbacks awaiting analysis
+        self.warm_start = WarmStartCache(self.data_manager)
+        
+        if profiler:
+            profiler.instrument(self.data_manager, "DataManager")
+            profiler.instrument(self.ai_analyzer, "AIAnalyzer")
+            profiler.instrument(self, "UI", self.PROFILED_HANDLERS)
         
         # Configure styles
         self.style_manager.setup_styles()
@@ -31,6 +58,14 @@ class MovieReviewApp:
         # Create main interface
         self.create_main_interface()
         
+        # Patch views when data changes
+        self.warm_start.track()
+        for event in (DataManager.REVIEW_ADDED, DataManager.REVIEW_UPDATED, DataManager.REVIEW_REMOVED):
+            self.data_manager.subscribe(event, self.on_leaderboard_review)
+            self.data_manager.subscribe(event, self.on_review_changed)
+        for event in (DataManager.MOVIE_ADDED, DataManager.MOVIE_UPDATED):
+            self.data_manager.subscribe(event, self.on_movie_added)
+        
         # Center the window
         self.center_window()
         
@@ -64,6 +99,8 @@ class MovieReviewApp:
         self.create_movies_tab()
         self.create_reviews_tab()
         self.create_recommendations_tab()
+        self.create_review_search_tab()
+        self.create_leaderboards_tab()
         
         # Update user status
         self.update_user_status()
@@ -77,10 +114,34 @@ class MovieReviewApp:
         list_frame = tk.Frame(movies_frame, bg=Config.COLORS['bg_secondary'], relief='raised', bd=1)
         list_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
+        # The catalog index is needed for the first listing; search indexes and
+        # recommender features arrive from the warm-start cache in the background
+        parts, _ = self.warm_start.get_many(['catalog_index'])
+        self.catalog_index = parts['catalog_index']
+        self.fuzzy_index = None
+        self.review_index = None
+        self.item_features = None
+        self.load_warm_parts(['fuzzy_index', 'review_index', 'item_features'])
+        # Leaderboards restore from their own file; stale ones are rebuilt off the Tk thread
+        self.leaderboards = Leaderboards()
+        if not self.leaderboards.load(self.data_manager.file_fingerprint()[0]):
+            self.load_leaderboards()
+        self.displayed_ids = []
+        self.displayed_positions = {}
+        self.search_scheduler = SearchScheduler(self.root, self.task_runner, self.run_search,
+                                                self.show_search_results, Config.SEARCH_DEBOUNCE_MS)
+        
         # Search frame
         self.search_var = tk.StringVar()
         search_frame = self.ui.create_search_frame(list_frame, self.search_var, self.filter_movies)
         
+        # Sort and facet filters
+        self.sort_var = tk.StringVar(value='Catalog order')
+        self.facet_vars = {name: tk.StringVar(value='All') for name in CatalogIndex.FACETS}
+        facet_options = {name: ['All'] + self.catalog_index.facet_values(name) for name in CatalogIndex.FACETS}
+        filter_frame = self.ui.create_filter_frame(list_frame, self.sort_var, list(CatalogIndex.SORT_KEYS),
+                                                   self.facet_vars, facet_options, self.filter_movies)
+        
         # Movies listbox with scrollbar
         self.movies_listbox = self.ui.create_movies_listbox(list_frame)
         
@@ -94,6 +155,46 @@ class MovieReviewApp:
         # Load movies
         self.load_movies_list()
         
+    def load_warm_parts(self, names, retry=True):
+        """Load or rebuild warm-start parts off the Tk thread, then install them"""
+        def install(result):
+            parts, fingerprint = result
+            if fingerprint != self.warm_start.fingerprint and retry:
+                # A write landed while they were loading, so they missed its event; one more
+                # try, then they are installed as they are rather than loading forever
+                self.load_warm_parts(names, retry=False)
+                return
+            for name, part in parts.items():
+                setattr(self, name, part)
+            if 'item_features' in parts:
+                self.ai_analyzer.restore_item_features(*parts['item_features'], self.data_manager.snapshot().movies)
+            if 'fuzzy_index' in parts and self.search_var.get().strip():
+                self.filter_movies()
+        
+        self.task_runner.submit(self.warm_start.get_many, names, callback=install)
+    
+    def load_leaderboards(self, retry=True):
+        """Rebuild stale leaderboards off the Tk thread, then show them"""
+        def build():
+            snapshot = self.data_manager.snapshot()
+            boards = Leaderboards().rebuild(snapshot.movies, snapshot.fingerprint[0])
+            boards.save()
+            return boards
+        
+        def install(boards):
+            if boards.fingerprint != self.data_manager.file_fingerprint()[0] and retry:
+                # A write landed during the rebuild and went to the placeholder instead
+                self.load_leaderboards(retry=False)
+                return
+            self.leaderboards = boards
+            self.show_leaderboards()
+        
+        self.task_runner.submit(build, callback=install)
+    
+    def on_leaderboard_review(self, event, payload):
+        """Forward a review write to whichever leaderboards are installed"""
+        self.leaderboards.on_review_changed(event, payload)
+    
     def create_reviews_tab(self):
         """Create user reviews tab"""
         reviews_frame = tk.Frame(self.notebook, bg=Config.COLORS['bg_primary'])
@@ -108,6 +209,8 @@ class MovieReviewApp:
         self.reviews_text.pack(fill='both', expand=True, padx=15, pady=15)
         self.reviews_text.tag_configure('movie_title', font=('Arial', 16, 'bold'), 
                                       foreground=Config.COLORS['accent'])
+        self.user_review_count = 0
+        self.review_blocks_inserted = 0
         
     def create_recommendations_tab(self):
         """Create recommendations tab"""
@@ -130,6 +233,117 @@ class MovieReviewApp:
         self.rec_text = self.ui.create_scrolled_text(rec_container)
         self.rec_text.pack(fill='both', expand=True, padx=15, pady=(0, 15))
         
+    def create_review_search_tab(self):
+        """Create full-text review search tab"""
+        search_tab = tk.Frame(self.notebook, bg=Config.COLORS['bg_primary'])
+        self.notebook.add(search_tab, text='Search Reviews')
+        
+        container = tk.Frame(search_tab, bg=Config.COLORS['bg_secondary'], relief='raised', bd=1)
+        container.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        # Query and filters
+        query_frame = tk.Frame(container, bg=Config.COLORS['bg_secondary'])
+        query_frame.pack(fill='x', padx=15, pady=15)
+        
+        ttk.Label(query_frame, text='Search Reviews (use "quotes" for phrases):', 
+                 style='Modern2.TLabel').pack(side='left')
+        self.review_query = ttk.Entry(query_frame, style='Modern.TEntry', font=Config.FONTS['normal'])
+        self.review_query.pack(side='left', padx=(10, 0), fill='x', expand=True)
+        self.review_query.bind('<Return>', self.search_reviews)
+        
+        filter_frame = tk.Frame(container, bg=Config.COLORS['bg_secondary'])
+        filter_frame.pack(fill='x', padx=15, pady=(0, 15))
+        
+        ratings = [str(i) for i in range(1, 11)]
+        self.review_min_rating = tk.StringVar(value='1')
+        self.review_max_rating = tk.StringVar(value='10')
+        self.review_sentiment = tk.StringVar(value='All')
+        self.review_mine_only = tk.BooleanVar(value=False)
+        
+        for label, var, values in (("Min rating:", self.review_min_rating, ratings),
+                                   ("Max rating:", self.review_max_rating, ratings),
+                                   ("Sentiment:", self.review_sentiment, ['All', 'Positive', 'Neutral', 'Negative', 'Unknown'])):
+            ttk.Label(filter_frame, text=label, style='Modern2.TLabel').pack(side='left')
+            ttk.Combobox(filter_frame, textvariable=var, values=values, 
+                         state='readonly', width=9).pack(side='left', padx=(5, 15))
+        ttk.Checkbutton(filter_frame, text="My reviews only", 
+                        variable=self.review_mine_only).pack(side='left')
+        ttk.Button(filter_frame, text="Search", command=self.search_reviews, 
+                  style='Accent.TButton').pack(side='right')
+        
+        # Results
+        self.review_results = self.ui.create_scrolled_text(container)
+        self.review_results.pack(fill='both', expand=True, padx=15, pady=(0, 15))
+        self.review_results.tag_configure('movie_title', font=('Arial', 12, 'bold'), 
+                                          foreground=Config.COLORS['accent'])
+        self.review_results.tag_configure('reviewinfo', foreground=Config.COLORS['text_secondary'])
+    
+    def create_leaderboards_tab(self):
+        """Create top rated and trending leaderboards tab"""
+        boards_frame = tk.Frame(self.notebook, bg=Config.COLORS['bg_primary'])
+        self.notebook.add(boards_frame, text='Leaderboards')
+        
+        self.leaderboard_texts = {}
+        for key, title in (('top_rated', 'Top Rated by Community'), ('trending', 'Most Reviewed This Week')):
+            panel = tk.Frame(boards_frame, bg=Config.COLORS['bg_secondary'], relief='raised', bd=1)
+            panel.pack(side='left', fill='both', expand=True, padx=10, pady=10)
+            ttk.Label(panel, text=title, style='Modern2.TLabel').pack(pady=(15, 5))
+            text = self.ui.create_scrolled_text(panel)
+            text.pack(fill='both', expand=True, padx=15, pady=(0, 15))
+            self.leaderboard_texts[key] = text
+        
+        self.show_leaderboards()
+    
+    def show_leaderboards(self):
+        """Render the leaderboard panels"""
+        lines = {
+            'top_rated': [f"{i}. {self.catalog_index.title_of(movie_id)}\n   {average:.1f}/10 from {count} reviews\n\n"
+                          for i, (movie_id, average, count) in enumerate(self.leaderboards.top_rated(10), 1)
+                          if movie_id in self.catalog_index.positions],
+            'trending': [f"{i}. {self.catalog_index.title_of(movie_id)}\n   {count} reviews this week\n\n"
+                         for i, (movie_id, count) in enumerate(self.leaderboards.trending(10), 1)
+                         if movie_id in self.catalog_index.positions]
+        }
+        for key, text in self.leaderboard_texts.items():
+            text.config(state='normal')
+            text.delete(1.0, tk.END)
+            text.insert(tk.END, "".join(lines[key]) or "No reviews yet.")
+            text.config(state='disabled')
+    
+    def search_reviews(self, event=None):
+        """Run a full-text review search"""
+        query = self.review_query.get().strip()
+        sentiment = self.review_sentiment.get()
+        username = None
+        if self.review_mine_only.get():
+            if not self.auth_manager.is_logged_in():
+                tk.messagebox.showwarning("Warning", "Please login first!")
+                return
+            username = self.auth_manager.get_current_user()
+        if self.review_index is None:
+            tk.messagebox.showinfo("Search Reviews", "The review index is still loading, try again in a moment.")
+            return
+        
+        results = self.review_index.search(
+            query,
+            username=username,
+            min_rating=int(self.review_min_rating.get()),
+            max_rating=int(self.review_max_rating.get()),
+            sentiment=None if sentiment == 'All' else sentiment
+        ) if query else []
+        
+        self.review_results.config(state='normal')
+        self.review_results.delete(1.0, tk.END)
+        if not results:
+            self.review_results.insert(tk.END, "No matching reviews." if query else "Type a word or phrase to search.")
+        for score, info in results:
+            title = self.catalog_index.title_of(info['movie_id'])
+            self.review_results.insert(tk.END, f"{title}\n", 'movie_title')
+            self.review_results.insert(tk.END, f"{info['username']} | {info['date']} | {info['rating']}/10 "
+                                               f"| relevance {score:.2f}\n", 'reviewinfo')
+            self.review_results.insert(tk.END, f"{info['content']}\n" + "-" * 50 + "\n\n")
+        self.review_results.config(state='disabled')
+    
     def toggle_auth(self):
         """Toggle between login and logout"""
         if self.auth_manager.is_logged_in():
@@ -158,25 +372,85 @@ class MovieReviewApp:
         
     def load_movies_list(self):
         """Load movies into the listbox"""
-        movies = self.data_manager.load_movies()
-        self.movies_listbox.delete(0, tk.END)
-        
-        for movie_id, movie in movies.items():
-            title = f"{movie['Series_Title']} ({movie['Released_Year']}) - IMDB: {movie.get('IMDB_Rating', 'N/A')}"
-            self.movies_listbox.insert(tk.END, title)
+        self.search_scheduler.run_now(self.search_var.get().strip(), self.get_search_options())
+    
+    def get_search_options(self):
+        """Current sort and facet selections"""
+        facets = {name: var.get() for name, var in self.facet_vars.items() if var.get() != 'All'}
+        return {'sort_by': self.sort_var.get(), 'facets': facets}
     
     def filter_movies(self, event=None):
-        """Filter movies based on search term"""
-        search_term = self.search_var.get().lower()
-        movies = self.data_manager.load_movies()
-        
+        """Filter and sort movies based on search term and facets"""
+        # Typing is debounced; combobox changes apply right away
+        immediate = event is not None and getattr(event, 'type', None) != tk.EventType.KeyRelease
+        self.search_scheduler.request(self.search_var.get().strip(), self.get_search_options(), immediate)
+    
+    def run_search(self, search_term, options, previous):
+        """Compute the movie list for a search (runs off the Tk thread)"""
+        title_mask = None
+        relevance = {}
+        mask = None
+        # Typo-tolerant title/people matches, computed before taking the catalog lock
+        fuzzy_index = self.fuzzy_index
+        if search_term and fuzzy_index is not None:
+            relevance = dict(fuzzy_index.search(search_term))
+        
+        catalog_index = self.catalog_index
+        # The Tk thread updates the index on review and movie events
+        with catalog_index.lock:
+            if search_term:
+                within = None
+                if previous and previous['query'] and search_term.lower().startswith(previous['query'].lower()):
+                    # A longer query can only narrow the previous substring matches
+                    within = previous['title_mask']
+                title_mask = catalog_index.title_mask(search_term, within)
+                mask = title_mask | catalog_index.mask_from_ids(relevance)
+            
+            ids = catalog_index.query(options['facets'], options['sort_by'], mask)
+            if relevance and CatalogIndex.SORT_KEYS.get(options['sort_by']) is None:
+                # Without an explicit sort, best matches come first
+                ids.sort(key=lambda movie_id: -relevance.get(movie_id, 2.0))
+            
+            rows = [catalog_index.display_row(movie_id) for movie_id in ids]
+        return {'query': search_term, 'title_mask': title_mask, 'ids': ids, 'rows': rows}
+    
+    def show_search_results(self, result):
+        """Show a search result in the movies listbox"""
+        self.displayed_ids = result['ids']
+        self.displayed_positions = {movie_id: i for i, movie_id in enumerate(self.displayed_ids)}
         self.movies_listbox.delete(0, tk.END)
-        
-        for movie_id, movie in movies.items():
-            title = movie['Series_Title'].lower()
-            if search_term in title:
-                display_title = f"{movie['Series_Title']} ({movie['Released_Year']}) - IMDB: {movie.get('IMDB_Rating', 'N/A')}"
-                self.movies_listbox.insert(tk.END, display_title)
+        if result['rows']:
+            self.movies_listbox.insert(tk.END, *result['rows'])
+    
+    def patch_movie_row(self, movie_id):
+        """Redraw one listbox row after its movie changed"""
+        index = self.displayed_positions.get(movie_id)
+        if index is None:
+            return
+        selected = index in self.movies_listbox.curselection()
+        self.movies_listbox.delete(index)
+        self.movies_listbox.insert(index, self.catalog_index.display_row(movie_id))
+        if selected:
+            self.movies_listbox.selection_set(index)
+    
+    def on_review_changed(self, event, payload):
+        """Patch the movies list and My Reviews after a review write"""
+        movie_id = payload['movie_id']
+        if self.review_index is not None:
+            self.review_index.on_review_changed(event, payload)
+        self.catalog_index.update_movie(movie_id, payload['movie'])
+        self.patch_movie_row(movie_id)
+        self.show_leaderboards()
+        if payload['username'] == self.auth_manager.get_current_user():
+            self.patch_user_review(event, movie_id, payload['movie']['Series_Title'], payload['review'])
+    
+    def on_movie_added(self, event, payload):
+        """Index a new or overwritten movie and schedule a refresh of the current listing"""
+        self.catalog_index.add_movie(payload['movie_id'], payload['movie'])
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add_movie(payload['movie_id'], payload['movie'])
+        # Debounced, so a bulk import refreshes the listing once rather than once per movie
+        self.search_scheduler.refresh(self.search_var.get().strip(), self.get_search_options())
     
     def show_login_dialog(self):
         """Show login/register dialog"""
@@ -247,9 +521,10 @@ class MovieReviewApp:
             tk.messagebox.showwarning("Warning", "Please select a movie first")
             return
 
-        movies = self.data_manager.load_movies()
-        movie_list = list(movies.items())
-        movie_id, movie_data = movie_list[selection[0]]
+        # Review pages come from this snapshot too, so they match the header
+        snapshot = self.data_manager.snapshot()
+        movie_id = self.displayed_ids[selection[0]]
+        movie_data = snapshot.movies[movie_id]
 
         details_window = self.ui.create_movie_details_window(self.root, movie_data['Series_Title'])
         
@@ -296,11 +571,28 @@ Overview:
                                font=('Arial', 10), justify='left', wraplength=750)
         details_label.pack(padx=20, pady=20)
         
-        if movie_data['reviews']:
-            avg_rating = sum([review['rating'] for review in movie_data['reviews']]) / len(movie_data['reviews'])
-            avg_label = tk.Label(scrollable_frame, text=f"Average Rating: {avg_rating:.1f}/10", 
+        # Similar titles from the precomputed neighbour table
+        similar = [snapshot.movies[other_id] for other_id, _ in self.neighbour_table.similar(movie_id, 5)
+                   if other_id in snapshot.movies]
+        if similar:
+            similar_text = "Similar titles: " + ", ".join(f"{m['Series_Title']} ({m['Released_Year']})" for m in similar)
+            similar_label = tk.Label(scrollable_frame, text=similar_text, 
+                                     bg=Config.COLORS['bg_primary'], fg=Config.COLORS['text_primary'], 
+                                     font=('Arial', 10, 'italic'), justify='left', wraplength=750)
+            similar_label.pack(padx=20, pady=(0, 10), anchor='w')
+        
+        stats = self.data_manager.aggregates.get_stats(movie_data)
+        if stats['count']:
+            avg_rating = self.data_manager.aggregates.average_rating(stats)
+            # Reviews saved before sentiment was stored stay out of the mix
+            mix = ", ".join(f"{label}: {count}" for label, count in stats['sentiment'].items()
+                            if count and label != 'Unknown') or "not analyzed yet"
+            if stats['sentiment'].get('Unknown') and mix != "not analyzed yet":
+                mix += f" ({stats['sentiment']['Unknown']} not analyzed yet)"
+            avg_label = tk.Label(scrollable_frame, 
+                                 text=f"Average Rating: {avg_rating:.1f}/10 ({stats['count']} reviews)\nSentiment: {mix}", 
                                  bg=Config.COLORS['bg_primary'], fg=Config.COLORS['text_secondary'], 
-                                 font=('Arial', 12, 'bold'))
+                                 font=('Arial', 12, 'bold'), justify='left')
             avg_label.pack(padx=20, pady=(0, 10), anchor='w')
 
             reviews_box = scrolledtext.ScrolledText(
@@ -311,14 +603,56 @@ Overview:
             reviews_box.tag_configure('reviewinfo', font=('Arial', 10), foreground=Config.COLORS['text_secondary'])
             reviews_box.tag_configure('reviewtext', font=('Arial', 10), foreground='white')
 
-            for review in movie_data['reviews']:
-                sentiment, score = self.ai_analyzer.analyze_sentiment(review['content'])
-                reviews_box.insert(tk.END, f"{review['username']}", 'username')
-                reviews_box.insert(tk.END, f" | {review['date']} | {review['rating']}/10\n", 'reviewinfo')
-                reviews_box.insert(tk.END, f"Sentiment: {sentiment} ({score:.2f})\n", 'reviewinfo')
-                reviews_box.insert(tk.END, f"{review['content']}\n", 'reviewtext')
-                reviews_box.insert(tk.END, "-" * 50 + "\n\n", 'reviewinfo')
-            reviews_box.config(state='disabled')
+            page_state = {'cursor': None, 'done': False, 'loading': False, 'rendered': 0}
+            
+            def set_sentiment(tag, result):
+                sentiment, score = result
+                ranges = reviews_box.tag_ranges(tag)
+                if not ranges:
+                    return
+                reviews_box.config(state='normal')
+                reviews_box.delete(ranges[0], ranges[1])
+                reviews_box.insert(ranges[0], f"Sentiment: {sentiment} ({score:.2f})\n", ('reviewinfo', tag))
+                reviews_box.config(state='disabled')
+            
+            def render_page(result):
+                reviews, cursor = result
+                page_state['cursor'] = cursor
+                page_state['done'] = cursor is None
+                page_state['loading'] = False
+                
+                reviews_box.config(state='normal')
+                for review in reviews:
+                    tag = f"sentiment_{page_state['rendered']}"
+                    page_state['rendered'] += 1
+                    reviews_box.insert(tk.END, f"{review['username']}", 'username')
+                    reviews_box.insert(tk.END, f" | {review['date']} | {review['rating']}/10\n", 'reviewinfo')
+                    if 'sentiment' in review:
+                        reviews_box.insert(tk.END, f"Sentiment: {review['sentiment']} ({review['polarity']:.2f})\n", 'reviewinfo')
+                    else:
+                        # Fill in sentiment once the analyzer finishes (shown only, see analyze_review)
+                        reviews_box.insert(tk.END, "Sentiment: analyzing...\n", ('reviewinfo', tag))
+                        self.analyze_review(movie_id, review, lambda res, t=tag: set_sentiment(t, res))
+                    reviews_box.insert(tk.END, f"{review['content']}\n", 'reviewtext')
+                    reviews_box.insert(tk.END, "-" * 50 + "\n\n", 'reviewinfo')
+                reviews_box.config(state='disabled')
+            
+            def page_failed(exception):
+                # Let the next scroll retry the same page
+                page_state['loading'] = False
+            
+            def on_scroll(first, last):
+                reviews_box.vbar.set(first, last)
+                # Fetch the next page when the bottom comes into view
+                if float(last) > 0.9 and not page_state['done'] and not page_state['loading']:
+                    page_state['loading'] = True
+                    self.task_runner.submit(self.data_manager.get_reviews_page, movie_id,
+                                            page_state['cursor'], snapshot=snapshot,
+                                            callback=render_page, error=page_failed)
+            
+            # First page paints immediately, the rest loads on scroll
+            render_page(self.data_manager.get_reviews_page(movie_id, snapshot=snapshot))
+            reviews_box.configure(yscrollcommand=on_scroll)
         else:
             no_reviews = tk.Label(scrollable_frame, text="No reviews yet.", 
                                  bg=Config.COLORS['bg_primary'], fg=Config.COLORS['text_primary'], 
@@ -340,13 +674,12 @@ Overview:
             tk.messagebox.showwarning("Warning", "Please select a movie first")
             return
         
-        movies = self.data_manager.load_movies()
-        movie_list = list(movies.items())
-        movie_id, movie_data = movie_list[selection[0]]
+        snapshot = self.data_manager.snapshot()
+        movie_id = self.displayed_ids[selection[0]]
+        movie_data = snapshot.movies[movie_id]
         
         # Check if already rated
-        users = self.data_manager.load_users()
-        if movie_id in users[self.auth_manager.get_current_user()]["rated_movies"]:
+        if snapshot.reviews.get(self.auth_manager.get_current_user(), movie_id) is not None:
             result = tk.messagebox.askyesno("Update Review", 
                                        "You've already rated this movie. Do you want to update your review?")
             if not result:
@@ -392,12 +725,56 @@ Overview:
                 style='Modern.TRadiobutton'
             ).pack(side='left', padx=5)
 
-        # Analyze button
+        # Live suggestion: a quick local score while typing, refined with the full
+        # analyzer (translation included) once typing pauses
+        shown = {'refined': None}
+        
+        def suggest(content, quick):
+            if not content:
+                return None
+            return content, quick, self.ai_analyzer.suggest_rating_from_review(content, quick=quick)
+        
+        def show_suggestion(result):
+            if result is None:
+                ai_label.config(text="AI Analysis will appear here")
+                return
+            content, quick, (suggested_rating, sentiment, polarity) = result
+            if quick and shown['refined'] == content:
+                # The refined result for this text is already shown
+                return
+            if not quick:
+                shown['refined'] = content
+            # Only a hint: the submitted rating is whatever the user picks
+            ai_label.config(text=f"AI Analysis{' (quick)' if quick else ''}: {sentiment} review "
+                                 f"| Suggested rating: {suggested_rating}/10")
+        
+        # Both run on worker threads; a newer keystroke drops their pending results
+        quick_scheduler = SearchScheduler(self.root, self.task_runner,
+                                          lambda content, options, previous: suggest(content, True),
+                                          show_suggestion, Config.SEARCH_DEBOUNCE_MS)
+        refine_scheduler = SearchScheduler(self.root, self.suggestion_runner,
+                                           lambda content, options, previous: suggest(content, False),
+                                           show_suggestion, Config.SUGGESTION_IDLE_MS)
+        
+        def on_text_changed(event=None):
+            review_text.edit_modified(False)
+            content = review_text.get("1.0", tk.END).strip()
+            quick_scheduler.request(content)
+            refine_scheduler.request(content)
+        
+        def stop_suggestions(event):
+            if event.widget is rating_dialog:
+                quick_scheduler.cancel()
+                refine_scheduler.cancel()
+        
+        review_text.bind('<<Modified>>', on_text_changed)
+        rating_dialog.bind('<Destroy>', stop_suggestions)
+        
+        # Analyze button refines right away instead of waiting for a pause
         def analyze_review():
             content = review_text.get("1.0", tk.END).strip()
             if content:
-                suggested_rating, sentiment, polarity = self.ai_analyzer.suggest_rating_from_review(content)
-                ai_label.config(text=f"AI Analysis: {sentiment} review | Suggested rating: {suggested_rating}/10")
+                refine_scheduler.request(content, immediate=True)
         
         ttk.Button(rating_dialog, text="Analyze Review", 
                   command=analyze_review, style='Secondary.TButton').pack(pady=10)
@@ -411,17 +788,19 @@ Overview:
             
             rating = rating_var.get()
             
-            # Add review through data manager
+            # Save right away; sentiment (which may translate over the network) is
+            # analyzed in the background and stored when it arrives. Views update via change events
             self.data_manager.add_review_to_movie(
                 movie_id, 
                 self.auth_manager.get_current_user(), 
                 rating, 
                 content
             )
+            self.analyze_review(movie_id, self.data_manager.snapshot().reviews.get(
+                self.auth_manager.get_current_user(), movie_id), store=True)
             
             rating_dialog.destroy()
             tk.messagebox.showinfo("Success", "Rating and review submitted successfully!")
-            self.load_user_reviews()
         
         ttk.Button(rating_dialog, text="Submit Review", 
                   command=submit_review, style='Accent.TButton').pack(pady=20)
@@ -432,6 +811,7 @@ Overview:
             return
         
         user_reviews = self.data_manager.get_user_reviews(self.auth_manager.get_current_user())
+        self.user_review_count = len(user_reviews)
         
         self.reviews_text.config(state='normal')
         self.reviews_text.delete(1.0, tk.END)
@@ -439,17 +819,97 @@ Overview:
         if not user_reviews:
             self.reviews_text.insert(tk.END, "You haven't reviewed any movies yet.\n\nStart by selecting a movie from the Movies tab and clicking 'Rate & Review'!")
         else:
-            self.reviews_text.insert(tk.END, f"Your Reviews ({len(user_reviews)} total)\n\n")
-            for title, review in user_reviews:
-                sentiment, score = self.ai_analyzer.analyze_sentiment(review['content'])
-                self.reviews_text.insert(tk.END, f"{title}\n", 'movie_title')
-                review_text = f"{review['date']}\n"
-                review_text += f"Rating: {review['rating']}/10\n"
-                review_text += f"Sentiment: {sentiment} ({score:.2f})\n"
-                review_text += f"Review: {review['content']}\n"
-                review_text += "=" * 60 + "\n\n"
-                self.reviews_text.insert(tk.END, review_text)
+            self.reviews_text.insert(tk.END, self.user_reviews_header(), 'reviews_header')
+            for movie_id, title, review in user_reviews:
+                self.insert_user_review(tk.END, movie_id, title, review)
+        
+        self.reviews_text.config(state='disabled')
+    
+    def user_reviews_header(self):
+        """Header line of the My Reviews tab"""
+        return f"Your Reviews ({self.user_review_count} total)\n\n"
+    
+    def insert_user_review(self, index, movie_id, title, review):
+        """Insert one review block, tagged by movie so it can be patched later"""
+        block = f"review_{movie_id}"
+        # Unique per insertion, so analysis of a since-replaced review finds no line to fill in
+        self.review_blocks_inserted += 1
+        sentiment_tag = f"review_sentiment_{self.review_blocks_inserted}"
+        if 'sentiment' in review:
+            sentiment_line = f"Sentiment: {review['sentiment']} ({review['polarity']:.2f})\n"
+        else:
+            sentiment_line = "Sentiment: analyzing...\n"
+            self.analyze_review(movie_id, review,
+                                lambda result: self.set_user_review_sentiment(sentiment_tag, result))
+        
+        self.reviews_text.insert(index,
+                                 f"{title}\n", ('movie_title', block),
+                                 f"{review['date']}\nRating: {review['rating']}/10\n", block,
+                                 sentiment_line, (block, sentiment_tag),
+                                 f"Review: {review['content']}\n" + "=" * 60 + "\n\n", block)
+    
+    def analyze_review(self, movie_id, review, callback=None, store=False):
+        """Analyze a saved review off the Tk thread; only new submissions (store=True) save the result"""
+        # Older reviews are analyzed for display only; maintenance.py sentiment backfills
+        # them in one write instead of a catalog save per review shown
+        key = (movie_id, review['username'], review['date'])
+        if key in self.sentiment_pending:
+            # Submitting and My Reviews both ask for a new review; analyze it once
+            self.sentiment_pending[key].append(callback)
+            return
+        self.sentiment_pending[key] = [callback]
+        
+        def done(result):
+            if store:
+                sentiment, polarity = result
+                self.data_manager.set_review_sentiments([(movie_id, review['username'], review, sentiment, polarity)])
+            for waiting in self.sentiment_pending.pop(key):
+                if waiting is not None:
+                    waiting(result)
+        
+        def failed(exception):
+            self.sentiment_pending.pop(key, None)
         
+        self.task_runner.submit(self.ai_analyzer.analyze_sentiment, review['content'], callback=done, error=failed)
+    
+    def set_user_review_sentiment(self, tag, result):
+        """Fill in a sentiment line once analysis finishes"""
+        ranges = self.reviews_text.tag_ranges(tag)
+        if not ranges:
+            return
+        sentiment, score = result
+        tags = self.reviews_text.tag_names(ranges[0])
+        self.reviews_text.config(state='normal')
+        self.reviews_text.delete(ranges[0], ranges[1])
+        self.reviews_text.insert(ranges[0], f"Sentiment: {sentiment} ({score:.2f})\n", tags)
+        self.reviews_text.config(state='disabled')
+    
+    def patch_user_review(self, event, movie_id, title, review):
+        """Add, replace or remove a single review block in My Reviews"""
+        block = f"review_{movie_id}"
+        if event == DataManager.REVIEW_ADDED:
+            self.user_review_count += 1
+        elif event == DataManager.REVIEW_REMOVED:
+            self.user_review_count -= 1
+        
+        if not self.reviews_text.tag_ranges('reviews_header') or not self.user_review_count:
+            # Switching between the empty message and the list
+            self.load_user_reviews()
+            return
+        
+        self.reviews_text.config(state='normal')
+        header = self.reviews_text.tag_ranges('reviews_header')
+        self.reviews_text.delete(header[0], header[1])
+        self.reviews_text.insert('1.0', self.user_reviews_header(), 'reviews_header')
+        
+        ranges = self.reviews_text.tag_ranges(block)
+        if ranges:
+            position = self.reviews_text.index(ranges[0])
+            self.reviews_text.delete(ranges[0], ranges[1])
+        else:
+            position = tk.END
+        if review is not None:
+            self.insert_user_review(position, movie_id, title, review)
         self.reviews_text.config(state='disabled')
     
     def get_recommendations(self):
@@ -458,11 +918,12 @@ Overview:
             tk.messagebox.showwarning("Warning", "Please login first!")
             return
         
-        users = self.data_manager.load_users()
-        movies = self.data_manager.load_movies()
-        rated_movies = users[self.auth_manager.get_current_user()]["rated_movies"]
+        # One snapshot for the whole request, however long scoring takes
+        snapshot = self.data_manager.snapshot()
+        movies = snapshot.movies
+        user_reviews = snapshot.reviews.user_reviews(self.auth_manager.get_current_user())
         
-        if not rated_movies:
+        if not user_reviews:
             self.rec_text.config(state='normal')
             self.rec_text.delete(1.0, tk.END)
             self.rec_text.insert(tk.END, "AI Recommendations\n\n")
@@ -473,15 +934,17 @@ Overview:
         
         # Get user ratings
         user_ratings = []
-        for movie_id in rated_movies:
-            for review in movies[movie_id]["reviews"]:
-                if review["username"] == self.auth_manager.get_current_user():
-                    user_ratings.append({
-                        "movie_id": movie_id,
-                        "rating": review["rating"]
-                    })
-        
-        recommendations, error = self.ai_analyzer.get_recommendations(user_ratings, movies)
+        for movie_id, review in user_reviews:
+            user_ratings.append({
+                "movie_id": movie_id,
+                "rating": review["rating"],
+                "date": review["date"]
+            })
+        
+        recommendations, error = self.ai_analyzer.get_recommendations(
+            user_ratings, movies, top_n=Config.RECOMMENDATION_TOP_N,
+            username=self.auth_manager.get_current_user()
+        )
         
         self.rec_text.config(state='normal')
         self.rec_text.delete(1.0, tk.END)
@@ -495,9 +958,9 @@ Overview:
         else:
             self.rec_text.insert(tk.END, "AI-Powered Movie Recommendations\n")
             self.rec_text.insert(tk.END, "Based on your viewing preferences and ratings\n\n")
-            self.rec_text.insert(tk.END, f"Top {min(10, len(recommendations))} Recommendations:\n\n")
+            self.rec_text.insert(tk.END, f"Top {len(recommendations)} Recommendations:\n\n")
             
-            for i, (sim, title, genres, imdb, year) in enumerate(recommendations[:10], 1):
+            for i, (sim, title, genres, imdb, year) in enumerate(recommendations, 1):
                 rec_text = f"{i}. {title} ({year})\n"
                 rec_text += f"   IMDB: {imdb} | {genres}\n"
                 rec_text += f"   Similarity Score: {sim:.2f}\n\n"
@@ -507,9 +970,24 @@ Overview:
     
     def run(self):
         """Start the application"""
-        self.root.mainloop()
+        # Maintenance commands that rewrite the data files refuse to run while this is held
+        app_lock.acquire()
+        try:
+            self.root.mainloop()
+            self.warm_start.save_current({name: getattr(self, name) for name in
+                                          ('catalog_index', 'fuzzy_index', 'review_index', 'item_features')})
+            self.leaderboards.save_current(self.data_manager.file_fingerprint()[0])
+        finally:
+            app_lock.release()
+        if self.profiler:
+            print(self.profiler.report())
 
 if __name__ == "__main__":
+    profiler = None
+    if "--profile-memory" in sys.argv:
+        profiler = MemoryProfiler()
+        profiler.start()
+    
     root = tk.Tk()
     root.withdraw()  # Hide window at first
     
@@ -523,5 +1001,5 @@ if __name__ == "__main__":
     root.geometry(f"{Config.WINDOW_WIDTH}x{Config.WINDOW_HEIGHT}+{x}+{y}")
     
     root.deiconify()  # Show window after centering
-    app = MovieReviewApp(root)
+    app = MovieReviewApp(root, profiler)
     app.run()
\ No newline at end of file
@@ -0,0 +1,489 @@
+"""
+Maintenance for Movie Review App
+
+Operations entry point for the data directory:
+
+    python maintenance.py rebuild [--only leaderboards,neighbours] [--jobs 4] [--force]
+    python maintenance.py verify [--only ...]
+    python maintenance.py integrity [--fix]
+    python maintenance.py sentiment [--limit 1000]
+    python maintenance.py compact
+
+rebuild refreshes review aggregates in movies.json, then rebuilds the
+derived artifacts (leaderboards, neighbour table, recommendation store,
+analytics tables, warm-start cache) concurrently, all from one catalog
+snapshot so they agree with each other even if reviews arrive meanwhile.
+The neighbour table and recommendation store each use a process pool of
+--workers processes, so those two run one after the other.
+Progress and timings are printed per task.
+Finished tasks are recorded in data/maintenance_state.json together with
+a fingerprint of movies.json and users.json, so an interrupted run picks
+up where it stopped and unchanged artifacts are skipped.
+
+Derived artifacts are written to temporary files and renamed into place,
+so rebuilding them while the app runs is safe. Commands that rewrite
+movies.json or users.json themselves (the aggregates task, integrity
+--fix and compact) load, modify and save the whole file and would drop
+reviews written meanwhile, so they refuse to run while the desktop app
+or a writing console app command holds data/app.lock; rebuild then
+skips the aggregates task. Other programs writing the data files are
+not covered. compact leaves the content unchanged, so it re-stamps the
+recorded fingerprints of derived artifacts instead of leaving them to
+look stale.
+
+sentiment analyzes reviews saved without a sentiment (the app only
+stores it for reviews submitted in it) and stores the results in one
+write; like compact it refuses to run while the app is open.
+"""
+import argparse
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime
+from config import Config
+from data_manager import DataManager
+from storage_codecs import read_file, write_file, JsonCodec
+import app_lock
+
+STATE_FILE = os.path.join(Config.DATA_DIR, "maintenance_state.json")
+STALE_TEMP_SECONDS = 3600
+
+_print_lock = threading.Lock()
+
+def log(message):
+    """Print a progress line (tasks run in several threads)"""
+    with _print_lock:
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}", flush=True)
+
+def save_atomically(path, save):
+    """Call save(temp_path) and rename the result over path"""
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{os.getpid()}{ext}"
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    try:
+        save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+class MaintenanceState:
+    """Per-task completion records, written after every task"""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            self.tasks = read_file(path)
+        except (FileNotFoundError, ValueError):
+            self.tasks = {}
+
+    def is_current(self, task, fingerprint):
+        """True if task last finished against the same source files"""
+        return self.tasks.get(task, {}).get('fingerprint') == fingerprint
+
+    def record(self, task, fingerprint, seconds):
+        """Mark a task finished"""
+        with self.lock:
+            self.tasks[task] = {'fingerprint': fingerprint, 'seconds': round(seconds, 3),
+                                'finished': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            write_file(self.path, self.tasks, JsonCodec())
+
+    def restamp(self, old, new):
+        """Move tasks recorded against old file fingerprints to new ones (content unchanged)"""
+        with self.lock:
+            for record in self.tasks.values():
+                if record.get('fingerprint') == old:
+                    record['fingerprint'] = new
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            write_file(self.path, self.tasks, JsonCodec())
+
+# Integrity of users[...]["rated_movies"] against reviews
+def check_integrity(movies, users):
+    """Return {issue: [(username, movie_id), ...]} for drift between users and reviews, and duplicate reviews"""
+    reviewed = {}
+    duplicate_reviews = []
+    for movie_id, movie in movies.items():
+        for review in movie.get('reviews', []):
+            dates = reviewed.setdefault(review['username'], {})
+            if movie_id in dates:
+                # The app only ever sees the first one (see ReviewIndex.build)
+                duplicate_reviews.append((review['username'], movie_id))
+            else:
+                dates[movie_id] = review['date']
+
+    issues = {'missing_from_rated_movies': [], 'rated_without_review': [],
+              'duplicate_rated_movies': [], 'reviews_by_unknown_user': [],
+              'duplicate_reviews': duplicate_reviews}
+    for username, record in users.items():
+        rated = record.get('rated_movies', [])
+        seen = set()
+        for movie_id in rated:
+            if movie_id in seen:
+                issues['duplicate_rated_movies'].append((username, movie_id))
+            seen.add(movie_id)
+            if movie_id not in reviewed.get(username, {}):
+                issues['rated_without_review'].append((username, movie_id))
+        for movie_id in reviewed.get(username, {}):
+            if movie_id not in seen:
+                issues['missing_from_rated_movies'].append((username, movie_id))
+    for username, movie_dates in reviewed.items():
+        if username not in users:
+            issues['reviews_by_unknown_user'].extend((username, m) for m in movie_dates)
+    return issues, reviewed
+
+def fix_integrity(data_manager):
+    """Rewrite rated_movies from actual reviews, returning the number of users changed"""
+    movies = data_manager.load_movies()
+    users = data_manager.load_users()
+    _, reviewed = check_integrity(movies, users)
+    changed = 0
+    for username, record in users.items():
+        dates = reviewed.get(username, {})
+        # Keep the existing order of valid entries; append missing ones by review date
+        rated = list(dict.fromkeys(m for m in record.get('rated_movies', []) if m in dates))
+        listed = set(rated)
+        rated += sorted((m for m in dates if m not in listed), key=dates.__getitem__)
+        if record.get('rated_movies') != rated:
+            record['rated_movies'] = rated
+            changed += 1
+    if changed:
+        data_manager.save_users(users)
+    return changed
+
+# Tasks: each returns a short summary line
+def task_aggregates(data_manager):
+    movies = data_manager.load_movies()
+    stale = sum(1 for movie in movies.values()
+                if movie.get('stats') != data_manager.aggregates.rebuild_movie(movie))
+    if stale:
+        count = data_manager.rebuild_aggregates()
+        return f"refreshed aggregates of {count} movies ({stale} were stale)"
+    return "aggregates already up to date"
+
+def task_leaderboards(data_manager, snapshot):
+    from leaderboards import Leaderboards, LEADERBOARDS_FILE
+    boards = Leaderboards().rebuild(snapshot.movies, snapshot.fingerprint[0])
+    def save(path):
+        boards.path = path
+        boards.save()
+    save_atomically(LEADERBOARDS_FILE, save)
+    return f"ranked {len(boards.rated)} rated movies, {len(boards.weekly)} trending"
+
+def task_neighbours(data_manager, snapshot, workers=None):
+    from similar_movies import compute_neighbours, NeighbourTable, NEIGHBOURS_FILE
+    movie_ids, neighbours, scores = compute_neighbours(snapshot.movies, workers=workers)
+    save_atomically(NEIGHBOURS_FILE, lambda path: NeighbourTable.save(path, movie_ids, neighbours, scores))
+    return f"neighbours for {len(movie_ids)} movies"
+
+def task_recommendations(data_manager, snapshot, workers=None):
+    from ai_analyzer import AIAnalyzer
+    from recommendation_job import compute_all, RecommendationStore, RECOMMENDATIONS_FILE
+    result = compute_all(AIAnalyzer(), snapshot.movies, Config.RECOMMENDATIONS_STORED, workers)
+    save_atomically(RECOMMENDATIONS_FILE, lambda path: RecommendationStore.save(path, *result))
+    return f"recommendations for {len(result[0])} users"
+
+def task_analytics(data_manager, snapshot):
+    from analytics import flatten, save_tables, ANALYTICS_DIR
+    tables = flatten(snapshot.movies, snapshot.users)
+    tmp_dir = f"{ANALYTICS_DIR}.tmp{os.getpid()}"
+    old_dir = f"{ANALYTICS_DIR}.old{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    save_tables(tables, tmp_dir)
+    # Swap the directory in; readers see either the old or the new tables
+    if os.path.exists(ANALYTICS_DIR):
+        os.replace(ANALYTICS_DIR, old_dir)
+    os.replace(tmp_dir, ANALYTICS_DIR)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return f"exported {len(tables['reviews']['rating'])} reviews"
+
+def task_warm_start(data_manager, snapshot):
+    from warm_start import WarmStartCache, PARTS
+    WarmStartCache(data_manager).rebuild(list(PARTS), snapshot.fingerprint[0], snapshot.movies)
+    return f"cached {', '.join(PARTS)}"
+
+DERIVED_TASKS = {
+    'leaderboards': task_leaderboards,
+    'neighbours': task_neighbours,
+    'recommendations': task_recommendations,
+    'analytics': task_analytics,
+    'warm_start': task_warm_start,
+}
+PARALLEL_TASKS = {'neighbours', 'recommendations'}     # take a worker count
+# Each pooled task sizes its process pool to the CPU count, so they take turns
+_pool_turn = threading.Lock()
+ALL_TASKS = ['aggregates'] + list(DERIVED_TASKS)
+
+# Verification: each returns a list of problems
+def verify_aggregates(data_manager, movies, users):
+    stale = [movie_id for movie_id, movie in movies.items()
+             if movie.get('stats') != data_manager.aggregates.rebuild_movie(movie)]
+    return [f"{len(stale)} movies have stale or missing aggregates"] if stale else []
+
+def verify_leaderboards(data_manager, movies, users):
+    from leaderboards import Leaderboards
+    saved = Leaderboards()
+    if not saved.load():
+        return ["leaderboards have not been built"]
+    fresh = Leaderboards().rebuild(movies)
+    problems = []
+    if saved.fingerprint != data_manager.file_fingerprint()[0]:
+        problems.append("leaderboards were saved for a different catalog version")
+    if saved.rated != fresh.rated:
+        problems.append("top rated totals differ from reviews")
+    if saved.weekly != fresh.weekly:
+        problems.append("trending counts differ from reviews")
+    return problems
+
+def verify_neighbours(data_manager, movies, users):
+    from similar_movies import NeighbourTable
+    table = NeighbourTable()
+    if table.ids is None:
+        return ["neighbour table has not been built"]
+    missing = len(set(movies) - set(table.positions))
+    return [f"neighbour table lacks {missing} movies"] if missing else []
+
+def verify_recommendations(data_manager, movies, users):
+    from recommendation_job import RecommendationStore, ratings_fingerprint
+    store = RecommendationStore()
+    if not store.user_rows:
+        return ["recommendation store has not been built"]
+    ratings = {}
+    for movie_id, movie in movies.items():
+        for review in movie.get('reviews', []):
+            ratings.setdefault(review['username'], []).append({'movie_id': movie_id, 'rating': review['rating']})
+    missing = [u for u in ratings if u not in store.user_rows]
+    stale = [u for u in ratings if u in store.user_rows
+             and store.fingerprints[store.user_rows[u]] != ratings_fingerprint(ratings[u])]
+    problems = []
+    if missing:
+        problems.append(f"{len(missing)} reviewers have no stored recommendations")
+    if stale:
+        problems.append(f"{len(stale)} users' stored recommendations are stale")
+    return problems
+
+def verify_analytics(data_manager, movies, users):
+    from analytics import load_tables, ANALYTICS_DIR
+    try:
+        tables = load_tables(ANALYTICS_DIR)
+    except (FileNotFoundError, ImportError):
+        return ["analytics tables have not been exported"]
+    reviews = sum(len(movie.get('reviews', [])) for movie in movies.values())
+    problems = []
+    if len(tables['movies']['movie_id']) != len(movies):
+        problems.append("analytics movie count differs from the catalog")
+    if len(tables['reviews']['rating']) != reviews:
+        problems.append("analytics review count differs from the catalog")
+    return problems
+
+def verify_warm_start(data_manager, movies, users):
+    from warm_start import WarmStartCache, PARTS
+    cache = WarmStartCache(data_manager)
+    stale = [name for name in PARTS if not cache.is_fresh(name)]
+    return [f"warm-start cache is stale for {', '.join(stale)}"] if stale else []
+
+def verify_integrity(data_manager, movies, users):
+    issues, _ = check_integrity(movies, users)
+    return [f"{len(pairs)} {issue.replace('_', ' ')}" for issue, pairs in issues.items() if pairs]
+
+VERIFIERS = {
+    'integrity': verify_integrity,
+    'aggregates': verify_aggregates,
+    'leaderboards': verify_leaderboards,
+    'neighbours': verify_neighbours,
+    'recommendations': verify_recommendations,
+    'analytics': verify_analytics,
+    'warm_start': verify_warm_start,
+}
+
+# Commands
+def run_task(name, data_manager, state, force, workers, snapshot=None):
+    """Run one task unless already current; returns (name, summary, seconds)"""
+    fingerprint = data_manager.file_fingerprint() if snapshot is None else snapshot.fingerprint
+    if not force and state.is_current(name, fingerprint):
+        log(f"skip  {name} (up to date)")
+        return name, "skipped", 0.0
+    with _pool_turn if name in PARALLEL_TASKS else nullcontext():
+        log(f"start {name}")
+        start = time.perf_counter()
+        if name == 'aggregates':
+            summary = task_aggregates(data_manager)
+        elif name in PARALLEL_TASKS:
+            summary = DERIVED_TASKS[name](data_manager, snapshot, workers)
+        else:
+            summary = DERIVED_TASKS[name](data_manager, snapshot)
+        seconds = time.perf_counter() - start
+    # Aggregates rewrite movies.json, so they record the fingerprint they leave behind
+    state.record(name, data_manager.file_fingerprint() if name == 'aggregates' else fingerprint, seconds)
+    log(f"done  {name} in {seconds:.2f}s: {summary}")
+    return name, summary, seconds
+
+def rebuild(data_manager, tasks, jobs=None, workers=None, force=False):
+    """Refresh aggregates, then rebuild derived artifacts concurrently"""
+    state = MaintenanceState()
+    start = time.perf_counter()
+    failures = []
+    if 'aggregates' in tasks:
+        pid = app_lock.running_pid()
+        if pid is not None:
+            log(f"skip  aggregates (the app is running as process {pid}; it would lose reviews written meanwhile)")
+        else:
+            run_task('aggregates', data_manager, state, force, workers)
+
+    derived = [name for name in tasks if name in DERIVED_TASKS]
+    snapshot = data_manager.snapshot()
+    with ThreadPoolExecutor(max_workers=jobs or len(derived) or 1) as pool:
+        futures = {pool.submit(run_task, name, data_manager, state, force, workers, snapshot): name
+                   for name in derived}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failures.append(name)
+                log(f"FAIL  {name}: {e}")
+            log(f"progress {done}/{len(derived)} artifacts")
+    log(f"rebuild finished in {time.perf_counter() - start:.2f}s"
+        + (f", failed: {', '.join(failures)}" if failures else ""))
+    return not failures
+
+def verify(data_manager, tasks):
+    """Check artifacts against the current data; returns True if all are consistent"""
+    snapshot = data_manager.snapshot()
+    movies, users = snapshot.movies, snapshot.users
+    ok = True
+    for name in tasks:
+        start = time.perf_counter()
+        problems = VERIFIERS[name](data_manager, movies, users)
+        status = "ok" if not problems else "; ".join(problems)
+        log(f"verify {name:<16}{status} ({time.perf_counter() - start:.2f}s)")
+        ok = ok and not problems
+    return ok
+
+def restamp(data_manager, old, new):
+    """Carry artifact fingerprints over a rewrite that kept the content (compact)"""
+    from warm_start import WarmStartCache
+    from leaderboards import Leaderboards
+    MaintenanceState().restamp(old, new)
+    WarmStartCache(data_manager).restamp(old[0], new[0])
+    boards = Leaderboards()
+    if boards.load(old[0]):
+        boards.fingerprint = new[0]
+        boards.save()
+
+def compact(data_manager):
+    """Rewrite data files with the configured codec and clear abandoned temp files"""
+    def size(paths):
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+    before_fingerprint = data_manager.file_fingerprint()
+    for name, paths, load, save in (("catalog", data_manager.movies_paths, data_manager.load_movies,
+                                     data_manager.save_movies),
+                                    ("users", lambda: [data_manager.users_file], data_manager.load_users,
+                                     data_manager.save_users)):
+        before = size(paths())
+        save(load())
+        log(f"compacted {name}: {before / 1e6:.2f} MB -> {size(paths()) / 1e6:.2f} MB")
+    restamp(data_manager, before_fingerprint, data_manager.file_fingerprint())
+
+    # Leftovers of interrupted writes; recent ones may belong to a write in progress
+    now = time.time()
+    removed = 0
+    for directory in (data_manager.data_dir, data_manager.movies_dir):
+        if not os.path.isdir(directory):
+            continue
+        for file_name in os.listdir(directory):
+            path = os.path.join(directory, file_name)
+            if '.tmp' in file_name and os.path.isfile(path) and now - os.path.getmtime(path) > STALE_TEMP_SECONDS:
+                os.unlink(path)
+                removed += 1
+    log(f"removed {removed} abandoned temporary files")
+
+def backfill_sentiment(data_manager, limit=None, threads=4):
+    """Analyze reviews stored without sentiment and save them in one write; returns (stored, missing)"""
+    from ai_analyzer import AIAnalyzer
+    snapshot = data_manager.snapshot()
+    missing = [(movie_id, review) for movie_id, movie in snapshot.movies.items()
+               for review in movie.get('reviews', []) if 'sentiment' not in review]
+    todo = missing[:limit]
+    analyzer = AIAnalyzer()
+    updates = []
+    # Threads, since translation mostly waits on the network
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = pool.map(lambda item: analyzer.analyze_sentiment(item[1]['content']), todo)
+        for done, ((movie_id, review), (sentiment, polarity)) in enumerate(zip(todo, results), 1):
+            updates.append((movie_id, review['username'], review, sentiment, polarity))
+            if done % 500 == 0:
+                log(f"analyzed {done}/{len(todo)} reviews")
+    return data_manager.set_review_sentiments(updates), len(missing)
+
+def parse_tasks(text, allowed, parser):
+    """Comma-separated task names, defaulting to all allowed"""
+    if not text:
+        return list(allowed)
+    names = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        parser.error(f"unknown tasks: {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild, verify and compact the data directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = commands.add_parser('rebuild', help="rebuild derived artifacts")
+    rebuild_parser.add_argument('--only', default=None, help=f"comma-separated subset of {','.join(ALL_TASKS)}")
+    rebuild_parser.add_argument('--jobs', type=int, default=None, help="artifacts rebuilt at once")
+    rebuild_parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS,
+                                help="processes per pooled job (default: Config.BATCH_WORKERS)")
+    rebuild_parser.add_argument('--force', action='store_true', help="ignore recorded progress")
+
+    verify_parser = commands.add_parser('verify', help="check artifacts against the data")
+    verify_parser.add_argument('--only', default=None, help=f"comma-separated subset of {','.join(VERIFIERS)}")
+
+    integrity_parser = commands.add_parser('integrity', help="cross-check rated_movies against reviews and flag duplicate reviews")
+    integrity_parser.add_argument('--fix', action='store_true', help="rewrite rated_movies from reviews")
+    integrity_parser.add_argument('--show', type=int, default=10, help="examples printed per issue")
+
+    sentiment_parser = commands.add_parser('sentiment', help="analyze and store sentiment of reviews saved without it")
+    sentiment_parser.add_argument('--limit', type=int, default=None, help="analyze at most this many reviews")
+    sentiment_parser.add_argument('--threads', type=int, default=4, help="reviews analyzed at once")
+
+    commands.add_parser('compact', help="rewrite data files compactly and clear temp files")
+    args = parser.parse_args()
+
+    data_manager = DataManager()
+    pid = app_lock.running_pid()
+    if pid is not None and (args.command in ('compact', 'sentiment') or (args.command == 'integrity' and args.fix)):
+        parser.error(f"the app is running as process {pid}; close it first ({args.command} rewrites the data files)")
+    if args.command == 'rebuild':
+        ok = rebuild(data_manager, parse_tasks(args.only, ALL_TASKS, parser), args.jobs, args.workers, args.force)
+    elif args.command == 'verify':
+        ok = verify(data_manager, parse_tasks(args.only, list(VERIFIERS), parser))
+    elif args.command == 'integrity':
+        snapshot = data_manager.snapshot()
+        issues, _ = check_integrity(snapshot.movies, snapshot.users)
+        for issue, pairs in issues.items():
+            log(f"{issue.replace('_', ' ')}: {len(pairs)}")
+            for username, movie_id in pairs[:args.show]:
+                print(f"    {username} / {movie_id}")
+        ok = not any(issues.values())
+        if args.fix and not ok:
+            log(f"rewrote rated_movies for {fix_integrity(data_manager)} users")
+            # Duplicate reviews are left for a person to resolve
+            ok = not issues['duplicate_reviews']
+    elif args.command == 'sentiment':
+        stored, missing = backfill_sentiment(data_manager, args.limit, args.threads)
+        log(f"stored sentiment for {stored} of {missing} reviews without it")
+        ok = True
+    else:
+        compact(data_manager)
+        ok = True
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Memory Profiling for Movie Review App
+
+MemoryProfiler wraps the methods of DataManager, AIAnalyzer and the UI
+handlers in tracemalloc sections and reports, per subsystem, the bytes
+still held after each call, the peak above the starting point, and call
+counts, along with peak RSS and the most common live object types.
+
+tracemalloc counts every thread's allocations in one process-wide total
+with one peak, so only main-thread sections reset and read the peak.
+Sections on worker threads (TaskRunner jobs such as sentiment analysis)
+get calls, time and retained bytes only. Their retained bytes also
+include whatever other threads allocated meanwhile, and the report marks
+them approximate. Main-thread peaks can likewise include concurrent
+worker allocations.
+
+Run the app with profiling:
+    python main.py --profile-memory
+
+Run the memory benchmark, failing if a subsystem exceeds its budget:
+    python memory_profile.py --titles 100000 --budget-mb 800
+"""
+import argparse
+import functools
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def object_counts(top=10):
+    """[(type name, live count), ...] for the most common gc-tracked objects"""
+    return Counter(type(obj).__name__ for obj in gc.get_objects()).most_common(top)
+
+class MemoryProfiler:
+    def __init__(self, frames=1):
+        self.frames = frames
+        self.stats = {}       # label -> {"calls", "retained", "peak", "seconds"}
+        self.approximate = set()    # labels measured on worker threads
+        self.local = threading.local()    # .stack: open sections [subsystem, label, start bytes, peak bytes]
+        self.lock = threading.Lock()
+
+    @property
+    def stack(self):
+        """Open sections of the calling thread"""
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def start(self):
+        """Begin tracing allocations"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def stop(self):
+        """Stop tracing allocations"""
+        tracemalloc.stop()
+
+    def _fold_peak(self):
+        """Credit the traced peak so far to every open section"""
+        _, peak = tracemalloc.get_traced_memory()
+        for frame in self.stack:
+            frame[3] = max(frame[3], peak)
+
+    @contextmanager
+    def section(self, subsystem, label=None):
+        """Measure the allocations of a block of code"""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        label = f"{subsystem}.{label}" if label else subsystem
+        stack = self.stack
+        on_main = threading.current_thread() is threading.main_thread()
+        if on_main:
+            # Record enclosing peaks before resetting so nesting never loses them
+            self._fold_peak()
+            tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        frame = [subsystem, label, current, current]
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if on_main:
+                self._fold_peak()
+            stack.pop()
+            current, _ = tracemalloc.get_traced_memory()
+            outermost = all(open_frame[0] != subsystem for open_frame in stack)
+            with self.lock:
+                for key in ((label, subsystem) if outermost and label != subsystem else (label,)):
+                    entry = self.stats.setdefault(key, {'calls': 0, 'retained': 0, 'peak': 0, 'seconds': 0.0})
+                    entry['calls'] += 1
+                    entry['retained'] += current - frame[2]
+                    entry['peak'] = max(entry['peak'], frame[3] - frame[2])
+                    entry['seconds'] += time.perf_counter() - started
+                    if not on_main:
+                        self.approximate.add(key)
+
+    def wrap(self, subsystem, name, func):
+        """Return func measured as subsystem.name"""
+        @functools.wraps(func)
+        def measured(*args, **kwargs):
+            with self.section(subsystem, name):
+                return func(*args, **kwargs)
+        return measured
+
+    def instrument(self, obj, subsystem, methods=None):
+        """Replace public methods of an instance with measured wrappers"""
+        if methods is None:
+            methods = [name for name in dir(obj) if not name.startswith('_')
+                       and callable(getattr(obj, name)) and not isinstance(getattr(obj, name), type)]
+        for name in methods:
+            setattr(obj, name, self.wrap(subsystem, name, getattr(obj, name)))
+        return obj
+
+    def subsystem_stats(self):
+        """Totals for subsystems (outermost calls only)"""
+        return {label: entry for label, entry in self.stats.items() if '.' not in label}
+
+    def top_allocations(self, limit=10):
+        """Source lines holding the most traced memory right now"""
+        if not tracemalloc.is_tracing():
+            return []
+        return tracemalloc.take_snapshot().statistics('lineno')[:limit]
+
+    def report(self, objects=10, allocations=5):
+        """Human readable summary of everything measured"""
+        lines = [f"{'section':<45}{'calls':>8}{'retained MB':>14}{'peak MB':>10}{'seconds':>10}"]
+        for label in sorted(self.stats, key=lambda l: -self.stats[l]['peak']):
+            entry = self.stats[label]
+            name = label + (" *" if label in self.approximate else "")
+            lines.append(f"{name:<45}{entry['calls']:>8}{entry['retained'] / 1e6:>14.2f}"
+                         f"{entry['peak'] / 1e6:>10.2f}{entry['seconds']:>10.3f}")
+        if self.approximate:
+            lines.append("* ran on worker threads: no peak, retained bytes include other threads' allocations")
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"traced now {current / 1e6:.2f} MB, traced peak since last reset {peak / 1e6:.2f} MB")
+        rss = peak_rss_mb()
+        if rss is not None:
+            lines.append(f"peak RSS {rss:.1f} MB")
+        if objects:
+            lines.append("live objects: " + ", ".join(f"{name}={count}" for name, count in object_counts(objects)))
+        for stat in self.top_allocations(allocations):
+            lines.append(f"  {stat}")
+        return "\n".join(lines)
+
+def run_benchmark(titles, users, reviews_per_user, seed=0):
+    """Profile the data, index and recommender paths over a synthetic catalog"""
+    from data_manager import DataManager
+    from ai_analyzer import AIAnalyzer
+    from catalog_index import CatalogIndex
+    from fuzzy_search import FuzzyIndex
+    from synthetic_data import synthetic_catalog
+
+    movies, user_records = synthetic_catalog(titles, users, reviews_per_user, seed=seed)
+    profiler = MemoryProfiler()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_manager = DataManager()
+        data_manager.data_dir = data_dir
+        data_manager.movies_file = os.path.join(data_dir, "movies.json")
+        data_manager.movies_dir = os.path.join(data_dir, "movies")
+        data_manager.users_file = os.path.join(data_dir, "users.json")
+        data_manager.save_movies(movies)
+        data_manager.save_users(user_records)
+        del movies, user_records
+        gc.collect()
+
+        profiler.start()
+        try:
+            profiler.instrument(data_manager, "DataManager", ['load_movies', 'load_users', 'get_user_reviews'])
+            loaded = data_manager.load_movies()
+            data_manager.load_users()
+            data_manager.get_user_reviews("user000000")
+
+            analyzer = profiler.instrument(AIAnalyzer(), "AIAnalyzer",
+                                           ['build_item_features', 'build_all_profiles'])
+            analyzer.build_item_features(loaded)
+            analyzer.build_all_profiles(loaded)
+
+            with profiler.section("CatalogIndex", "build"):
+                catalog = CatalogIndex(loaded)
+            with profiler.section("FuzzyIndex", "build"):
+                fuzzy = FuzzyIndex(loaded)
+            report = profiler.report()
+        finally:
+            profiler.stop()
+        del catalog, fuzzy, loaded
+    return profiler, report
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory benchmark with per-subsystem budgets")
+    parser.add_argument('--titles', type=int, default=100000, help="synthetic catalog size")
+    parser.add_argument('--users', type=int, default=5000, help="synthetic users")
+    parser.add_argument('--reviews-per-user', type=int, default=10, help="reviews per synthetic user")
+    parser.add_argument('--budget-mb', type=float, default=800.0,
+                        help="allowed peak MB per 100k titles for each subsystem")
+    args = parser.parse_args()
+
+    profiler, report = run_benchmark(args.titles, args.users, args.reviews_per_user)
+    print(report)
+
+    scale = 100000 / args.titles
+    failures = []
+    print(f"\nPeak MB per 100k titles (budget {args.budget_mb:.0f} MB)")
+    for subsystem, entry in sorted(profiler.subsystem_stats().items()):
+        per_100k = entry['peak'] / 1e6 * scale
+        ok = per_100k <= args.budget_mb
+        print(f"  {subsystem:<15}{per_100k:>10.1f}  {'ok' if ok else 'OVER BUDGET'}")
+        if not ok:
+            failures.append(subsystem)
+
+    if failures:
+        print(f"Memory budget exceeded by: {', '.join(failures)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
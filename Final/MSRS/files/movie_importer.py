@@ -0,0 +1,214 @@
+"""
+Bulk Movie Importer for Movie Review App
+
+Rows are streamed and cleaned batch by batch, and each batch is written
+with one add_movies call, so memory beyond the resident catalog stays
+bounded by --batch-size. With the partitioned backend a batch rewrites
+only the partitions it touches.
+
+Gross is read in dollars, as in IMDB CSVs, and stored in millions like
+the rest of the catalog; pass --gross-unit millions for files that
+already use millions.
+
+Movie IDs are slugs of the title, so non-ASCII titles keep their letters
+(a Japanese title does not collapse to its year). If a slug comes out
+empty or is already taken by another title, a hash of the title is used
+instead.
+
+Usage:
+    python movie_importer.py imdb_top_1000.csv
+    python movie_importer.py movies.jsonl --batch-size 10000 --update --gross-unit millions
+"""
+import argparse
+import csv
+import itertools
+import json
+import re
+import time
+import unicodedata
+import zlib
+from data_manager import DataManager
+
+class MovieImporter:
+    # Catalog fields in the order they appear in movies.json
+    FIELDS = [
+        'Series_Title', 'Released_Year', 'Certificate', 'Runtime', 'Genre',
+        'IMDB_Rating', 'Overview', 'Meta_score', 'Director',
+        'Star1', 'Star2', 'Star3', 'Star4', 'No_of_Votes', 'Gross'
+    ]
+
+    # Divisor taking a gross value in each source unit to the catalog's millions
+    GROSS_UNITS = {'dollars': 1000000, 'millions': 1}
+
+    def __init__(self, data_manager=None, batch_size=5000, update_existing=False, gross_unit='dollars'):
+        self.data_manager = data_manager or DataManager()
+        self.batch_size = batch_size
+        self.update_existing = update_existing
+        if gross_unit not in self.GROSS_UNITS:
+            raise ValueError(f"Unknown gross unit {gross_unit!r} (choose from {', '.join(self.GROSS_UNITS)})")
+        self.gross_unit = gross_unit
+        self.stats = {'read': 0, 'imported': 0, 'updated': 0, 'duplicates': 0, 'invalid': 0}
+
+    @staticmethod
+    def _fold(title):
+        """Case- and width-folded title (letters of any script are kept)"""
+        return unicodedata.normalize('NFKC', title).casefold().replace('&', ' and ')
+
+    @staticmethod
+    def title_hash(title):
+        """Stable short hash of a title, for IDs its slug cannot tell apart"""
+        return f"{zlib.crc32(title.encode('utf-8')):08x}"
+
+    @classmethod
+    def make_movie_id(cls, title, year):
+        """Generate a title_year movie ID"""
+        slug = re.sub(r'[\W_]+', '_', cls._fold(title)).strip('_')
+        return f"{slug or cls.title_hash(title)}_{year}"
+
+    @classmethod
+    def dedup_key(cls, title, year):
+        """Key used to detect the same movie under a different ID"""
+        return re.sub(r'[\W_]+', '', cls._fold(title)) or title, str(year)
+
+    def read_rows(self, path):
+        """Stream raw rows from a CSV or JSONL file"""
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if path.lower().endswith(('.jsonl', '.ndjson')):
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            yield None
+            else:
+                yield from csv.DictReader(f)
+
+    def clean_row(self, row):
+        """Validate and type one raw row, returning a catalog record or None"""
+        if not isinstance(row, dict):
+            return None
+
+        def text(field):
+            value = row.get(field)
+            return '' if value is None else str(value).strip()
+
+        title = text('Series_Title')
+        year_match = re.search(r'\d{4}', text('Released_Year'))
+        if not title or not year_match:
+            return None
+
+        try:
+            runtime = int(re.sub(r'[^0-9]', '', text('Runtime')) or 0)
+            imdb = float(text('IMDB_Rating')) if text('IMDB_Rating') else None
+            meta = float(text('Meta_score')) if text('Meta_score') else None
+            votes = int(re.sub(r'[^0-9]', '', text('No_of_Votes')) or 0)
+            gross = text('Gross').replace(',', '').replace('$', '')
+            gross = float(gross) if gross else None
+        except ValueError:
+            return None
+
+        if imdb is not None and not 0 <= imdb <= 10:
+            return None
+        if meta is not None and not 0 <= meta <= 100:
+            return None
+
+        # The catalog stores millions
+        if gross is not None:
+            gross = gross / self.GROSS_UNITS[self.gross_unit]
+
+        movie = {
+            'Series_Title': title,
+            'Released_Year': year_match.group(0),
+            'Certificate': text('Certificate') or 'N/A',
+            'Runtime': str(runtime) if runtime else 'N/A',
+            'Genre': text('Genre') or 'N/A',
+            'IMDB_Rating': f"{imdb:.1f}" if imdb is not None else 'N/A',
+            'Overview': text('Overview'),
+            'Meta_score': str(int(meta)) if meta is not None else 'N/A',
+            'Director': text('Director') or 'N/A',
+            'Star1': text('Star1'),
+            'Star2': text('Star2'),
+            'Star3': text('Star3'),
+            'Star4': text('Star4'),
+            'No_of_Votes': str(votes),
+            'Gross': f"{gross:.2f}" if gross is not None else 'N/A',
+            'reviews': []
+        }
+        return movie
+
+    def import_file(self, path, progress=None):
+        """Import a CSV/JSONL file and return import statistics"""
+        existing = self.data_manager.snapshot().movies
+        seen = {self.dedup_key(m['Series_Title'], m['Released_Year']): movie_id
+                for movie_id, m in existing.items()}
+        taken = set(existing)
+        del existing
+
+        start = time.perf_counter()
+        rows = self.read_rows(path)
+        written = set()    # movie IDs this import has already added or overwritten
+        while True:
+            chunk = list(itertools.islice(rows, self.batch_size))
+            if not chunk:
+                break
+
+            batch = {}
+            for row in chunk:
+                self.stats['read'] += 1
+                movie = self.clean_row(row)
+                if movie is None:
+                    self.stats['invalid'] += 1
+                    continue
+
+                key = self.dedup_key(movie['Series_Title'], movie['Released_Year'])
+                if key in seen:
+                    movie_id = seen[key]
+                    if not self.update_existing or movie_id in batch or movie_id in written:
+                        self.stats['duplicates'] += 1
+                        continue
+                else:
+                    movie_id = self.make_movie_id(movie['Series_Title'], movie['Released_Year'])
+                    if movie_id in taken:
+                        # A different title with the same slug
+                        movie_id = f"{movie_id}_{self.title_hash(movie['Series_Title'])}"
+                    seen[key] = movie_id
+                    taken.add(movie_id)
+                batch[movie_id] = movie
+
+            if batch:
+                # One write per batch; the batch is dropped afterwards
+                added, updated = self.data_manager.add_movies(batch, overwrite=self.update_existing)
+                self.stats['imported'] += added
+                self.stats['updated'] += updated
+                written.update(batch)
+            if progress:
+                progress(self.stats, time.perf_counter() - start)
+
+        elapsed = time.perf_counter() - start
+        self.stats['seconds'] = elapsed
+        self.stats['rows_per_second'] = self.stats['read'] / elapsed if elapsed else 0.0
+        return self.stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Import movies from an IMDB-style CSV or JSONL file")
+    parser.add_argument('path', help="CSV or JSONL file to import")
+    parser.add_argument('--batch-size', type=int, default=5000, help="rows parsed and written per batch")
+    parser.add_argument('--update', action='store_true', help="overwrite metadata of movies already in the catalog")
+    parser.add_argument('--gross-unit', choices=list(MovieImporter.GROSS_UNITS), default='dollars',
+                        help="unit of the Gross column in the source file")
+    args = parser.parse_args()
+
+    def report(stats, elapsed):
+        rate = stats['read'] / elapsed if elapsed else 0.0
+        print(f"{stats['read']} rows read | {stats['imported']} imported | "
+              f"{stats['duplicates']} duplicates | {stats['invalid']} invalid | {rate:.0f} rows/s")
+
+    importer = MovieImporter(batch_size=args.batch_size, update_existing=args.update, gross_unit=args.gross_unit)
+    stats = importer.import_file(args.path, progress=report)
+    print(f"Done in {stats['seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s): "
+          f"{stats['imported']} imported, {stats['updated']} updated, "
+          f"{stats['duplicates']} duplicates, {stats['invalid']} invalid")
+
+if __name__ == "__main__":
+    main()
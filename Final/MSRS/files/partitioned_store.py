@@ -0,0 +1,166 @@
+"""
+Partitioned Catalog Storage for Movie Review App
+
+Keeps the movies catalog as hash partitions of movie IDs instead of one
+movies file (Config.STORAGE_BACKEND = "partitioned"):
+
+    data/movies/manifest.json   partition count and catalog order
+    data/movies/part-000.json   {movie_id: movie, ...} including reviews
+    ...
+
+A review write rewrites only the partition holding its movie. Adding
+movies also rewrites the manifest, whose ID list keeps catalog order
+(hash partitioning alone would scramble it). Partitions are read and
+written on a thread pool so file I/O and gzip/zstd (de)compression
+overlap; decoding in worker processes was tried and lost, since pickling
+the decoded dicts back costs more than decoding them.
+
+Convert an existing data directory:
+    python partitioned_store.py split [--partitions 32]
+    python partitioned_store.py join
+
+Once either backend writes, the other one's copy is stale: a partitioned
+write renames movies.json to movies.json.old, and a single-file write
+renames the manifest to manifest.json.old, so switching STORAGE_BACKEND
+without split/join never serves old data.
+"""
+import argparse
+import os
+import re
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from storage_codecs import codec_for_path, read_file, write_file, JsonCodec
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+PART_PATTERN = re.compile(r"part-(\d+)\.json")
+RETIRED_SUFFIX = ".old"
+
+def retire(path):
+    """Rename a catalog file the other backend has superseded, if it exists"""
+    try:
+        os.replace(path, path + RETIRED_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+def partition_of(movie_id, partitions):
+    """Partition number of a movie ID (crc32, so stable across processes)"""
+    return zlib.crc32(movie_id.encode('utf-8')) % partitions
+
+class PartitionedStore:
+    def __init__(self, directory=None, partitions=None, codec=None, workers=None):
+        self.directory = directory or Config.MOVIES_DIR
+        self.partitions = partitions or Config.STORAGE_PARTITIONS
+        self.codec = codec or Config.STORAGE_CODEC
+        self.workers = workers or min(self.partitions, (os.cpu_count() or 1) + 4)
+        self.manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        self.lock = threading.Lock()
+        self.known = None       # movie IDs in the manifest, once loaded or saved
+
+    def part_path(self, partition):
+        return os.path.join(self.directory, f"part-{partition:03d}.json")
+
+    def exists(self):
+        """True if a partitioned catalog has been written"""
+        return os.path.exists(self.manifest_path)
+
+    def paths(self):
+        """Manifest and partition files, for fingerprinting"""
+        with self.lock:
+            if self.known is None:
+                # Until load(), the manifest rather than the configured count says which files exist
+                try:
+                    self.partitions = read_file(self.manifest_path)['partitions']
+                except (OSError, ValueError, KeyError):
+                    pass
+            return [self.manifest_path] + [self.part_path(k) for k in range(self.partitions)]
+
+    def _read_part(self, path):
+        try:
+            return read_file(path)
+        except FileNotFoundError:
+            return {}
+
+    def load(self):
+        """Read every partition in parallel and return the movies in catalog order"""
+        manifest = read_file(self.manifest_path)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported partition manifest version {manifest.get('version')}")
+        partitions = manifest['partitions']
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            parts = list(pool.map(self._read_part, [self.part_path(k) for k in range(partitions)]))
+
+        merged = {}
+        for part in parts:
+            merged.update(part)
+        movies = {movie_id: merged.pop(movie_id) for movie_id in manifest['order'] if movie_id in merged}
+        # Partitions written just before an interrupted manifest update
+        movies.update(merged)
+        with self.lock:
+            self.partitions = partitions
+            self.known = set(manifest['order'])
+        return movies
+
+    def _remove_surplus_parts(self):
+        """Delete partition files left over from a larger partition count"""
+        for name in os.listdir(self.directory):
+            match = PART_PATTERN.fullmatch(name)
+            if match and int(match.group(1)) >= self.partitions:
+                os.unlink(os.path.join(self.directory, name))
+
+    def _write_part(self, partition, members):
+        path = self.part_path(partition)
+        write_file(path, members, codec_for_path(path, self.codec))
+
+    def save(self, movies, changed=None):
+        """Write the partitions holding the changed movie IDs (all of them if None); returns the paths written"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            if changed is None or self.known is None:
+                touched = range(self.partitions)
+                new_ids = True
+            else:
+                touched = sorted({partition_of(movie_id, self.partitions) for movie_id in changed})
+                new_ids = any(movie_id not in self.known for movie_id in changed)
+
+            groups = {k: {} for k in touched}
+            for movie_id, movie in movies.items():
+                group = groups.get(partition_of(movie_id, self.partitions))
+                if group is not None:
+                    group[movie_id] = movie
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(groups)) or 1) as pool:
+                list(pool.map(self._write_part, groups, groups.values()))
+            # Manifest last: a crash in between leaves extra movies, which load() keeps
+            if new_ids:
+                write_file(self.manifest_path, {'version': MANIFEST_VERSION, 'partitions': self.partitions,
+                                                'order': list(movies)}, JsonCodec())
+                self.known = set(movies)
+            if len(groups) == self.partitions:
+                self._remove_surplus_parts()
+        return [self.part_path(k) for k in touched] + ([self.manifest_path] if new_ids else [])
+
+def main():
+    from data_manager import DataManager
+    parser = argparse.ArgumentParser(description="Convert between the single-file and partitioned catalog")
+    commands = parser.add_subparsers(dest='command', required=True)
+    split_parser = commands.add_parser('split', help="write Config.MOVIES_FILE as partitions")
+    split_parser.add_argument('--partitions', type=int, default=Config.STORAGE_PARTITIONS)
+    commands.add_parser('join', help="write the partitions back to Config.MOVIES_FILE")
+    args = parser.parse_args()
+
+    data_manager = DataManager()
+    if args.command == 'split':
+        movies = data_manager.read_data_file(data_manager.movies_file)
+        store = PartitionedStore(partitions=args.partitions)
+        store.save(movies)
+        print(f"Wrote {len(movies)} movies to {store.partitions} partitions in {store.directory}; "
+              f"set STORAGE_BACKEND=partitioned to use them")
+    else:
+        movies = PartitionedStore().load()
+        data_manager.write_data_file(data_manager.movies_file, movies)
+        print(f"Wrote {len(movies)} movies to {data_manager.movies_file}; set STORAGE_BACKEND=file to use it")
+
+if __name__ == "__main__":
+    main()
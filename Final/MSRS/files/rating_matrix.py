@@ -0,0 +1,95 @@
+"""
+Rating Matrix for Movie Review App
+
+Sparse user x item matrices of ratings and review ages built from the
+catalog, shared by the recommender, batch jobs and evaluation.
+"""
+from datetime import datetime
+import numpy as np
+from scipy import sparse
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class RatingMatrix:
+    def __init__(self, users, item_ids, ratings, ages):
+        self.users = users                  # row -> username
+        self.user_index = {u: i for i, u in enumerate(users)}
+        self.item_ids = item_ids            # column -> movie_id
+        self.item_index = {m: i for i, m in enumerate(item_ids)}
+        self.ratings = ratings              # csr, users x items
+        self.ages = ages                    # csr, same pattern, age in days
+
+    @classmethod
+    def from_movies(cls, movies, now=None, item_ids=None):
+        """Build from a movies dict, optionally ignoring reviews after `now`"""
+        now = now or datetime.now()
+        item_ids = item_ids or list(movies)
+        item_index = {movie_id: i for i, movie_id in enumerate(item_ids)}
+
+        users = {}
+        rows, cols, ratings, ages = [], [], [], []
+        for movie_id, movie in movies.items():
+            col = item_index.get(movie_id)
+            if col is None:
+                continue
+            for review in movie.get('reviews', []):
+                reviewed = datetime.strptime(review['date'], DATE_FORMAT)
+                if reviewed > now:
+                    continue
+                rows.append(users.setdefault(review['username'], len(users)))
+                cols.append(col)
+                ratings.append(float(review['rating']))
+                ages.append((now - reviewed).total_seconds() / 86400.0)
+
+        return cls._from_triples(list(users), item_ids, rows, cols, ratings, ages)
+
+    @classmethod
+    def from_user_ratings(cls, username, user_ratings, item_ids, now=None):
+        """Build a single-row matrix from [{"movie_id", "rating", "date"?}, ...]"""
+        now = now or datetime.now()
+        item_index = {movie_id: i for i, movie_id in enumerate(item_ids)}
+        cols, ratings, ages = [], [], []
+        for entry in user_ratings:
+            col = item_index.get(entry['movie_id'])
+            if col is None:
+                continue
+            cols.append(col)
+            ratings.append(float(entry['rating']))
+            if entry.get('date'):
+                ages.append(max(0.0, (now - datetime.strptime(entry['date'], DATE_FORMAT)).total_seconds() / 86400.0))
+            else:
+                ages.append(0.0)
+        return cls._from_triples([username], item_ids, [0] * len(cols), cols, ratings, ages)
+
+    @classmethod
+    def _from_triples(cls, users, item_ids, rows, cols, ratings, ages):
+        """Assemble CSR matrices sharing one sparsity pattern"""
+        shape = (len(users), len(item_ids))
+        # Keep only the last entry per (user, item) so duplicates never get summed
+        last = {(row, col): i for i, (row, col) in enumerate(zip(rows, cols))}
+        if len(last) < len(rows):
+            keep = sorted(last.values())
+            rows, cols = [rows[i] for i in keep], [cols[i] for i in keep]
+            ratings, ages = [ratings[i] for i in keep], [ages[i] for i in keep]
+        # Build the pattern once with 1-based entry numbers, then gather both value arrays
+        order = sparse.csr_matrix((np.arange(1, len(rows) + 1, dtype=np.float64), (rows, cols)), shape=shape)
+        order.sort_indices()
+        entries = order.data.astype(np.int64) - 1
+        rating_matrix = sparse.csr_matrix(
+            (np.asarray(ratings, dtype=np.float32)[entries], order.indices, order.indptr), shape=shape)
+        age_matrix = sparse.csr_matrix(
+            (np.asarray(ages, dtype=np.float32)[entries], order.indices, order.indptr), shape=shape)
+        return cls(users, item_ids, rating_matrix, age_matrix)
+
+    def weights(self, half_life_days=365.0, neutral=5.5, dislike_weight=0.5):
+        """Preference weights: rating above/below neutral, decayed by review age"""
+        weights = self.ratings.copy()
+        preference = (self.ratings.data - neutral) / (10.0 - neutral)
+        preference = np.where(preference < 0, preference * dislike_weight, preference)
+        weights.data = (preference * np.power(0.5, self.ages.data / half_life_days)).astype(np.float32)
+        weights.eliminate_zeros()
+        return weights
+
+    def rated_items(self, row):
+        """Column indexes rated by a user row"""
+        return self.ratings.indices[self.ratings.indptr[row]:self.ratings.indptr[row + 1]]
@@ -0,0 +1,202 @@
+"""
+Recommendation Batch Job for Movie Review App
+
+Precomputes top-N recommendations for every user. The item feature,
+profile and rating matrices are placed in shared memory once; worker
+processes attach to them by name instead of receiving a pickled copy of
+the catalog, and each worker scores a shard of users.
+
+Results go to data/recommendations.npz, which AIAnalyzer.get_recommendations
+reads before computing anything on demand.
+
+Usage:
+    python recommendation_job.py --top-n 20 --workers 4
+"""
+import argparse
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from config import Config
+
+RECOMMENDATIONS_FILE = os.path.join(Config.DATA_DIR, "recommendations.npz")
+
+def ratings_fingerprint(user_ratings):
+    """Stable fingerprint of a user's (movie_id, rating) pairs"""
+    pairs = sorted((entry['movie_id'], int(entry['rating'])) for entry in user_ratings)
+    return zlib.crc32(repr(pairs).encode('utf-8'))
+
+class SharedArrays:
+    """Numpy arrays published in named shared memory blocks"""
+
+    def __init__(self):
+        self.blocks = []
+
+    def publish(self, arrays):
+        """Copy arrays into shared memory, returning a picklable spec"""
+        spec = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            spec[name] = (block.name, array.shape, array.dtype.str)
+        return spec
+
+    @staticmethod
+    def attach(spec):
+        """Map published arrays without copying; returns (arrays, blocks)"""
+        arrays, blocks = {}, []
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return arrays, blocks
+
+    def close(self):
+        """Release and remove the published blocks"""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+def _csr_arrays(prefix, matrix):
+    """Flatten a CSR matrix into named arrays"""
+    return {f"{prefix}_data": matrix.data, f"{prefix}_indices": matrix.indices,
+            f"{prefix}_indptr": matrix.indptr, f"{prefix}_shape": np.array(matrix.shape)}
+
+def _csr_from(arrays, prefix):
+    """Rebuild a CSR matrix view over shared arrays"""
+    shape = tuple(int(x) for x in arrays[f"{prefix}_shape"])
+    return sparse.csr_matrix((arrays[f"{prefix}_data"], arrays[f"{prefix}_indices"],
+                              arrays[f"{prefix}_indptr"]), shape=shape, copy=False)
+
+_worker = {}
+
+def _init_worker(spec):
+    """Attach to the shared model matrices once per worker process"""
+    arrays, blocks = SharedArrays.attach(spec)
+    _worker['blocks'] = blocks
+    _worker['features'] = _csr_from(arrays, 'features')
+    _worker['profiles'] = _csr_from(arrays, 'profiles')
+    _worker['ratings'] = _csr_from(arrays, 'ratings')
+
+def _score_shard(start, stop, top_n):
+    """Top-N unrated items for user rows [start, stop)"""
+    features, profiles, ratings = _worker['features'], _worker['profiles'], _worker['ratings']
+    scores = np.asarray((profiles[start:stop] @ features.T).todense(), dtype=np.float32)
+
+    top_n = min(top_n, scores.shape[1])
+    items = np.full((stop - start, top_n), -1, dtype=np.int32)
+    values = np.zeros((stop - start, top_n), dtype=np.float32)
+    for row in range(stop - start):
+        user_scores = scores[row]
+        user_scores[ratings.indices[ratings.indptr[start + row]:ratings.indptr[start + row + 1]]] = -np.inf
+        count = min(top_n, int(np.isfinite(user_scores).sum()))
+        if not count:
+            continue
+        top = np.argpartition(-user_scores, count - 1)[:count]
+        top = top[np.argsort(-user_scores[top], kind='stable')]
+        items[row, :count] = top
+        values[row, :count] = user_scores[top]
+    return start, items, values
+
+def compute_all(analyzer, movies, top_n=20, workers=None, shard_size=256, progress=None):
+    """Score every user, returning (users, item_ids, items, scores, fingerprints)"""
+    item_ids, features = analyzer.build_item_features(movies)
+    rating_matrix, profiles = analyzer.build_all_profiles(movies)
+    n_users = len(rating_matrix.users)
+
+    # Cosine similarity == dot product of row-normalised matrices
+    features = normalize(features).astype(np.float32).tocsr()
+    profiles = normalize(profiles).astype(np.float32).tocsr()
+
+    fingerprints = np.zeros(n_users, dtype=np.int64)
+    for row in range(n_users):
+        cols = rating_matrix.rated_items(row)
+        user_ratings = [{'movie_id': item_ids[c], 'rating': r}
+                        for c, r in zip(cols, rating_matrix.ratings.data[rating_matrix.ratings.indptr[row]:rating_matrix.ratings.indptr[row + 1]])]
+        fingerprints[row] = ratings_fingerprint(user_ratings)
+
+    items = np.full((n_users, top_n), -1, dtype=np.int32)
+    scores = np.zeros((n_users, top_n), dtype=np.float32)
+
+    shared = SharedArrays()
+    try:
+        spec = shared.publish({**_csr_arrays('features', features),
+                               **_csr_arrays('profiles', profiles),
+                               **_csr_arrays('ratings', rating_matrix.ratings)})
+        shards = [(start, min(start + shard_size, n_users)) for start in range(0, n_users, shard_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+            futures = [pool.submit(_score_shard, start, stop, top_n) for start, stop in shards]
+            for done, future in enumerate(futures, 1):
+                start, shard_items, shard_scores = future.result()
+                items[start:start + len(shard_items), :shard_items.shape[1]] = shard_items
+                scores[start:start + len(shard_scores), :shard_scores.shape[1]] = shard_scores
+                if progress:
+                    progress(done, len(shards))
+    finally:
+        shared.close()
+
+    return np.array(rating_matrix.users), np.array(item_ids), items, scores, fingerprints
+
+class RecommendationStore:
+    def __init__(self, path=RECOMMENDATIONS_FILE):
+        self.path = path
+        self.user_rows = {}
+        self.load()
+
+    def load(self):
+        """Load precomputed recommendations if the job has been run"""
+        try:
+            with np.load(self.path) as store:
+                self.item_ids = store['item_ids']
+                self.items = store['items']
+                self.scores = store['scores']
+                self.fingerprints = store['fingerprints']
+                self.user_rows = {user: row for row, user in enumerate(store['users'].tolist())}
+        except FileNotFoundError:
+            return False
+        return True
+
+    def lookup(self, username, user_ratings, top_n=10):
+        """[(movie_id, score), ...] if the stored entry matches the user's current ratings"""
+        row = self.user_rows.get(username)
+        if row is None or self.fingerprints[row] != ratings_fingerprint(user_ratings):
+            return None
+        return [(str(self.item_ids[item]), float(score))
+                for item, score in zip(self.items[row][:top_n], self.scores[row][:top_n]) if item >= 0]
+
+    @staticmethod
+    def save(path, users, item_ids, items, scores, fingerprints):
+        """Write the store"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, users=users, item_ids=item_ids, items=items,
+                            scores=scores.astype(np.float16), fingerprints=fingerprints)
+
+def main():
+    from data_manager import DataManager
+    from ai_analyzer import AIAnalyzer
+
+    parser = argparse.ArgumentParser(description="Precompute recommendations for every user")
+    parser.add_argument('--top-n', type=int, default=Config.RECOMMENDATIONS_STORED,
+                        help="recommendations kept per user")
+    parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS,
+                        help="worker processes (default: Config.BATCH_WORKERS, else CPU count)")
+    parser.add_argument('--shard-size', type=int, default=256, help="users per task")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    movies = DataManager().load_movies()
+    result = compute_all(AIAnalyzer(), movies, args.top_n, args.workers, args.shard_size,
+                         progress=lambda done, total: print(f"shard {done}/{total}"))
+    RecommendationStore.save(RECOMMENDATIONS_FILE, *result)
+    print(f"Wrote recommendations for {len(result[0])} users to {RECOMMENDATIONS_FILE} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
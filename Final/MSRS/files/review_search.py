@@ -0,0 +1,180 @@
+"""
+Review Search for Movie Review App
+
+Inverted index over review content with BM25 ranking. Postings keep term
+positions so quoted phrases can be matched, and candidates only ever come
+from the postings of the query terms, never from a scan of all reviews.
+Stop words are not scored, but their positions are kept separately so
+phrases such as "lord of the rings" (or just "of the") still match.
+Reviews without a stored sentiment are filed under "Unknown".
+"""
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in',
+    'is', 'it', 'of', 'on', 'or', 'so', 'that', 'the', 'this', 'to', 'was', 'with'
+}
+
+class ReviewSearchIndex:
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, movies=None):
+        self.docs = {}        # (movie_id, username) -> doc id
+        self.doc_info = {}    # doc id -> metadata, length and terms
+        self.postings = {}    # term -> {doc id: [positions]}
+        self.stop_postings = {}    # stop word -> {doc id: [positions]}, for phrases only
+        self.by_movie = {}    # movie_id -> set of doc ids
+        self.by_user = {}     # username -> set of doc ids
+        self.total_length = 0
+        self.next_id = 0
+        if movies:
+            self.build(movies)
+
+    @staticmethod
+    def words(text):
+        """Lowercase word tokens, stop words included"""
+        return TOKEN_PATTERN.findall(text.lower())
+
+    @classmethod
+    def tokenize(cls, text):
+        """Lowercase word tokens with their positions, stop words skipped"""
+        return [(pos, token) for pos, token in enumerate(cls.words(text)) if token not in STOP_WORDS]
+
+    def build(self, movies):
+        """Index every review in a movies dict"""
+        for movie_id, movie in movies.items():
+            for review in movie.get('reviews', []):
+                self.add_review(movie_id, review)
+
+    def add_review(self, movie_id, review):
+        """Index or re-index a review"""
+        key = (movie_id, review['username'])
+        if key in self.docs:
+            self.remove_review(movie_id, review['username'])
+
+        doc_id = self.next_id
+        self.next_id += 1
+        tokens, stop_terms = [], set()
+        for pos, word in enumerate(self.words(review['content'])):
+            if word in STOP_WORDS:
+                self.stop_postings.setdefault(word, {}).setdefault(doc_id, []).append(pos)
+                stop_terms.add(word)
+            else:
+                self.postings.setdefault(word, {}).setdefault(doc_id, []).append(pos)
+                tokens.append(word)
+
+        self.docs[key] = doc_id
+        self.doc_info[doc_id] = {
+            'movie_id': movie_id,
+            'username': review['username'],
+            'rating': review['rating'],
+            'sentiment': review.get('sentiment') or 'Unknown',
+            'date': review['date'],
+            'content': review['content'],
+            'length': len(tokens),
+            'terms': set(tokens),
+            'stop_terms': stop_terms
+        }
+        self.by_movie.setdefault(movie_id, set()).add(doc_id)
+        self.by_user.setdefault(review['username'], set()).add(doc_id)
+        self.total_length += len(tokens)
+
+    def remove_review(self, movie_id, username):
+        """Drop a review from the index"""
+        doc_id = self.docs.pop((movie_id, username), None)
+        if doc_id is None:
+            return
+        info = self.doc_info.pop(doc_id)
+        for postings, terms in ((self.postings, info['terms']), (self.stop_postings, info['stop_terms'])):
+            for term in terms:
+                posting = postings[term]
+                del posting[doc_id]
+                if not posting:
+                    del postings[term]
+        self.by_movie[movie_id].discard(doc_id)
+        self.by_user[username].discard(doc_id)
+        self.total_length -= info['length']
+
+    def on_review_changed(self, event, payload):
+        """DataManager change-event handler"""
+        if payload['review'] is None:
+            self.remove_review(payload['movie_id'], payload['username'])
+        else:
+            self.add_review(payload['movie_id'], payload['review'])
+
+    def _parse(self, query):
+        """Split a query into scoring terms and quoted phrases (every word, stop words included)"""
+        phrases = [self.words(p) for p in re.findall(r'"([^"]+)"', query)]
+        terms = [t for _, t in self.tokenize(query.replace('"', ' '))]
+        return list(dict.fromkeys(terms)), [p for p in phrases if p]
+
+    def _posting(self, word):
+        """{doc id: [positions]} of a word, or None if no review contains it"""
+        return (self.stop_postings if word in STOP_WORDS else self.postings).get(word)
+
+    def _has_phrase(self, doc_id, phrase):
+        """Check consecutive positions of a phrase within a document"""
+        starts = set(self._posting(phrase[0])[doc_id])
+        for offset, word in enumerate(phrase[1:], 1):
+            starts &= {pos - offset for pos in self._posting(word)[doc_id]}
+            if not starts:
+                return False
+        return True
+
+    def search(self, query, movie_id=None, username=None, min_rating=None, max_rating=None,
+               sentiment=None, limit=50):
+        """Return [(score, review_info), ...] best first"""
+        terms, phrases = self._parse(query)
+        terms = [t for t in terms if t in self.postings]
+        if not (terms or phrases):
+            return []
+        for phrase in phrases:
+            if any(self._posting(word) is None for word in phrase):
+                return []
+
+        # Candidates: documents containing a query term, intersected with filters
+        if phrases:
+            candidates = None
+            for word in {word for phrase in phrases for word in phrase}:
+                docs = self._posting(word).keys()
+                candidates = set(docs) if candidates is None else candidates & docs
+        else:
+            candidates = set()
+            for term in terms:
+                candidates.update(self.postings[term])
+        if movie_id is not None:
+            candidates &= self.by_movie.get(movie_id, set())
+        if username is not None:
+            candidates &= self.by_user.get(username, set())
+
+        n_docs = len(self.doc_info)
+        avg_length = self.total_length / n_docs if n_docs else 0.0
+        idf = {t: math.log(1 + (n_docs - len(self.postings[t]) + 0.5) / (len(self.postings[t]) + 0.5))
+               for t in terms}
+
+        results = []
+        for doc_id in candidates:
+            info = self.doc_info[doc_id]
+            if min_rating is not None and info['rating'] < min_rating:
+                continue
+            if max_rating is not None and info['rating'] > max_rating:
+                continue
+            if sentiment is not None and info['sentiment'] != sentiment:
+                continue
+            if phrases and not all(self._has_phrase(doc_id, p) for p in phrases):
+                continue
+
+            norm = self.K1 * (1 - self.B + self.B * info['length'] / avg_length) if avg_length else self.K1
+            score = 0.0
+            for term in terms:
+                positions = self.postings[term].get(doc_id)
+                if positions:
+                    tf = len(positions)
+                    score += idf[term] * tf * (self.K1 + 1) / (tf + norm)
+            results.append((score, info))
+
+        results.sort(key=lambda item: item[0], reverse=True)
+        return results[:limit]
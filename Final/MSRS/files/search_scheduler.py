@@ -0,0 +1,84 @@
+"""
+Search Scheduler for Movie Review App
+
+Debounces search requests coming from key events, runs the search on a
+worker thread and only delivers the newest result: every request bumps a
+generation counter and results from older generations are dropped.
+"""
+
+class SearchScheduler:
+    def __init__(self, root, task_runner, search, render, delay_ms=150):
+        self.root = root
+        self.task_runner = task_runner
+        self.search = search
+        self.render = render
+        self.delay_ms = delay_ms
+        self.generation = 0
+        self.after_id = None
+        self.future = None
+        self.last_request = None
+        self.last_result = None
+
+    def request(self, query, options=None, immediate=False):
+        """Schedule a search; repeated identical requests are ignored"""
+        key = (query, repr(options))
+        if key == self.last_request and not immediate:
+            # Arrow, shift and other keys that do not change the query
+            return
+        self.last_request = key
+
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+        if immediate:
+            self._start(query, options)
+        else:
+            self.after_id = self.root.after(self.delay_ms, self._start, query, options)
+
+    def _start(self, query, options):
+        """Start a search in the background, superseding older ones"""
+        self.after_id = None
+        self.generation += 1
+        generation = self.generation
+
+        if self.future is not None:
+            # Not started yet -> never runs; already running -> result is dropped
+            self.future.cancel()
+        self.future = self.task_runner.submit(
+            self.search, query, options, self.last_result,
+            callback=lambda result: self._deliver(generation, result)
+        )
+
+    def _deliver(self, generation, result):
+        """Render a result unless a newer search was requested meanwhile"""
+        if generation != self.generation:
+            return
+        self.future = None
+        self.last_result = result
+        self.render(result)
+
+    def refresh(self, query, options=None):
+        """Re-run a query from scratch after the debounce delay, e.g. once the data changed"""
+        # Results refined from the previous one would miss the changed items
+        self.last_result = None
+        self.last_request = None
+        self.request(query, options)
+
+    def cancel(self):
+        """Drop any pending or running request, e.g. when its window closes"""
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+        self.generation += 1
+        self.last_request = None
+
+    def run_now(self, query, options=None):
+        """Search synchronously, e.g. for the initial list"""
+        self.generation += 1
+        self.last_request = (query, repr(options))
+        self.last_result = self.search(query, options, self.last_result)
+        self.render(self.last_result)
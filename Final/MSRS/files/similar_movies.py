@@ -0,0 +1,170 @@
+"""
+Similar Movies for Movie Review App
+
+Offline job that precomputes the top-K most similar movies for every movie
+and stores them as a compact neighbour table (data/neighbours.npz).
+Similarity mixes content (genres, director, stars) and co-rating
+(users who rated both) cosine scores. Rows are processed in sparse blocks
+spread across a process pool.
+
+Usage:
+    python similar_movies.py --top-k 20 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from config import Config
+
+NEIGHBOURS_FILE = os.path.join(Config.DATA_DIR, "neighbours.npz")
+
+def movie_tokens(movie):
+    """Content tokens of a movie for the TF-IDF vectorizer"""
+    tokens = [f"genre:{g.strip().lower()}" for g in movie.get('Genre', '').split(',') if g.strip()]
+    director = movie.get('Director', '').strip().lower()
+    if director:
+        tokens.append(f"director:{director}")
+    for field in ('Star1', 'Star2', 'Star3', 'Star4'):
+        star = movie.get(field, '').strip().lower()
+        if star:
+            tokens.append(f"star:{star}")
+    return tokens
+
+def build_features(movies, content_weight=0.7):
+    """Row-normalized item feature matrix whose dot products are the mixed similarity"""
+    movie_ids = list(movies)
+    positions = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+    tfidf = TfidfVectorizer(analyzer=movie_tokens)
+    content = normalize(tfidf.fit_transform(movies.values()))
+
+    # Item x user matrix of mean-centred ratings
+    users = {}
+    rows, cols, values = [], [], []
+    for movie_id, movie in movies.items():
+        for review in movie.get('reviews', []):
+            rows.append(positions[movie_id])
+            cols.append(users.setdefault(review['username'], len(users)))
+            values.append(float(review['rating']) - 5.5)
+    ratings = sparse.csr_matrix((values, (rows, cols)), shape=(len(movie_ids), max(len(users), 1)))
+    ratings = normalize(ratings)
+
+    # sqrt weights so that x.y = w * content_cos + (1 - w) * rating_cos
+    features = sparse.hstack([content * np.sqrt(content_weight),
+                              ratings * np.sqrt(1.0 - content_weight)]).tocsr()
+    return movie_ids, features
+
+_features = None
+
+def _init_worker(features):
+    """Receive the feature matrix once per worker process"""
+    global _features
+    _features = features
+
+def _top_k_block(start, stop, k):
+    """Top-k neighbours for rows [start, stop) of the feature matrix"""
+    block = (_features[start:stop] @ _features.T).tocsr()
+    neighbours = np.full((stop - start, k), -1, dtype=np.int32)
+    scores = np.zeros((stop - start, k), dtype=np.float32)
+
+    for row in range(stop - start):
+        lo, hi = block.indptr[row], block.indptr[row + 1]
+        cols = block.indices[lo:hi]
+        data = block.data[lo:hi]
+        keep = (cols != start + row) & (data > 0)
+        cols, data = cols[keep], data[keep]
+        if not len(cols):
+            continue
+        if len(cols) > k:
+            top = np.argpartition(-data, k)[:k]
+            cols, data = cols[top], data[top]
+        order = np.argsort(-data, kind='stable')
+        neighbours[row, :len(order)] = cols[order]
+        scores[row, :len(order)] = data[order]
+    return start, neighbours, scores
+
+def compute_neighbours(movies, top_k=20, workers=None, block_size=512, progress=None):
+    """Compute the neighbour table for a movies dict"""
+    movie_ids, features = build_features(movies)
+    n = len(movie_ids)
+    neighbours = np.full((n, top_k), -1, dtype=np.int32)
+    scores = np.zeros((n, top_k), dtype=np.float32)
+
+    blocks = [(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(features,)) as pool:
+        futures = [pool.submit(_top_k_block, start, stop, top_k) for start, stop in blocks]
+        for done, future in enumerate(futures, 1):
+            start, block_neighbours, block_scores = future.result()
+            neighbours[start:start + len(block_neighbours)] = block_neighbours
+            scores[start:start + len(block_scores)] = block_scores
+            if progress:
+                progress(done, len(blocks))
+
+    return np.array(movie_ids), neighbours, scores
+
+class NeighbourTable:
+    def __init__(self, path=NEIGHBOURS_FILE):
+        self.path = path
+        self.ids = None
+        self.positions = {}
+        self.neighbours = None
+        self.scores = None
+        self.load()
+
+    def load(self):
+        """Load the table if the job has been run"""
+        try:
+            with np.load(self.path) as table:
+                self.ids = table['ids']
+                self.neighbours = table['neighbours']
+                self.scores = table['scores']
+        except FileNotFoundError:
+            return False
+        self.positions = {movie_id: i for i, movie_id in enumerate(self.ids.tolist())}
+        return True
+
+    def similar(self, movie_id, limit=10):
+        """Most similar movie IDs with scores, best first"""
+        pos = self.positions.get(movie_id)
+        if pos is None:
+            return []
+        result = []
+        for neighbour, score in zip(self.neighbours[pos][:limit], self.scores[pos][:limit]):
+            if neighbour < 0:
+                break
+            result.append((str(self.ids[neighbour]), float(score)))
+        return result
+
+    @staticmethod
+    def save(path, movie_ids, neighbours, scores):
+        """Write a neighbour table"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, ids=movie_ids, neighbours=neighbours, scores=scores.astype(np.float16))
+
+def main():
+    from data_manager import DataManager
+
+    parser = argparse.ArgumentParser(description="Precompute similar movies for every movie")
+    parser.add_argument('--top-k', type=int, default=20, help="neighbours kept per movie")
+    parser.add_argument('--workers', type=int, default=Config.BATCH_WORKERS,
+                        help="worker processes (default: Config.BATCH_WORKERS, else CPU count)")
+    parser.add_argument('--block-size', type=int, default=512, help="rows per sparse block")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    movies = DataManager().load_movies()
+    movie_ids, neighbours, scores = compute_neighbours(
+        movies, args.top_k, args.workers, args.block_size,
+        progress=lambda done, total: print(f"block {done}/{total}")
+    )
+    NeighbourTable.save(NEIGHBOURS_FILE, movie_ids, neighbours, scores)
+    print(f"Wrote {len(movie_ids)} movies x {args.top_k} neighbours to {NEIGHBOURS_FILE} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
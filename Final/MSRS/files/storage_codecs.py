@@ -0,0 +1,216 @@
+"""
+Storage Codecs for Movie Review App
+
+Encoders for the data files. Every codec reads and writes binary file
+objects; compressed codecs wrap a JSON codec and stream through the
+compressor instead of holding the compressed bytes in memory.
+
+Reads sniff the file header, so any supported format (including the old
+indent=4 files) loads no matter which codec is configured. Writes go to
+a temporary file that is renamed over the target, so readers never see
+a partially written file.
+
+Benchmark:
+    python storage_codecs.py --titles 20000
+"""
+import argparse
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+class JsonCodec:
+    """Compact stdlib JSON"""
+    name = "json"
+    extension = ".json"
+
+    def dump(self, obj, f):
+        text = io.TextIOWrapper(f, encoding='utf-8', write_through=True)
+        json.dump(obj, text, ensure_ascii=False, separators=(',', ':'))
+        text.detach()
+
+    def load(self, f):
+        text = io.TextIOWrapper(f, encoding='utf-8')
+        try:
+            return json.load(text)
+        finally:
+            text.detach()
+
+class PrettyJsonCodec(JsonCodec):
+    """Indented stdlib JSON, the original on-disk format"""
+    name = "pretty"
+
+    def dump(self, obj, f):
+        text = io.TextIOWrapper(f, encoding='utf-8', write_through=True)
+        json.dump(obj, text, indent=4)
+        text.detach()
+
+class OrjsonCodec:
+    """Compact JSON through orjson"""
+    name = "orjson"
+    extension = ".json"
+
+    def dump(self, obj, f):
+        f.write(orjson.dumps(obj))
+
+    def load(self, f):
+        return orjson.loads(f.read())
+
+class GzipCodec:
+    """gzip-compressed JSON"""
+    name = "gzip"
+    extension = ".json.gz"
+
+    def __init__(self, inner=None, level=6):
+        self.inner = inner or fastest_json()
+        self.level = level
+
+    def dump(self, obj, f):
+        with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.level, mtime=0) as stream:
+            self.inner.dump(obj, stream)
+
+    def load(self, f):
+        with gzip.GzipFile(fileobj=f, mode='rb') as stream:
+            return self.inner.load(stream)
+
+class ZstdCodec:
+    """zstd-compressed JSON (needs the zstandard package)"""
+    name = "zstd"
+    extension = ".json.zst"
+
+    def __init__(self, inner=None, level=3):
+        if zstandard is None:
+            raise ValueError("The zstd codec needs the 'zstandard' package")
+        self.inner = inner or fastest_json()
+        self.level = level
+
+    def dump(self, obj, f):
+        with zstandard.ZstdCompressor(level=self.level).stream_writer(f, closefd=False) as stream:
+            self.inner.dump(obj, stream)
+
+    def load(self, f):
+        with zstandard.ZstdDecompressor().stream_reader(f, closefd=False) as stream:
+            return self.inner.load(io.BufferedReader(stream))
+
+def fastest_json():
+    """orjson when installed, otherwise compact stdlib JSON"""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
+
+CODECS = {
+    'json': JsonCodec,
+    'pretty': PrettyJsonCodec,
+    'orjson': OrjsonCodec,
+    'gzip': GzipCodec,
+    'zstd': ZstdCodec,
+}
+
+def available_codecs():
+    """Names of the codecs usable in this environment"""
+    names = ['json', 'pretty', 'gzip']
+    if orjson is not None:
+        names.append('orjson')
+    if zstandard is not None:
+        names.append('zstd')
+    return names
+
+def get_codec(name):
+    """Codec instance for a configured name; "auto" picks the fastest JSON"""
+    if name == 'auto':
+        return fastest_json()
+    if name not in CODECS:
+        raise ValueError(f"Unknown storage codec '{name}' (choose from auto, {', '.join(CODECS)})")
+    if name not in available_codecs():
+        raise ValueError(f"Storage codec '{name}' is not available in this environment")
+    return CODECS[name]()
+
+def codec_for_path(path, default='auto'):
+    """Codec implied by a file extension, else the default"""
+    if path.endswith('.gz'):
+        return get_codec('gzip')
+    if path.endswith('.zst'):
+        return get_codec('zstd')
+    return get_codec(default)
+
+def detect_codec(f):
+    """Codec for an open binary file, judged by its first bytes"""
+    header = f.peek(4)[:4] if hasattr(f, 'peek') else b''
+    if header.startswith(GZIP_MAGIC):
+        return GzipCodec()
+    if header.startswith(ZSTD_MAGIC):
+        return ZstdCodec()
+    return fastest_json()
+
+def read_file(path):
+    """Decode a data file in whichever supported format it was written"""
+    with open(path, 'rb') as f:
+        return detect_codec(f).load(f)
+
+def write_file(path, obj, codec):
+    """Encode obj to path atomically"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            codec.dump(obj, f)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def benchmark(movies, names=None, repeat=3):
+    """[(codec, save seconds, load seconds, bytes), ...] for each codec"""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names or available_codecs():
+            codec = get_codec(name)
+            path = os.path.join(directory, "movies" + codec.extension)
+            save = load = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                write_file(path, movies, codec)
+                save = min(save, time.perf_counter() - start)
+                start = time.perf_counter()
+                read_file(path)
+                load = min(load, time.perf_counter() - start)
+            results.append((name, save, load, os.path.getsize(path)))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare storage codecs on a catalog")
+    parser.add_argument('--titles', type=int, default=None,
+                        help="synthetic catalog size (default: the real catalog)")
+    parser.add_argument('--users', type=int, default=2000, help="synthetic users")
+    parser.add_argument('--repeat', type=int, default=3, help="best of this many runs")
+    args = parser.parse_args()
+
+    if args.titles:
+        from synthetic_data import synthetic_catalog
+        movies, _ = synthetic_catalog(args.titles, args.users)
+    else:
+        from data_manager import DataManager
+        movies = DataManager().load_movies()
+
+    print(f"{'codec':<10}{'save s':>10}{'load s':>10}{'MB':>10}")
+    for name, save, load, size in benchmark(movies, repeat=args.repeat):
+        print(f"{name:<10}{save:>10.3f}{load:>10.3f}{size / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Synthetic Data for Movie Review App
+
+Generates catalogs in the movies.json schema for benchmarks, evaluation
+and load tests. Users prefer a couple of genres and rate movies in them
+higher, so recommenders have a signal to find.
+"""
+import random
+from datetime import datetime, timedelta
+
+GENRES = ['Drama', 'Crime', 'Action', 'Adventure', 'Comedy', 'Romance', 'Sci-Fi',
+          'Thriller', 'Horror', 'Animation', 'Family', 'War', 'Mystery', 'Biography']
+CERTIFICATES = ['G', 'PG', 'PG-13', 'R', 'N/A']
+WORDS = ['great', 'boring', 'amazing', 'slow', 'beautiful', 'terrible', 'fun', 'dark',
+         'moving', 'predictable', 'brilliant', 'acting', 'story', 'soundtrack', 'ending',
+         'plot', 'characters', 'visuals', 'script', 'pacing', 'masterpiece', 'mess']
+
+def synthetic_movies(n_movies, seed=0):
+    """Catalog of n_movies without reviews"""
+    rng = random.Random(seed)
+    people = [f"Person {i}" for i in range(max(10, n_movies // 2))]
+    movies = {}
+    for i in range(n_movies):
+        year = rng.randint(1930, 2024)
+        title = f"Movie {i} {rng.choice(WORDS).title()}"
+        movies[f"movie_{i}_{year}"] = {
+            "Series_Title": title,
+            "Released_Year": str(year),
+            "Certificate": rng.choice(CERTIFICATES),
+            "Runtime": str(rng.randint(80, 200)),
+            "Genre": ", ".join(rng.sample(GENRES, rng.randint(1, 3))),
+            "IMDB_Rating": f"{rng.uniform(5, 9.5):.1f}",
+            "Overview": " ".join(rng.choices(WORDS, k=20)),
+            "Meta_score": str(rng.randint(30, 100)),
+            "Director": rng.choice(people),
+            "Star1": rng.choice(people),
+            "Star2": rng.choice(people),
+            "Star3": rng.choice(people),
+            "Star4": rng.choice(people),
+            "No_of_Votes": str(rng.randint(1000, 2500000)),
+            "Gross": f"{rng.uniform(0.1, 900):.2f}",
+            "reviews": []
+        }
+    return movies
+
+def synthetic_catalog(n_movies, n_users, reviews_per_user=10, days=365, seed=0):
+    """Return (movies, users) with genre-driven reviews spread over `days`"""
+    rng = random.Random(seed)
+    movies = synthetic_movies(n_movies, seed)
+    movie_ids = list(movies)
+    by_genre = {}
+    for movie_id, movie in movies.items():
+        for genre in movie["Genre"].split(", "):
+            by_genre.setdefault(genre, []).append(movie_id)
+
+    start = datetime.now() - timedelta(days=days)
+    users = {}
+    for u in range(n_users):
+        username = f"user{u:06d}"
+        favourites = rng.sample(GENRES, 2)
+        rated = []
+        for _ in range(min(reviews_per_user, n_movies)):
+            if rng.random() < 0.7:
+                movie_id = rng.choice(by_genre.get(rng.choice(favourites)) or movie_ids)
+            else:
+                movie_id = rng.choice(movie_ids)
+            if movie_id in rated:
+                continue
+            liked = any(g in favourites for g in movies[movie_id]["Genre"].split(", "))
+            rating = rng.randint(7, 10) if liked else rng.randint(1, 6)
+            date = start + timedelta(seconds=rng.randint(0, days * 86400))
+            movies[movie_id]["reviews"].append({
+                "username": username,
+                "date": date.strftime("%Y-%m-%d %H:%M:%S"),
+                "rating": rating,
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(5, 30)))
+            })
+            rated.append(movie_id)
+        users[username] = {"password": "password123", "rated_movies": rated}
+    return movies, users
@@ -0,0 +1,59 @@
+"""
+Background Task Runner for Movie Review App
+
+Runs slow work (sentiment analysis, searches) on worker threads and hands
+results (or the exception a job raised) back on the Tk event thread, since
+widgets must only be touched from the thread running mainloop.
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+class TaskRunner:
+    POLL_MS = 30
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="msrs-task")
+        self.results = queue.Queue()
+        self.pending = 0
+        self.polling = False
+
+    def submit(self, func, *args, callback=None, error=None, **kwargs):
+        """Run func in the background and call callback(result), or error(exception), on the Tk thread"""
+        future = self.executor.submit(func, *args, **kwargs)
+        self.pending += 1
+        future.add_done_callback(lambda f: self.results.put((callback, error, f)))
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_MS, self._poll)
+        return future
+
+    def _poll(self):
+        """Deliver finished results on the Tk thread"""
+        while True:
+            try:
+                callback, error, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if future.cancelled():
+                continue
+            exception = future.exception()
+            try:
+                if exception is None:
+                    if callback is not None:
+                        callback(future.result())
+                elif error is not None:
+                    error(exception)
+            except Exception:
+                # The target widget may have been closed meanwhile
+                pass
+
+        if self.pending:
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self.polling = False
+
+    def shutdown(self):
+        """Stop accepting work and drop queued tasks"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -51,7 +51,29 @@ class UIComponents:
         search_entry.bind('<KeyRelease>', callback)
         
         return search_frame
-    
+
+    def create_filter_frame(self, container, sort_var, sort_options, facet_vars, facet_options, callback):
+        """Create sort and facet filter comboboxes"""
+        filter_frame = tk.Frame(container, bg=self.colors['bg_secondary'])
+        filter_frame.pack(fill='x', padx=15, pady=(0, 15))
+
+        ttk.Label(filter_frame, text="Sort by:",
+                 style='Modern2.TLabel').pack(side='left')
+        sort_box = ttk.Combobox(filter_frame, textvariable=sort_var, values=sort_options,
+                                state='readonly', width=16)
+        sort_box.pack(side='left', padx=(5, 15))
+        sort_box.bind('<<ComboboxSelected>>', callback)
+
+        for name, var in facet_vars.items():
+            ttk.Label(filter_frame, text=f"{name.title()}:",
+                     style='Modern2.TLabel').pack(side='left')
+            facet_box = ttk.Combobox(filter_frame, textvariable=var, values=facet_options[name],
+                                     state='readonly', width=14)
+            facet_box.pack(side='left', padx=(5, 10))
+            facet_box.bind('<<ComboboxSelected>>', callback)
+
+        return filter_frame
+
     def create_movies_listbox(self, container):
         """Create movies listbox with scrollbar"""
         listbox_frame = tk.Frame(container, bg=self.colors['bg_secondary'])
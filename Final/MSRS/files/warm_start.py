@@ -0,0 +1,189 @@
+"""
+Warm Start Cache for Movie Review App
+
+Startup artifacts (the catalog index with its display rows and community
+ratings, the fuzzy and review search indexes, and the recommender's item
+features) are pickled to data/cache and stamped with a fingerprint of the
+movies file they were built from. At launch, parts whose stamp matches the
+current file unpickle in milliseconds; stale or missing parts are rebuilt
+from the catalog and written back.
+
+The app keeps its parts current through DataManager change events, so
+on exit it re-stamps them against the files it wrote itself instead of
+leaving them to be rebuilt on the next launch. Each part remembers the
+file state it was built from, and an event only moves it forward when the
+write went directly on top of that state; if the importer, maintenance
+or the console changed the files in between, the part is not saved.
+"""
+import gc
+import os
+import pickle
+import threading
+from config import Config
+from data_manager import DataManager
+from catalog_index import CatalogIndex
+from fuzzy_search import FuzzyIndex
+from review_search import ReviewSearchIndex
+from storage_codecs import read_file, write_file, JsonCodec
+
+WARM_START_DIR = os.path.join(Config.DATA_DIR, "cache")
+CACHE_VERSION = 2
+
+def item_features(movies):
+    """(item_ids, TF-IDF genre matrix) as built by the recommender"""
+    from ai_analyzer import AIAnalyzer
+    return AIAnalyzer().build_item_features(movies)
+
+PARTS = {
+    'catalog_index': CatalogIndex,
+    'fuzzy_index': FuzzyIndex,
+    'review_index': ReviewSearchIndex,
+    'item_features': item_features,
+}
+# Parts the app patches on every change event, except these
+INVALIDATED_BY = {
+    DataManager.MOVIE_ADDED: {'item_features'},
+    DataManager.MOVIE_UPDATED: {'item_features'},
+}
+
+class PickleCodec:
+    """Pickle, for the cache's own files only"""
+    def dump(self, obj, f):
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+
+class _gc_paused:
+    """Pause the cyclic collector while unpickling (it otherwise runs ~5x slower on large indexes)"""
+    def __enter__(self):
+        global _gc_pauses
+        with _gc_lock:
+            if _gc_pauses == 0:
+                gc.disable()
+            _gc_pauses += 1
+
+    def __exit__(self, *exc):
+        global _gc_pauses
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0:
+                gc.enable()
+
+class WarmStartCache:
+    def __init__(self, data_manager, cache_dir=WARM_START_DIR):
+        self.data_manager = data_manager
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.lock = threading.Lock()
+        self.built = {}     # name -> fingerprint of the catalog the part handed out reflects
+        try:
+            manifest = read_file(self.manifest_path)
+        except (FileNotFoundError, ValueError):
+            manifest = {}
+        self.stamps = manifest.get('parts', {}) if manifest.get('version') == CACHE_VERSION else {}
+        self.fingerprint = self.source_fingerprint()
+
+    def source_fingerprint(self):
+        """Fingerprint of the movies file, the only source of every part"""
+        return self.data_manager.file_fingerprint()[0]
+
+    def part_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.pickle")
+
+    def is_fresh(self, name):
+        """True if a part was stamped with the current fingerprint"""
+        return self.fingerprint is not None and self.stamps.get(name) == self.fingerprint
+
+    def load(self, name):
+        """Unpickle a fresh part, or None if it is stale, missing or unreadable"""
+        if not self.is_fresh(name):
+            return None
+        try:
+            with open(self.part_path(name), 'rb') as f, _gc_paused():
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def save(self, name, part, fingerprint):
+        """Pickle a part and stamp it with the fingerprint it was built against"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_file(self.part_path(name), part, PickleCodec())
+        with self.lock:
+            self.stamps[name] = fingerprint
+            write_file(self.manifest_path, {'version': CACHE_VERSION, 'parts': self.stamps}, JsonCodec())
+
+    def restamp(self, old, new):
+        """Move parts stamped with old to new, after a rewrite that kept the content"""
+        with self.lock:
+            moved = [name for name, stamp in self.stamps.items() if stamp == old]
+            if not moved:
+                return []
+            for name in moved:
+                self.stamps[name] = new
+            write_file(self.manifest_path, {'version': CACHE_VERSION, 'parts': self.stamps}, JsonCodec())
+        self.fingerprint = self.source_fingerprint()
+        return moved
+
+    def get_many(self, names):
+        """Load fresh parts and rebuild stale ones from one catalog read; returns ({name: part}, fingerprint)"""
+        with self.lock:
+            fingerprint = self.fingerprint
+        parts = {name: self.load(name) for name in names}
+        stale = [name for name, part in parts.items() if part is None]
+        if stale:
+            snapshot = self.data_manager.snapshot()
+            if snapshot.fingerprint[0] != fingerprint:
+                # The files changed since the fresh parts were stamped, so they are stale too
+                stale = list(names)
+            parts.update(self.rebuild(stale, snapshot.fingerprint[0], snapshot.movies))
+            with self.lock:
+                if self.fingerprint == fingerprint:
+                    # No write event of our own meanwhile: another process wrote the files
+                    self.fingerprint = snapshot.fingerprint[0]
+            # Differs from self.fingerprint only if one of our writes missed these parts; the caller retries
+            fingerprint = snapshot.fingerprint[0]
+        with self.lock:
+            for name in parts:
+                self.built[name] = fingerprint
+        return parts, fingerprint
+
+    def rebuild(self, names, fingerprint, movies=None):
+        """Build parts from one catalog snapshot and save them; returns {name: part}"""
+        if movies is None:
+            movies = self.data_manager.snapshot().movies
+        parts = {}
+        for name in names:
+            parts[name] = PARTS[name](movies)
+            self.save(name, parts[name], fingerprint)
+        return parts
+
+    def track(self):
+        """Follow the app's own writes so parts patched by events can be re-stamped"""
+        for event in (DataManager.REVIEW_ADDED, DataManager.REVIEW_UPDATED,
+                      DataManager.REVIEW_REMOVED, DataManager.MOVIE_ADDED, DataManager.MOVIE_UPDATED):
+            self.data_manager.subscribe(event, self.on_data_changed)
+
+    def on_data_changed(self, event, payload):
+        """DataManager change-event handler (runs right after the file was written)"""
+        snapshot = payload['snapshot']
+        base = snapshot.base_fingerprint[0] if snapshot.base_fingerprint else None
+        after = snapshot.fingerprint[0]
+        invalidated = INVALIDATED_BY.get(event, set())
+        with self.lock:
+            for name, built in self.built.items():
+                # Parts behind the write's base missed an outside change and stay behind for good
+                if built == base and name not in invalidated:
+                    self.built[name] = after
+            self.fingerprint = after
+
+    def save_current(self, parts):
+        """Re-stamp parts kept current in memory; returns the names written"""
+        current = self.source_fingerprint()
+        written = []
+        for name, part in parts.items():
+            if part is None or self.built.get(name) != current or self.stamps.get(name) == current:
+                continue
+            self.save(name, part, current)
+            written.append(name)
+        return written
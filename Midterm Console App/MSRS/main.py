@@ -1,118 +1,125 @@
-import json
+import argparse
+import heapq
 import os
-from datetime import datetime
+import sys
 
-# Constants for file paths
+# The data, auth, index and search layers are shared with the Final app
+FINAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Final", "MSRS", "files")
+sys.path.insert(0, os.path.normpath(FINAL_DIR))
+
+from data_manager import DataManager
+from auth_manager import AuthManager
+from catalog_index import CatalogIndex
+from fuzzy_search import FuzzyIndex
+import app_lock
+
+# Constants for file paths and paging
 DATA_DIR = "data"
-USERS_FILE = os.path.join(DATA_DIR, "users.json")
-MOVIES_FILE = os.path.join(DATA_DIR, "movies.json")
+PAGE_SIZE = 20
+REVIEWS_SHOWN = 5
+SORT_KEYS = [key for key in CatalogIndex.SORT_KEYS.values() if key]
+
+# Catalog session: the file is read once and indexes are built on first use
+class Catalog:
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_manager = DataManager()
+        self.data_manager.data_dir = data_dir
+        self.data_manager.users_file = os.path.join(data_dir, "users.json")
+        self.data_manager.movies_file = os.path.join(data_dir, "movies.json")
+        self.data_manager.movies_dir = os.path.join(data_dir, "movies")
+        self.auth = AuthManager(self.data_manager)
+        self._movies = None
+        self._index = None
+        self._fuzzy = None
+        for event in (DataManager.REVIEW_ADDED, DataManager.REVIEW_UPDATED, DataManager.REVIEW_REMOVED):
+            self.data_manager.subscribe(event, self.on_review_changed)
+
+    @property
+    def movies(self):
+        if self._movies is None:
+            self._movies = self.data_manager.load_movies()
+        return self._movies
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = CatalogIndex(self.movies)
+        return self._index
 
-# Data handling functions
-def load_users():
-    with open(USERS_FILE, 'r') as f:
-        return json.load(f)
+    @property
+    def fuzzy(self):
+        if self._fuzzy is None:
+            self._fuzzy = FuzzyIndex(self.movies)
+        return self._fuzzy
 
-def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=4)
+    def on_review_changed(self, event, payload):
+        # Keep the cached catalog in step with our own writes
+        self.movies[payload['movie_id']] = payload['movie']
+        if self._index is not None:
+            self._index.update_movie(payload['movie_id'], payload['movie'])
 
-def load_movies():
-    with open(MOVIES_FILE, 'r') as f:
-        return json.load(f)
+    def ordered(self, sort_by=None):
+        # Catalog positions in listing order (ranks are 1-based positions in it)
+        if sort_by:
+            return self.index.sorted[sort_by]
+        return range(len(self.index.ids))
 
-def save_movies(movies):
-    with open(MOVIES_FILE, 'w') as f:
-        json.dump(movies, f, indent=4)
+    def page(self, page, page_size=PAGE_SIZE, sort_by=None):
+        # [(rank, movie_id, row), ...] for one page, plus the page count
+        order = self.ordered(sort_by)
+        pages = max(1, -(-len(order) // page_size))
+        start = (min(max(page, 1), pages) - 1) * page_size
+        rows = [(start + i + 1, self.index.ids[pos], self.index.rows[pos])
+                for i, pos in enumerate(order[start:start + page_size])]
+        return rows, pages
+
+    def resolve(self, ref, sort_by=None):
+        # Movie ID from a listing rank or a movie ID
+        ref = str(ref).strip()
+        if ref.isdigit():
+            order = self.ordered(sort_by)
+            rank = int(ref)
+            return self.index.ids[order[rank - 1]] if 1 <= rank <= len(order) else None
+        return ref if ref in self.movies else None
+
+    def search(self, term, limit=PAGE_SIZE):
+        # Title substring matches first, then typo-tolerant title/people matches
+        term = term.strip()
+        if not term:
+            return []
+        exact = self.index.query(mask=self.index.title_mask(term))
+        results = exact[:limit]
+        seen = set(results)
+        for movie_id, _ in self.fuzzy.search(term, limit):
+            if len(results) >= limit:
+                break
+            if movie_id not in seen:
+                results.append(movie_id)
+                seen.add(movie_id)
+        return results
 
 # Clearing the screen for better readability
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
-# User registration
-def register_user():
-    users = load_users()
-    
-    print("\n--- Register ---")
-    username = input("Enter username: ").strip().lower() 
-    
-    
-    if username in users: # Check if username already exists
-        clear_screen()
-        print("Username already exists!")
-        return None
-    elif len(username) < 5: # Username length check
-        clear_screen()
-        print("Username must be at least 5 characters long!")
-        return None
-    
-    password = input("Enter password: ").strip()  
-    if not password: # Password empty check
-        clear_screen()
-        print("Password cannot be empty!") 
-        return None
-    elif len(password) < 8: # Password length check
-        clear_screen()
-        print("Password must be at least 8 characters long!")
-        return None
-    elif not any(char.isdigit() for char in password): # Password digit check
-        clear_screen()
-        print("Password must contain at least one digit!")
-        return None
-    elif not any(char.isalpha() for char in password): # Password letter check
-        clear_screen()
-        print("Password must contain at least one letter!")
-        return None
-    elif any(char in "!@#$%^&*()-_+=<>?/" for char in password): # Password special character check
-        clear_screen()
-        print("Password cannot contain special characters! (!@#$%^&*()-_+=<>?/)")
-        return None
-    
-    users[username] = {
-        "password": password,
-        "rated_movies": []
-    } 
-    
-    save_users(users) # Save new user to data file
-    clear_screen()
-    print("Registration successful! You can now login.")
-    return username 
+# Printing helpers
+def print_page(catalog, page, page_size=PAGE_SIZE, sort_by=None):
+    rows, pages = catalog.page(page, page_size, sort_by)
+    print(f"\n--- Movie/TV Series List (page {min(max(page, 1), pages)}/{pages}) ---")
+    for rank, movie_id, row in rows:
+        print(f"{rank}. {row}")
+    return pages
 
-# User login
-def login_user():
-    users = load_users()
-    
-    print("\n--- Login ---")
-    username = input("Username: ").strip().lower()
-    password = input("Password: ").strip()
-    
-    if username in users and users[username]["password"] == password: # Check if username and password match
-        clear_screen()
-        print("Login successful!")
-        return username
-    else: # Invalid login attempt
-        clear_screen()
-        print("Invalid username or password!")
-        return None
-
-# Movie listing and details
-def list_movies():
-    movies = load_movies()
-    clear_screen()
-    print("\n--- Movie/TV Series List ---")
-    for idx, (movie_id, movie) in enumerate(movies.items(), 1): # Enumerate movies // AI suggested to use enumerate for better readability
-        print(f"{idx}. {movie['Series_Title']} ({movie['Released_Year']}) - IMDB: {movie.get('IMDB_Rating')}")
-
-def get_movie_by_index(index): # Get movie by index
-    movies = load_movies()
-    try:
-        return list(movies.items())[index - 1]
-    except IndexError:
-        return None, None
+def print_results(catalog, movie_ids):
+    if not movie_ids:
+        print("No matches found.")
+    for movie_id in movie_ids:
+        print(f"[{movie_id}] {catalog.index.display_row(movie_id)}")
 
 # Show movie details
-def show_movie_details(movie_id, movie_data):
-    clear_screen()
+def show_movie_details(movie_id, movie_data, reviews_shown=REVIEWS_SHOWN):
     print("\n--- Movie/TV Series Details ---")
+    print(f"ID: {movie_id}")
     print(f"Title: {movie_data['Series_Title']}")
     print(f"Year: {movie_data['Released_Year']}")
     print(f"Certificate: {movie_data['Certificate']}")
@@ -125,137 +132,152 @@ def show_movie_details(movie_id, movie_data):
     print(f"Votes: {movie_data['No_of_Votes']}")
     print(f"Gross: ${movie_data['Gross']} million")
     print(f"\nOverview:\n{movie_data['Overview']}")
-    
-    print("\n--- Reviews ---") # Display reviews
-    if movie_data['reviews']:
-        for review in movie_data['reviews']:
+
+    print("\n--- Reviews ---") # Newest reviews first
+    reviews = movie_data['reviews']
+    if reviews:
+        for review in heapq.nlargest(reviews_shown, reviews, key=lambda r: (r['date'], r['username'])):
             print(f"User: {review['username']}")
             print(f"Date: {review['date']}")
             print(f"Rating: {review['rating']}/10")
             print(f"Review: {review['content']}")
             print("-" * 30)
+        if len(reviews) > reviews_shown:
+            print(f"...and {len(reviews) - reviews_shown} older reviews.")
     else:
         print("No reviews yet.")
 
-# Rate and review a movie
-def rate_and_review_movie(username):
-    users = load_users()
-    movies = load_movies()
-    
-    list_movies()
-    try:
-        choice = int(input("Enter movie number to rate/review: "))
-        movie_id, movie_data = get_movie_by_index(choice)
-        if not movie_id:
+# Interactive pieces
+def browse_movies(catalog):
+    page = 1
+    while True:
+        pages = print_page(catalog, page)
+        choice = input("n: next, p: previous, number or ID: details, Enter: back > ").strip().lower()
+        if choice == "n":
+            page = min(page + 1, pages)
+        elif choice == "p":
+            page = max(page - 1, 1)
+        elif not choice:
             clear_screen()
-            print("Invalid movie number!")
             return
-    except ValueError:
+        else:
+            view_movie(catalog, choice)
+            return
+
+def view_movie(catalog, ref=None):
+    ref = ref or input("Enter movie number or ID: ")
+    movie_id = catalog.resolve(ref)
+    clear_screen()
+    if movie_id:
+        show_movie_details(movie_id, catalog.movies[movie_id])
+    else:
+        print("Invalid movie number or ID!")
+
+def search_movies(catalog):
+    term = input("Search title, director or star: ").strip()
+    clear_screen()
+    print(f"\n--- Results for '{term}' ---")
+    print_results(catalog, catalog.search(term))
+
+def register_user(catalog):
+    print("\n--- Register ---")
+    username = input("Enter username: ")
+    password = input("Enter password: ")
+    success, message = catalog.auth.register(username, password)
+    clear_screen()
+    print(message)
+    return username.strip().lower() if success else None
+
+def login_user(catalog):
+    print("\n--- Login ---")
+    username = input("Username: ")
+    password = input("Password: ")
+    success, message = catalog.auth.login(username, password)
+    clear_screen()
+    print(message)
+    return catalog.auth.get_current_user() if success else None
+
+# Rate and review a movie
+def submit_review(catalog, username, movie_id, rating, content):
+    if not 1 <= rating <= 10:
+        return False, "Rating must be between 1 and 10!"
+    if not content.strip():
+        return False, "Review cannot be empty!"
+    catalog.data_manager.add_review_to_movie(movie_id, username, rating, content.strip())
+    return True, "Rating and review submitted successfully!"
+
+def rate_and_review_movie(catalog, username):
+    movie_id = catalog.resolve(input("Enter movie number or ID to rate/review: "))
+    if not movie_id:
         clear_screen()
-        print("Please enter a valid number!")
+        print("Invalid movie number or ID!")
         return
-    
+    movie_data = catalog.movies[movie_id]
+
     # Check if the user has already rated the movie
-    if movie_id in users[username]["rated_movies"]:
+    if any(review['username'] == username for review in movie_data['reviews']):
         clear_screen()
         print("You've already rated this movie!")
-        update_choice = input("Do you want to update your review? (yes/no): ").strip().lower()
-        if update_choice != "yes":
+        if input("Do you want to update your review? (yes/no): ").strip().lower() != "yes":
             return
-    
+
     # System asks for rating until a valid input is given
     while True:
         try:
             rating = int(input(f"Enter your rating for '{movie_data['Series_Title']}' (1-10): "))
             if 1 <= rating <= 10:
                 break
-            else:
-                clear_screen()
-                print("Rating must be between 1 and 10!")
+            clear_screen()
+            print("Rating must be between 1 and 10!")
         except ValueError:
             clear_screen()
             print("Please enter a valid number!")
-    
-    # Gets review
+
     print(f"\nWrite your review for '{movie_data['Series_Title']}':")
-    review_content = input("> ").strip()
-    
-    if not review_content: # Check if review is empty
-        clear_screen()
-        print("Review cannot be empty!")
-        return
-    
-    # Update movie reviews
-    all_reviews = movies[movie_id]['reviews']
-    for review in all_reviews:
-        if review['username'] == username: # Check if the user has already reviewed
-            review['rating'] = rating
-            review['content'] = review_content
-            review['date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            break
-    else:
-        # Add new review
-        movies[movie_id]['reviews'].append({
-            "username": username,
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "rating": rating,
-            "content": review_content
-        })
-        # Update user's rated movies
-        users[username]["rated_movies"].append(movie_id)
-    
-    save_movies(movies)
-    save_users(users)
+    content = input("> ")
+    _, message = submit_review(catalog, username, movie_id, rating, content)
     clear_screen()
-    print("Rating and review submitted successfully!")
-
+    print(message)
 
 # Main menu
-def main():
+def interactive(catalog):
     current_user = None
-    
+
     while True:
         print("\n=== Movie/Tv Series Review System ===")
         if current_user:
-            users = load_users()
-            
             print("Logged in as: " + current_user)
-            
             print("1. List Movies")
             print("2. View Movie Details")
-            print("3. Rate & Review a Movie")
-            print("4. Logout")
-            print("5. Exit")
+            print("3. Search Movies")
+            print("4. Rate & Review a Movie")
+            print("5. Logout")
+            print("6. Exit")
         else:
             print("1. Register")
             print("2. Login")
             print("3. List Movies")
-            print("4. View Movie Details (Login Required)")
-            print("5. Exit")
-        
+            print("4. Search Movies")
+            print("5. View Movie Details (Login Required)")
+            print("6. Exit")
+
         choice = input("Enter your choice: ").strip()
-        
+
         if current_user:
             if choice == "1":
-                list_movies()
+                browse_movies(catalog)
             elif choice == "2":
-                list_movies()
-                try:
-                    movie_num = int(input("Enter movie number to view details: "))
-                    movie_id, movie_data = get_movie_by_index(movie_num)
-                    if movie_id:
-                        show_movie_details(movie_id, movie_data)
-                    else:
-                        print("Invalid movie number!")
-                except ValueError:
-                    print("Please enter a valid number!")
+                view_movie(catalog)
             elif choice == "3":
-                rate_and_review_movie(current_user)
+                search_movies(catalog)
             elif choice == "4":
+                rate_and_review_movie(catalog, current_user)
+            elif choice == "5":
                 current_user = None
+                catalog.auth.logout()
                 clear_screen()
                 print("Logged out successfully!")
-            elif choice == "5":
+            elif choice == "6":
                 clear_screen()
                 print("Goodbye!")
                 break
@@ -264,15 +286,17 @@ def main():
                 print("Invalid choice!")
         else:
             if choice == "1":
-                register_user()
+                register_user(catalog)
             elif choice == "2":
-                current_user = login_user()
+                current_user = login_user(catalog)
             elif choice == "3":
-                list_movies()
+                browse_movies(catalog)
             elif choice == "4":
+                search_movies(catalog)
+            elif choice == "5":
                 clear_screen()
                 print("Please login first!")
-            elif choice == "5":
+            elif choice == "6":
                 clear_screen()
                 print("Goodbye!")
                 break
@@ -280,5 +304,80 @@ def main():
                 clear_screen()
                 print("Invalid choice!")
 
-if __name__ == "__main__": 
-    main()
\ No newline at end of file
+# Non-interactive subcommands for scripting
+def build_parser():
+    parser = argparse.ArgumentParser(description="Movie/TV Series Review System")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="directory holding movies.json and users.json")
+    commands = parser.add_subparsers(dest='command')
+
+    list_parser = commands.add_parser('list', help="print one page of the catalog")
+    list_parser.add_argument('--page', type=int, default=1)
+    list_parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    list_parser.add_argument('--sort', choices=SORT_KEYS, default=None)
+
+    show_parser = commands.add_parser('show', help="movie details by listing number or ID")
+    show_parser.add_argument('movie', help="listing number or movie ID")
+    show_parser.add_argument('--sort', choices=SORT_KEYS, default=None, help="listing order the number refers to")
+    show_parser.add_argument('--reviews', type=int, default=REVIEWS_SHOWN, help="newest reviews to show")
+
+    search_parser = commands.add_parser('search', help="search titles, directors and stars")
+    search_parser.add_argument('term')
+    search_parser.add_argument('--limit', type=int, default=PAGE_SIZE)
+
+    register_parser = commands.add_parser('register', help="create an account")
+    register_parser.add_argument('--username', required=True)
+    register_parser.add_argument('--password', required=True)
+
+    review_parser = commands.add_parser('review', help="rate and review a movie")
+    review_parser.add_argument('movie', help="listing number or movie ID")
+    review_parser.add_argument('--username', required=True)
+    review_parser.add_argument('--password', required=True)
+    review_parser.add_argument('--rating', type=int, required=True)
+    review_parser.add_argument('--content', required=True)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    catalog = Catalog(args.data_dir)
+    if args.command not in (None, 'register', 'review'):
+        return run_command(catalog, args)
+    # Maintenance commands that rewrite the data files refuse to run while this is held
+    lock_path = os.path.join(args.data_dir, "app.lock")
+    app_lock.acquire(lock_path)
+    try:
+        if args.command is None:
+            interactive(catalog)
+            return 0
+        return run_command(catalog, args)
+    finally:
+        app_lock.release(lock_path)
+
+def run_command(catalog, args):
+    if args.command == 'list':
+        print_page(catalog, args.page, args.page_size, args.sort)
+        return 0
+    if args.command == 'search':
+        print_results(catalog, catalog.search(args.term, args.limit))
+        return 0
+    if args.command == 'register':
+        success, message = catalog.auth.register(args.username, args.password)
+        print(message)
+        return 0 if success else 1
+
+    movie_id = catalog.resolve(args.movie, getattr(args, 'sort', None))
+    if not movie_id:
+        print("Invalid movie number or ID!")
+        return 1
+    if args.command == 'show':
+        show_movie_details(movie_id, catalog.movies[movie_id], args.reviews)
+        return 0
+
+    success, message = catalog.auth.login(args.username, args.password)
+    if success:
+        success, message = submit_review(catalog, catalog.auth.get_current_user(), movie_id,
+                                         args.rating, args.content)
+    print(message)
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())